@@ -11,7 +11,6 @@ from pathlib import Path
 # 添加src目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.core import LunaCore
 from src.utils import print_error, print_info, print_header
 
 
@@ -30,7 +29,8 @@ def cli():
 @click.option('--profile', '-p', required=True, help='流程名称')
 @click.option('--target', '-t', help='目标域名（单个或逗号分隔的多个）')
 @click.option('--target-file', '-f', help='目标文件路径（每行一个域名）')
-def run(profile, target, target_file):
+@click.option('--no-cache', is_flag=True, help='不使用工具结果缓存，强制重新执行')
+def run(profile, target, target_file, no_cache):
     """
     运行流程
     
@@ -41,25 +41,31 @@ def run(profile, target, target_file):
         luna run --profile default --target-file domains.txt
         
         luna run -p quick -t example.com,test.com
+        
+        luna run -p default -t example.com --no-cache
     """
     if not target and not target_file:
         print_error("请指定目标: --target 或 --target-file")
         sys.exit(1)
     
-    core = LunaCore()
+    from src.core import LunaCore
+    
+    core = LunaCore(use_cache=not no_cache)
     
-    # 解析目标
+    # 解析目标（流式读取，运行过程中逐个加载）
     targets = core.parse_targets(target, target_file)
     
-    if not targets:
+    if not targets.has_targets():
+        targets.print_summary()
         print_error("没有有效的目标")
         sys.exit(1)
     
-    print_info(f"共 {len(targets)} 个目标")
-    
     # 运行流程
     success = core.run_profile(profile, targets)
     
+    # 目标读取汇总（无效行统一在此输出）
+    targets.print_summary()
+    
     sys.exit(0 if success else 1)
 
 
@@ -78,6 +84,8 @@ def create(name, from_profile):
         
         luna create  # 交互式创建
     """
+    from src.core import LunaCore
+    
     core = LunaCore()
     success = core.create_profile(name, from_profile)
     sys.exit(0 if success else 1)
@@ -92,6 +100,8 @@ def list():
     
         luna list
     """
+    from src.core import LunaCore
+    
     core = LunaCore()
     core.list_profiles()
 
@@ -108,6 +118,8 @@ def show(name):
         
         luna show my-scan
     """
+    from src.core import LunaCore
+    
     core = LunaCore()
     core.show_profile(name)
 
@@ -122,6 +134,8 @@ def delete(name):
     
         luna delete my-scan
     """
+    from src.core import LunaCore
+    
     core = LunaCore()
     success = core.delete_profile(name)
     sys.exit(0 if success else 1)
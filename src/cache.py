@@ -0,0 +1,427 @@
+"""
+Luna 结果缓存模块
+按 工具 + 参数 + 输入集合 对解析后的工具结果做内容寻址缓存，
+并按URL缓存HTTP探测结果
+"""
+
+import os
+import json
+import mmap
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import (
+    CACHE_DIR, RESULT_CACHE_TOOLS, RESULT_CACHE_TTL,
+    RESULT_CACHE_MAX_SIZE, RESULT_CACHE_MAX_ENTRY_SIZE,
+    PROBE_CACHE_FILE, PROBE_CACHE_TTL, PROBE_CACHE_NEGATIVE_TTL, ensure_dir
+)
+from .parsers import RecordStream
+from .targets import canonicalize_url
+from .utils import setup_logger
+
+# 结果缓存目录名
+RESULT_CACHE_DIRNAME = "results"
+
+# 输入集合哈希的取模范围（逐行摘要求和，与行顺序无关）
+_SET_HASH_MODULUS = 1 << 128
+
+
+def _hash_input_set(file_path: Path) -> str:
+    """
+    计算输入文件中行集合的哈希
+
+    每个不重复的非空行取16字节摘要后求和，结果与行顺序、重复行无关，
+    只在内存中保存摘要集合
+
+    Args:
+        file_path: 输入文件路径
+
+    Returns:
+        str: 集合哈希（十六进制）
+    """
+    digests = set()
+    with open(file_path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                digests.add(hashlib.blake2b(line, digest_size=16).digest())
+
+    total = 0
+    for digest in digests:
+        total += int.from_bytes(digest, 'big')
+
+    return f"{len(digests)}:{total % _SET_HASH_MODULUS:032x}"
+
+
+def _to_serializable(value: Any) -> Any:
+    """JSON序列化时将集合等可迭代对象展开为列表（顶层的记录流单独逐条写入）"""
+    if hasattr(value, '__iter__'):
+        return list(value)
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+class _EntryTooLarge(Exception):
+    """缓存条目超出大小上限"""
+
+
+def _iter_cached_stream(mapped: mmap.mmap, start: int, index: int) -> Iterator[Any]:
+    """
+    逐条读取缓存条目中第index个记录流的记录
+
+    从命中时映射的条目内容读取，之后条目文件被淘汰或替换也不影响已返回的结果
+
+    Args:
+        mapped: 条目文件的内存映射
+        start: 第一条记录的偏移（条目头之后）
+        index: 记录流序号
+
+    Yields:
+        Any: 记录
+    """
+    size = len(mapped)
+    while start < size:
+        end = mapped.find(b'\n', start)
+        if end < 0:
+            end = size
+        line = mapped[start:end]
+        start = end + 1
+        if line.strip():
+            stream, record = json.loads(line)
+            if stream == index:
+                yield record
+
+
+class ResultCache:
+    """
+    工具结果缓存
+
+    只缓存执行成功的结果；条目在有效期内命中时直接返回解析后的数据，
+    总大小超出上限时按最近使用时间（文件修改时间）淘汰
+
+    条目文件第一行为条目头（工具、创建时间、记录流以外的数据及记录流名称），
+    之后每行一条记录 [记录流序号, 记录]；写入和命中时都逐条处理，不在内存中展开记录流。
+    命中时映射条目文件，返回的记录流不受之后的淘汰影响
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: int = RESULT_CACHE_TTL,
+                 max_size: int = RESULT_CACHE_MAX_SIZE,
+                 max_entry_size: int = RESULT_CACHE_MAX_ENTRY_SIZE):
+        """
+        初始化结果缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl: 有效期（秒）
+            max_size: 缓存总大小上限（字节）
+            max_entry_size: 单条结果大小上限（字节）
+        """
+        self.cache_dir = cache_dir or (CACHE_DIR / RESULT_CACHE_DIRNAME)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        self.logger = setup_logger("Luna.cache")
+
+    @staticmethod
+    def is_cacheable(tool_name: str) -> bool:
+        """工具结果是否可以缓存（结果完全由输入和参数决定，且不依赖输出目录中的其他文件）"""
+        return tool_name in RESULT_CACHE_TOOLS
+
+    def make_key(self, tool_name: str, target: str, params: Dict[str, Any]) -> str:
+        """
+        计算缓存键
+
+        Args:
+            tool_name: 工具名称
+            target: 目标或输入文件路径
+            params: 工具参数
+
+        Returns:
+            str: 缓存键
+        """
+        target_path = Path(target)
+        if target_path.is_file():
+            input_key = "file:" + _hash_input_set(target_path)
+        else:
+            input_key = "target:" + target
+
+        params_key = json.dumps(params, sort_keys=True, default=str)
+        raw = "\0".join((tool_name, params_key, input_key))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict]: 解析后的数据，未命中或已过期返回None
+        """
+        path = self._entry_path(key)
+        expired = False
+        try:
+            with open(path, 'rb') as f:
+                entry = json.loads(f.readline())
+                if not isinstance(entry, dict) or not isinstance(entry.get('data'), dict):
+                    return None
+
+                expired = time.time() - entry.get('created', 0) > self.ttl
+                data = entry['data']
+                streams = entry.get('streams') or []
+
+                # 记录流遍历时才逐条读取；先映射条目文件，
+                # 之后条目被其他写入淘汰（删除文件）时仍可读取
+                start = f.tell()
+                mapped = None
+                if streams and not expired:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if expired:
+            self._remove(path)
+            return None
+
+        # 更新修改时间，作为LRU淘汰依据
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        for index, name in enumerate(streams):
+            data[name] = RecordStream(lambda index=index: _iter_cached_stream(mapped, start, index))
+
+        return data
+
+    def put(self, key: str, tool_name: str, data: Dict[str, Any]) -> bool:
+        """
+        写入缓存结果
+
+        Args:
+            key: 缓存键
+            tool_name: 工具名称
+            data: 解析后的数据（记录流逐条写入）
+
+        Returns:
+            bool: 是否写入成功
+        """
+        path = self._entry_path(key)
+        ensure_dir(path.parent)
+        temp_path = path.with_suffix('.tmp')
+
+        streams = [name for name, value in data.items() if isinstance(value, RecordStream)]
+        header = {
+            'tool': tool_name,
+            'created': time.time(),
+            'data': {name: value for name, value in data.items() if name not in streams},
+            'streams': streams
+        }
+
+        try:
+            with open(temp_path, 'wb') as f:
+                size = 0
+
+                def write(value: Any):
+                    nonlocal size
+                    line = json.dumps(value, ensure_ascii=False, default=_to_serializable)
+                    line = (line + '\n').encode('utf-8')
+                    size += len(line)
+                    # 超出上限后立即停止，不再读取剩余记录
+                    if size > self.max_entry_size:
+                        raise _EntryTooLarge()
+                    f.write(line)
+
+                write(header)
+                for index, name in enumerate(streams):
+                    for record in data[name]:
+                        write([index, record])
+
+            os.replace(temp_path, path)
+        except _EntryTooLarge:
+            self.logger.info(f"结果过大，不缓存: {tool_name}")
+            self._remove(temp_path)
+            return False
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"写入结果缓存失败: {e}")
+            self._remove(temp_path)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """删除过期条目，并在总大小超出上限时按最近使用时间淘汰"""
+        if not self.cache_dir.exists():
+            return
+
+        now = time.time()
+        entries = []
+        total = 0
+
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            # 修改时间不早于创建时间，超过有效期的条目一定已过期
+            if now - stat.st_mtime > self.ttl:
+                self._remove(path)
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            self._remove(path)
+            total -= size
+            if total <= self.max_size:
+                break
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+class ProbeCache:
+    """
+    HTTP探测缓存
+
+    以规范化后的探测输入（URL）为键保存状态码、标题、技术栈和响应长度，存储在本地SQLite文件中；
+    无响应的输入同样记录，在较短的有效期内不再重复探测
+    """
+
+    # 单次查询的参数数量（SQLite对绑定参数个数有限制）
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, db_file: Optional[Path] = None, ttl: int = PROBE_CACHE_TTL,
+                 negative_ttl: int = PROBE_CACHE_NEGATIVE_TTL):
+        """
+        初始化探测缓存
+
+        Args:
+            db_file: 缓存数据库文件
+            ttl: 有效期（秒）
+            negative_ttl: 无响应记录的有效期（秒，不超过ttl）
+        """
+        self.db_file = db_file or PROBE_CACHE_FILE
+        self.ttl = ttl
+        self.negative_ttl = min(negative_ttl, ttl)
+        self.logger = setup_logger("Luna.cache")
+
+    def _connect(self) -> sqlite3.Connection:
+        ensure_dir(self.db_file.parent)
+        conn = sqlite3.connect(str(self.db_file))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS probes ("
+            "input TEXT PRIMARY KEY, url TEXT, status_code INTEGER, title TEXT, "
+            "content_length INTEGER, tech TEXT, alive INTEGER, updated REAL)"
+        )
+        return conn
+
+    def split(self, inputs: Iterable[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        将探测输入分为有效缓存和待探测两部分
+
+        Args:
+            inputs: 探测输入列表
+
+        Returns:
+            Tuple: (缓存中有响应的探测结果, 待探测的输入（已规范化）)
+        """
+        inputs = list(dict.fromkeys(canonicalize_url(input_url) for input_url in inputs))
+        if not inputs:
+            return [], []
+
+        cached = []
+        fresh = set()
+        now = time.time()
+        min_updated = now - self.ttl
+        min_negative_updated = now - self.negative_ttl
+
+        try:
+            with closing(self._connect()) as conn:
+                for start in range(0, len(inputs), self.QUERY_BATCH_SIZE):
+                    batch = inputs[start:start + self.QUERY_BATCH_SIZE]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = conn.execute(
+                        "SELECT input, url, status_code, title, content_length, tech, alive "
+                        "FROM probes WHERE updated >= (CASE WHEN alive THEN ? ELSE ? END) "
+                        f"AND input IN ({placeholders})",
+                        [min_updated, min_negative_updated, *batch]
+                    )
+                    for input_url, url, status_code, title, content_length, tech, alive in rows:
+                        fresh.add(input_url)
+                        if alive:
+                            cached.append({
+                                'input': input_url,
+                                'url': url,
+                                'status_code': status_code,
+                                'title': title,
+                                'content_length': content_length,
+                                'tech': json.loads(tech) if tech else []
+                            })
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取探测缓存失败: {e}")
+            return [], inputs
+
+        pending = [input_url for input_url in inputs if input_url not in fresh]
+        return cached, pending
+
+    def store(self, inputs: Iterable[str], records: Iterable[Dict[str, Any]]):
+        """
+        保存探测结果
+
+        Args:
+            inputs: 本次探测的输入（没有对应结果的输入记为无响应）
+            records: 探测结果（需包含input或url字段）
+        """
+        now = time.time()
+        rows = {}
+
+        for record in records:
+            key = record.get('input') or record.get('url')
+            if not key:
+                continue
+            key = canonicalize_url(key)
+            rows[key] = (
+                key, record.get('url', ''), record.get('status_code', 0),
+                record.get('title', ''), record.get('content_length', 0),
+                json.dumps(record.get('tech') or [], ensure_ascii=False), 1, now
+            )
+
+        for input_url in map(canonicalize_url, inputs):
+            if input_url not in rows:
+                rows[input_url] = (input_url, '', 0, '', 0, '', 0, now)
+
+        if not rows:
+            return
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows.values()
+                )
+                # 顺带清理过期条目
+                conn.execute(
+                    "DELETE FROM probes WHERE updated < (CASE WHEN alive THEN ? ELSE ? END)",
+                    (now - self.ttl, now - self.negative_ttl)
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"写入探测缓存失败: {e}")
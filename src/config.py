@@ -15,10 +15,9 @@ PROFILES_DIR = LUNA_ROOT / "profiles"
 OUTPUTS_DIR = LUNA_ROOT / "outputs"
 LOGS_DIR = LUNA_ROOT / "logs"
 CONFIG_DIR = LUNA_ROOT / "config"
+CACHE_DIR = LUNA_ROOT / "cache"
 
-# 确保目录存在
-for directory in [TOOLS_DIR, PROFILES_DIR, OUTPUTS_DIR, LOGS_DIR, CONFIG_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+# 目录在首次写入时创建（见 ensure_dir），导入配置时不做任何文件系统操作
 
 # 工具路径映射
 TOOL_PATHS = {
@@ -40,8 +39,24 @@ TOOL_TYPES = {
     "dirsearch": "python",
     "fscan": "go",
     "txportmap": "go",
+    "httpprobe": "builtin",
+    "portscan": "builtin",
+    "dnsresolve": "builtin",
+}
+
+# 外部工具不存在时使用的内置引擎
+BUILTIN_FALLBACKS = {
+    "httpx": "httpprobe",
+    "txportmap": "portscan",
+    "fscan": "portscan",
 }
 
+# HTTP探测类工具（输入和结果处理方式相同）
+HTTP_PROBE_TOOLS = ["httpx", "httpprobe"]
+
+# 端口扫描类工具（输入为IP列表）
+PORT_SCAN_TOOLS = ["txportmap", "fscan", "portscan"]
+
 # 工具信息
 TOOL_INFO = {
     "oneforall": {
@@ -85,9 +100,30 @@ TOOL_INFO = {
         "language": "Go",
         "function": "端口扫描",
         "description": "快速端口扫描和指纹识别"
+    },
+    "httpprobe": {
+        "name": "httpprobe",
+        "language": "Python",
+        "function": "HTTP探测（内置）",
+        "description": "内置异步HTTP探测，无需外部工具，连接复用"
+    },
+    "portscan": {
+        "name": "portscan",
+        "language": "Python",
+        "function": "端口扫描（内置）",
+        "description": "内置异步TCP连接扫描，支持banner识别"
+    },
+    "dnsresolve": {
+        "name": "dnsresolve",
+        "language": "Python",
+        "function": "DNS解析（内置）",
+        "description": "子域名批量解析A/AAAA/CNAME，检测泛解析，为端口扫描提供IP"
     }
 }
 
+# 内置DNS解析使用的解析服务器（可带端口，如 127.0.0.1:5353）
+DNS_RESOLVERS = ["223.5.5.5", "119.29.29.29", "114.114.114.114", "8.8.8.8", "1.1.1.1"]
+
 # 邮件域名过滤规则
 EMAIL_PATTERNS = [
     r'^mail\.',
@@ -101,11 +137,130 @@ EMAIL_PATTERNS = [
     r'^mx[0-9]+\.',
 ]
 
+# 子域名过滤规则集（正则表达式，从子域名开头匹配，忽略大小写）
+# 可在 config/filter_rules.json 中扩展:
+#   {"rules": {"规则集名": ["^pattern\\."]}, "enabled": ["email", "规则集名"]}
+FILTER_RULES = {
+    "email": EMAIL_PATTERNS,
+    "infra": [
+        r'^ns[0-9]*\.',
+        r'^dns[0-9]*\.',
+        r'^ntp[0-9]*\.',
+        r'^autodiscover\.',
+        r'^autoconfig\.',
+        r'^_',
+    ],
+}
+
+# 丢弃不属于目标范围的子域名和URL（目标的子域名、目标IP/网段以外的发现）
+SCOPE_FILTER = True
+
+# 默认启用的过滤规则集
+ENABLED_FILTER_RULES = ["email"]
+
+# 工具结果缓存配置
+# 相同工具 + 相同参数 + 相同输入集合在有效期内直接复用解析后的结果
+RESULT_CACHE_TOOLS = ["httpx", "httpprobe", "dirsearch", "ffuf", "fscan", "txportmap", "portscan"]
+RESULT_CACHE_TTL = 6 * 3600            # 有效期（秒）
+RESULT_CACHE_MAX_SIZE = 1 << 30        # 缓存总大小上限（字节），超出按LRU淘汰
+RESULT_CACHE_MAX_ENTRY_SIZE = 256 << 20  # 单条结果大小上限（字节），超出不缓存
+
+# HTTP探测缓存配置（按URL缓存探测结果，跨目标、跨运行复用）
+PROBE_CACHE_FILE = CACHE_DIR / "probes.db"
+PROBE_CACHE_TTL = 24 * 3600            # 有效期（秒）
+PROBE_CACHE_NEGATIVE_TTL = 600         # 无响应记录的有效期（秒），短暂不可达的主机在之后的运行中重新探测
+
+# 全局资源限制（所有工具共享）
+GOVERNOR_MAX_PROCESSES = 4             # 同时运行的工具进程数
+GOVERNOR_THREAD_BUDGET = 2000          # 所有工具线程/连接数之和（同时受文件描述符上限约束）
+GOVERNOR_FD_RESERVE = 128              # 为日志、结果文件等保留的文件描述符
+GOVERNOR_MIN_THREADS = 10              # 剩余预算低于该值时等待其他工具结束
+GOVERNOR_MAX_RATE = 2000               # 所有工具请求速率之和（每秒）
+PER_IP_RATE_LIMIT = 50                 # 单个目标IP的请求速率上限（每秒）
+
+# 工具的并发参数（由全局资源限制按比例调整）
+TOOL_CONCURRENCY_PARAMS = {
+    "puzzle": ["pt", "wt"],
+    "httpx": ["threads"],
+    "httpprobe": ["threads"],
+    "dirsearch": ["threads"],
+    "ffuf": ["threads"],
+    "fscan": ["threads"],
+    "txportmap": ["threads"],
+    "portscan": ["threads"]
+}
+
+# 支持限速的工具及其速率参数
+TOOL_RATE_PARAMS = {
+    "httpx": "rate_limit",
+    "httpprobe": "rate_limit",
+    "dirsearch": "rate_limit",
+    "ffuf": "rate_limit"
+}
+
+# 同时向多个主机发送请求的工具（速率上限按目标主机数放大），其余工具逐个主机扫描
+MULTI_HOST_RATE_TOOLS = ["httpx", "httpprobe"]
+
+# 按目标IP分组调度的工具及单个IP的并发上限
+# 多个子域名解析到同一IP时，输入按IP轮流排列，并发数不超过 IP数 x 单IP并发
+POLITE_TOOLS = ["httpx", "httpprobe", "dirsearch", "ffuf"]
+PER_IP_CONCURRENCY = 10
+
+# 泛解析检测配置
+# 子域名处理时按父域探测随机子域名，解析IP与响应特征都和随机子域名相同的子域名只保留一个代表
+WILDCARD_DETECTION = True
+# 需要HTTP比对的候选子域名超过该数量时不再探测，直接按解析IP合并
+WILDCARD_PROBE_LIMIT = 2000
+# 响应特征中内容长度的分桶大小（字节），长度相近的页面视为相同
+RESPONSE_LENGTH_BUCKET = 256
+
+# 软404/泛目录校准配置
+# 目录挖掘前对每个站点请求若干随机路径作为基线，结果中与基线相同的响应被过滤；
+# 随机路径全部返回2xx的站点（任意路径都返回页面）不再执行字典扫描
+SOFT404_CALIBRATION = True
+SOFT404_PROBE_PATHS = 3
+SOFT404_SKIP_CATCHALL = True
+
+# 工具执行超时配置
+# 输入为文件时超时 = 基础时间 + 输入行数 x 每行秒数，不超过上限；单个目标只使用基础时间
+TOOL_TIMEOUT_BASE = 300
+TOOL_TIMEOUT_MAX = 24 * 3600
+TOOL_TIMEOUT_PER_LINE = {
+    "httpx": 0.5,
+    "httpprobe": 0.5,
+    "dnsresolve": 0.2,
+    "dirsearch": 120,
+    "ffuf": 60,
+    "fscan": 30,
+    "txportmap": 30,
+    "portscan": 30,
+}
+
+# 进度显示配置
+# 每个工具执行期间按结果文件的增长显示进度条，并按历史吞吐量（输入行数/秒）估算剩余时间
+PROGRESS_BAR = True
+PROGRESS_INTERVAL = 2                  # 刷新间隔（秒）
+PROGRESS_MIN_SECONDS = 1               # 执行时间短于该值的记录（如命中缓存）不计入历史吞吐量
+THROUGHPUT_FILE = CACHE_DIR / "throughput.json"
+# 运行状态文件目录（每个运行一个 <进程号>.json，原子替换写入，供外部程序轮询）
+STATUS_DIR = OUTPUTS_DIR / "status"
+
+# 流程索引缓存文件（名称、描述、修改时间、工具列表及校验结果）
+PROFILE_INDEX_FILE = CONFIG_DIR / "profile_index.json"
+
+# 用户扩展过滤规则文件
+FILTER_RULES_FILE = CONFIG_DIR / "filter_rules.json"
+
 # 日志配置
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 LOG_LEVEL = 'INFO'
 
+# 报告生成配置
+# 报告在独立进程池中生成，不阻塞后续目标的扫描；设为0则在每个目标结束时同步生成
+REPORT_WORKERS = 2
+REPORT_FORMAT = 'csv'
+
 # 默认参数配置
 DEFAULT_PARAMS = {
     "oneforall": {
@@ -144,6 +299,7 @@ DEFAULT_PARAMS = {
         "threads": 40,
         "timeout": 10,
         "mc": "200,301,302,403",
+        "auto_calibrate": True,  # ffuf自动校准，过滤泛目录响应
         "recursion": False,
         "recursion_depth": 2,
         "wordlist": None  # 字典路径，需要用户指定
@@ -159,6 +315,27 @@ DEFAULT_PARAMS = {
         "port_range": "top1000",
         "threads": 1000,
         "timeout": 3
+    },
+    "httpprobe": {
+        "threads": 50,
+        "timeout": 10,
+        "title": True,
+        "tech_detect": False,
+        "follow_redirects": False
+    },
+    "portscan": {
+        "port_range": "top1000",
+        "threads": 500,
+        "timeout": 3,
+        "banner": True
+    },
+    "dnsresolve": {
+        "threads": 200,
+        "timeout": 2,
+        "retries": 2,
+        "ipv6": True,
+        "wildcard": True,
+        "resolvers": ""  # 解析服务器列表（逗号分隔），为空时使用 DNS_RESOLVERS
     }
 }
 
@@ -183,15 +360,23 @@ def get_default_params(tool_name):
     return DEFAULT_PARAMS.get(tool_name, {}).copy()
 
 
+def ensure_dir(directory: Path) -> Path:
+    """确保目录存在（首次写入前调用）"""
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
 def get_output_dir(domain):
     """获取域名的输出目录"""
-    output_dir = OUTPUTS_DIR / domain
+    # CIDR目标中的'/'不能作为目录名
+    output_dir = OUTPUTS_DIR / domain.replace('/', '_')
     output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir
 
 
 def get_log_file(domain=None):
     """获取日志文件路径"""
+    ensure_dir(LOGS_DIR)
     if domain:
         return LOGS_DIR / f"{domain}.log"
     else:
@@ -4,35 +4,62 @@ Luna 核心逻辑模块
 """
 
 import logging
+from contextlib import nullcontext
+from itertools import chain
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterable, Sized, TYPE_CHECKING
 
-from .profile import Profile, ProfileManager
+from .profile import Profile, ProfileManager, ProfileRegistry
 from .utils import (
-    setup_logger, validate_domain, read_file_lines,
-    ask_yes_no, print_header, print_section, print_success,
-    print_error, print_info, print_warning, write_file_lines
+    setup_logger, ask_yes_no, print_header, print_section, print_success,
+    print_error, print_info, print_warning, write_file_lines, count_file_lines, lines_digest
 )
-from .config import get_output_dir, get_log_file
-from .tools_wrapper import get_tool_wrapper
-from .data_processor import DataProcessor
-from .report import generate_report
+from .config import (
+    get_output_dir, get_log_file, get_tool_path, get_tool_info,
+    REPORT_WORKERS, REPORT_FORMAT, POLITE_TOOLS, HTTP_PROBE_TOOLS, PORT_SCAN_TOOLS, BUILTIN_FALLBACKS,
+    SOFT404_CALIBRATION, SOFT404_SKIP_CATCHALL, TOOL_TIMEOUT_BASE, TOOL_TIMEOUT_MAX,
+    TOOL_TIMEOUT_PER_LINE, get_tool_type
+)
+
+# 执行流程相关的模块在运行时按需导入，list/show等命令不需要加载
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from .cache import ProbeCache
+    from .data_processor import DataProcessor
+    from .progress import RunProgress
+    from .targets import TargetStream
 
 
 class LunaCore:
     """Luna核心类"""
     
-    def __init__(self):
-        """初始化Luna核心"""
+    def __init__(self, use_cache: bool = True):
+        """
+        初始化Luna核心
+        
+        Args:
+            use_cache: 是否使用工具结果缓存
+        """
         self.logger = setup_logger("Luna", get_log_file())
+        self.use_cache = use_cache
+        self._probe_cache: Optional['ProbeCache'] = None
+        self._progress: Optional['RunProgress'] = None
+        
+        # 已写出的工具输入文件: 路径 -> (内容摘要, 文件大小, 修改时间)
+        self._input_files: Dict[str, Tuple[str, int, int]] = {}
+        
+        # 报告生成进程池及待完成的报告任务 (目标, 报告任务)
+        self._report_pool: Optional['ProcessPoolExecutor'] = None
+        self._report_jobs: List[Tuple[str, 'Future']] = []
+        self._report_failed = 0
     
-    def run_profile(self, profile_name: str, targets: List[str]) -> bool:
+    def run_profile(self, profile_name: str, targets: Iterable[str]) -> bool:
         """
         运行流程
         
         Args:
             profile_name: 流程名称
-            targets: 目标列表（域名）
+            targets: 目标列表或目标流（域名/IP/CIDR），按需逐个读取
         
         Returns:
             bool: 是否成功
@@ -43,9 +70,23 @@ class LunaCore:
             print_error(f"流程 '{profile_name}' 不存在")
             return False
         
+        errors = ProfileRegistry.errors(profile_name)
+        if errors:
+            print_error(f"流程 '{profile_name}' 无效:")
+            for error in errors:
+                print_error(f"  {error}")
+            return False
+        
+        # 预检：开始扫描前确认所有工具都存在
+        if not self._preflight_check(profile):
+            return False
+        
+        # 目标流不预先统计数量
+        total = len(targets) if isinstance(targets, Sized) else None
+        
         print_header(f"执行流程: {profile_name}")
         print(f"描述: {profile.description}")
-        print(f"目标数量: {len(targets)}")
+        print(f"目标数量: {total if total is not None else '流式读取'}")
         print(f"工具数量: {len(profile.tools)}")
         
         # 检查流程是否有参数配置
@@ -67,23 +108,84 @@ class LunaCore:
         success_count = 0
         failed_count = 0
         
-        for idx, target in enumerate(targets, 1):
-            print_header(f"[{idx}/{len(targets)}] 处理目标: {target}")
+        from .progress import RunProgress, format_duration
+        
+        self._report_failed = 0
+        self._progress = RunProgress(profile_name, total)
+        self.logger.info(f"运行状态文件: {self._progress.status_file}")
+        completed = False
+        self._start_report_pool()
+        try:
+            for idx, target in enumerate(targets, 1):
+                progress = f"{idx}/{total}" if total is not None else f"{idx}"
+                eta = self._progress.eta()
+                if eta is not None:
+                    progress += f"，预计剩余 {format_duration(eta)}"
+                print_header(f"[{progress}] 处理目标: {target}")
+                
+                self._progress.start_target(target, len(profile.tools))
+                if self._execute_profile_for_target(profile, target):
+                    success_count += 1
+                    self._progress.finish_target(True)
+                    print_success(f"{target} 处理完成")
+                else:
+                    failed_count += 1
+                    self._progress.finish_target(False)
+                    print_error(f"{target} 处理失败")
+                
+                # 输出已完成的报告，不等待仍在生成的报告
+                self._collect_reports(wait=False)
             
-            if self._execute_profile_for_target(profile, target):
-                success_count += 1
-                print_success(f"{target} 处理完成")
-            else:
-                failed_count += 1
-                print_error(f"{target} 处理失败")
+            # 等待剩余报告生成完成
+            if self._report_jobs:
+                print_section(f"等待 {len(self._report_jobs)} 个报告生成完成")
+            self._collect_reports(wait=True)
+            completed = True
+        finally:
+            self._shutdown_report_pool()
+            self._progress.finish(completed)
+            self._progress = None
         
         # 总结
         print_header("执行完成")
         print(f"成功: {success_count}")
         print(f"失败: {failed_count}")
+        if self._report_failed:
+            print(f"报告生成失败: {self._report_failed}")
         
         return failed_count == 0
     
+    def _preflight_check(self, profile: Profile) -> bool:
+        """
+        预检流程引用的工具是否存在
+        
+        Args:
+            profile: 流程对象
+        
+        Returns:
+            bool: 是否继续执行
+        """
+        missing = []
+        for tool_name in dict.fromkeys(tool['name'] for tool in profile.tools):
+            if get_tool_type(tool_name) == "builtin":
+                continue
+            tool_path = get_tool_path(tool_name)
+            if not tool_path or not tool_path.exists():
+                if tool_name in BUILTIN_FALLBACKS:
+                    print_info(f"{tool_name} 不存在，将使用内置引擎 {BUILTIN_FALLBACKS[tool_name]}")
+                    continue
+                missing.append((tool_name, tool_path))
+        
+        if not missing:
+            return True
+        
+        print_error("以下工具不存在:")
+        for tool_name, tool_path in missing:
+            name = get_tool_info(tool_name).get('name', tool_name)
+            print_error(f"  {name}: {tool_path}")
+        
+        return ask_yes_no("部分工具不存在，是否继续执行?", default=False)
+    
     def _check_profile_params(self, profile: Profile) -> bool:
         """
         检查流程是否已配置参数
@@ -141,8 +243,13 @@ class LunaCore:
         self.logger.info(f"开始处理目标: {target}")
         self.logger.info(f"输出目录: {output_dir}")
         
-        # 创建数据处理器
-        data_processor = DataProcessor(target, output_dir)
+        from .data_processor import DataProcessor
+        
+        # 创建数据处理器（泛解析检测使用流程中dnsresolve的解析服务器和参数）
+        dns_params = next(
+            (tool['params'] for tool in profile.tools if tool['name'] == 'dnsresolve'), None
+        )
+        data_processor = DataProcessor(target, output_dir, dns_params=dns_params)
         
         # 用于存储中间结果
         context = {
@@ -151,6 +258,7 @@ class LunaCore:
             'subdomains': [],
             'urls': [],
             'ips': [],
+            'ip_map': {},
             'ports': [],
             'http_probes': []
         }
@@ -184,20 +292,95 @@ class LunaCore:
         summary = data_processor.generate_summary()
         self.logger.info(f"数据汇总: {summary}")
         
-        # 生成报告
+        # 生成报告（提交到进程池，扫描结果不受报告失败影响）
+        self._submit_report(target, output_dir)
+        
+        return True
+    
+    def _start_report_pool(self):
+        """启动报告生成进程池（失败时降级为同步生成）"""
+        if REPORT_WORKERS <= 0:
+            return
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        try:
+            self._report_pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"无法创建报告进程池，改为同步生成报告: {e}")
+            self._report_pool = None
+    
+    def _shutdown_report_pool(self):
+        """关闭报告生成进程池"""
+        if self._report_pool:
+            self._report_pool.shutdown(wait=True)
+            self._report_pool = None
+        self._report_jobs = []
+    
+    def _submit_report(self, target: str, output_dir: Path):
+        """
+        提交报告生成任务
+        
+        Args:
+            target: 目标域名
+            output_dir: 输出目录
+        """
+        from .report import generate_report
+        
+        if self._report_pool:
+            try:
+                future = self._report_pool.submit(
+                    generate_report, target, output_dir, REPORT_FORMAT
+                )
+                self._report_jobs.append((target, future))
+                print_info(f"报告已提交后台生成: {target}")
+                return
+            except Exception as e:
+                # 进程池不可用（如子进程崩溃），后续报告改为同步生成
+                self.logger.warning(f"提交报告任务失败，改为同步生成: {e}")
+                self._report_pool = None
+        
         print_section("生成报告")
         try:
-            report_files, report_summary = generate_report(target, output_dir, format='csv')
-            print_success(f"报告生成完成")
-            print_info(f"Web资产: {report_summary['web_assets_count']} 条")
-            print_info(f"IP端口: {report_summary['ip_ports_count']} 条")
-            for report_file in report_files:
-                print_info(f"报告文件: {report_file}")
+            report_files, report_summary = generate_report(target, output_dir, format=REPORT_FORMAT)
+            self._print_report_result(target, report_files, report_summary)
         except Exception as e:
+            self._report_failed += 1
             self.logger.exception(f"生成报告失败: {e}")
             print_error(f"生成报告失败: {e}")
+    
+    def _collect_reports(self, wait: bool = False):
+        """
+        收集已完成的报告任务并输出结果
         
-        return True
+        Args:
+            wait: 是否等待所有报告完成
+        """
+        pending = []
+        
+        for target, future in self._report_jobs:
+            if not wait and not future.done():
+                pending.append((target, future))
+                continue
+            
+            try:
+                report_files, report_summary = future.result()
+                self._print_report_result(target, report_files, report_summary)
+            except Exception as e:
+                self._report_failed += 1
+                self.logger.error(f"{target} 生成报告失败: {e}")
+                print_error(f"{target} 生成报告失败: {e}")
+        
+        self._report_jobs = pending
+    
+    def _print_report_result(self, target: str, report_files: List[Path],
+                             report_summary: Dict[str, Any]):
+        """输出报告生成结果"""
+        print_success(f"{target} 报告生成完成")
+        print_info(f"Web资产: {report_summary['web_assets_count']} 条")
+        print_info(f"IP端口: {report_summary['ip_ports_count']} 条")
+        for report_file in report_files:
+            print_info(f"报告文件: {report_file}")
     
     def create_profile(self, name: Optional[str] = None, 
                       from_profile: Optional[str] = None) -> bool:
@@ -226,7 +409,9 @@ class LunaCore:
     
     def list_profiles(self):
         """列出所有流程"""
-        profiles = ProfileManager.list_profiles()
+        # 使用流程索引，未变化的流程文件不重新解析
+        index = ProfileRegistry.index()
+        profiles = sorted(index)
         
         if not profiles:
             print_info("暂无流程")
@@ -240,18 +425,20 @@ class LunaCore:
         print("内置流程:")
         for name in builtin:
             if name in profiles:
-                profile = Profile.load(name)
-                if profile:
-                    print(f"  - {name:<15} {profile.description}")
+                self._print_profile_entry(name, index[name])
         
         # 自定义流程
         custom = [p for p in profiles if p not in builtin]
         if custom:
             print("\n自定义流程:")
             for name in custom:
-                profile = Profile.load(name)
-                if profile:
-                    print(f"  - {name:<15} {profile.description}")
+                self._print_profile_entry(name, index[name])
+    
+    def _print_profile_entry(self, name: str, entry: Dict[str, Any]):
+        """输出流程列表中的一项"""
+        print(f"  - {name:<15} {entry.get('description', '')}")
+        if entry.get('errors'):
+            print_warning(f"    流程无效: {'; '.join(entry['errors'])}")
     
     def show_profile(self, name: str):
         """
@@ -299,50 +486,26 @@ class LunaCore:
             return False
     
     def parse_targets(self, target: Optional[str] = None, 
-                     target_file: Optional[str] = None) -> List[str]:
+                     target_file: Optional[str] = None) -> 'TargetStream':
         """
         解析目标
         
+        目标按输入顺序流式读取、规范化和去重，不会一次性加载整个目标文件
+        
         Args:
             target: 单个目标或逗号分隔的多个目标
             target_file: 目标文件路径
         
         Returns:
-            List[str]: 目标列表
-        """
-        targets = []
-        
-        # 从命令行参数获取
-        if target:
-            # 支持逗号分隔
-            for t in target.split(','):
-                t = t.strip()
-                if t and validate_domain(t):
-                    targets.append(t)
-                elif t:
-                    print_warning(f"无效的域名: {t}")
-        
-        # 从文件获取
-        if target_file:
-            file_path = Path(target_file)
-            if file_path.exists():
-                lines = read_file_lines(file_path)
-                for line in lines:
-                    if validate_domain(line):
-                        targets.append(line)
-                    else:
-                        print_warning(f"无效的域名: {line}")
-            else:
-                print_error(f"文件不存在: {target_file}")
-        
-        # 去重
-        targets = list(set(targets))
+            TargetStream: 目标流
+        """
+        from .targets import TargetStream
         
-        return targets
+        return TargetStream(target, target_file)
     
     def _execute_tool(self, tool_name: str, alias: str, target: str, 
                      params: Dict[str, Any], output_dir: Path, 
-                     context: Dict[str, Any], data_processor: DataProcessor) -> bool:
+                     context: Dict[str, Any], data_processor: 'DataProcessor') -> bool:
         """
         执行单个工具
         
@@ -358,15 +521,43 @@ class LunaCore:
         Returns:
             bool: 是否成功
         """
+        from .tools_wrapper import ToolResult, get_tool_wrapper
+        
         try:
             # 获取工具封装
             wrapper = get_tool_wrapper(tool_name, output_dir)
             
             # 准备目标输入
-            tool_target = self._prepare_tool_target(tool_name, target, context)
+            tool_target = self._prepare_tool_target(tool_name, target, context, data_processor)
             
-            # 执行工具
-            result = wrapper.execute(tool_target, params)
+            # 按输入涉及的目标IP数限制并发和速率
+            if tool_name in POLITE_TOOLS:
+                from .scheduler import PolitenessScheduler
+                
+                ip_count = context.pop('scan_ip_count', 1)
+                params = PolitenessScheduler(context['ip_map']).limit_params(
+                    tool_name, params, ip_count
+                )
+            
+            # 泛解析只在目标域名及其子域下检测，不探测目标之上的父域
+            if tool_name == 'dnsresolve':
+                params = dict(params, scope=[target])
+            
+            # 执行工具（输入已全部由缓存提供时跳过执行）
+            if tool_target is None:
+                print_info("所有输入均命中缓存，跳过执行")
+                result = ToolResult(success=True)
+            else:
+                # 执行期间按结果目录的增长刷新进度
+                watch_dir = getattr(wrapper, 'module_dir', output_dir)
+                tracker = (self._progress.track_stage(tool_name, alias, tool_target, watch_dir)
+                           if self._progress is not None else nullcontext())
+                with tracker as stage:
+                    result = wrapper.execute(tool_target, params,
+                                             timeout=self._tool_timeout(tool_name, tool_target),
+                                             use_cache=self.use_cache)
+                    if stage is not None:
+                        stage.success = result.success
             
             if not result.success:
                 self.logger.error(f"{alias} 执行失败: {result.error}")
@@ -381,7 +572,28 @@ class LunaCore:
             self.logger.exception(f"执行 {alias} 时发生异常: {e}")
             return False
     
-    def _prepare_tool_target(self, tool_name: str, target: str, context: Dict[str, Any]) -> str:
+    @staticmethod
+    def _tool_timeout(tool_name: str, tool_target: str) -> int:
+        """
+        按输入行数计算工具的超时时间
+        
+        Args:
+            tool_name: 工具名称
+            tool_target: 目标或输入文件路径
+        
+        Returns:
+            int: 超时时间（秒）
+        """
+        per_line = TOOL_TIMEOUT_PER_LINE.get(tool_name, 0)
+        if not per_line or not Path(tool_target).is_file():
+            return TOOL_TIMEOUT_BASE
+        
+        lines = count_file_lines(tool_target)
+        return int(min(TOOL_TIMEOUT_MAX, TOOL_TIMEOUT_BASE + lines * per_line))
+    
+    def _prepare_tool_target(self, tool_name: str, target: str,
+                             context: Dict[str, Any],
+                             data_processor: 'DataProcessor') -> Optional[str]:
         """
         为工具准备目标输入
         
@@ -389,55 +601,236 @@ class LunaCore:
             tool_name: 工具名称
             target: 原始目标
             context: 上下文数据
+            data_processor: 数据处理器
         
         Returns:
-            str: 工具的目标输入（可能是文件路径）
+            Optional[str]: 工具的目标输入（可能是文件路径），输入全部命中缓存时返回None
         """
         # 子域名收集工具直接使用目标域名
         if tool_name in ['oneforall', 'puzzle']:
             return target
         
+        # DNS解析使用子域名列表
+        if tool_name == 'dnsresolve':
+            if context['subdomains']:
+                resolve_file = context['output_dir'] / 'subdomains_for_resolve.txt'
+                return self._write_input_file(resolve_file, context['subdomains'])
+            else:
+                return target
+        
         # 目录挖掘工具使用子域名列表
         if tool_name in ['dirsearch', 'ffuf']:
             if context['subdomains']:
                 # 创建子域名文件
                 subdomain_file = context['output_dir'] / 'subdomains_for_scan.txt'
-                # 为子域名添加http://前缀
-                urls = [f"http://{sub}" for sub in context['subdomains']]
-                write_file_lines(subdomain_file, urls)
-                return str(subdomain_file)
+                # 为子域名添加http://前缀（响应特征重复的站点只扫描代表）
+                subdomains = self._exclude_duplicate_hosts(context['subdomains'], context)
+                urls = [f"http://{sub}" for sub in subdomains]
+                urls = self._exclude_catchall_hosts(urls, data_processor)
+                urls = self._schedule_inputs(urls, context)
+                return self._write_input_file(subdomain_file, urls)
             else:
                 return target
         
         # HTTP探测工具
-        if tool_name == 'httpx':
+        if tool_name in HTTP_PROBE_TOOLS:
             # 如果有URL列表，使用URL列表
             if context['urls']:
-                url_file = context['output_dir'] / 'urls_for_probe.txt'
-                write_file_lines(url_file, context['urls'])
-                return str(url_file)
+                probe_file = context['output_dir'] / 'urls_for_probe.txt'
+                urls = context['urls']
             # 如果有子域名，使用子域名
             elif context['subdomains']:
-                subdomain_file = context['output_dir'] / 'subdomains_for_probe.txt'
+                probe_file = context['output_dir'] / 'subdomains_for_probe.txt'
                 urls = [f"http://{sub}" for sub in context['subdomains']]
-                write_file_lines(subdomain_file, urls)
-                return str(subdomain_file)
             else:
                 return target
+            
+            # 有效期内已探测过的URL直接使用缓存结果
+            urls = self._exclude_cached_probes(urls, context)
+            if not urls:
+                return None
+            
+            urls = self._schedule_inputs(urls, context)
+            return self._write_input_file(probe_file, urls)
         
         # 端口扫描工具使用IP列表
-        if tool_name in ['txportmap', 'fscan']:
+        if tool_name in PORT_SCAN_TOOLS:
             if context['ips']:
                 ip_file = context['output_dir'] / 'ips_for_scan.txt'
-                write_file_lines(ip_file, context['ips'])
-                return str(ip_file)
+                return self._write_input_file(ip_file, context['ips'])
             else:
                 return target
         
         return target
     
+    def _write_input_file(self, file_path: Path, lines: List[str]) -> str:
+        """
+        写出工具输入文件（内容与上次写出的相同且文件未被改动时不重写）
+        
+        Args:
+            file_path: 文件路径
+            lines: 输入行
+        
+        Returns:
+            str: 文件路径
+        """
+        key = str(file_path)
+        digest = lines_digest(lines)
+        
+        known = self._input_files.get(key)
+        if known and known[0] == digest:
+            try:
+                stat = file_path.stat()
+                if (stat.st_size, stat.st_mtime_ns) == known[1:]:
+                    self.logger.debug(f"输入未变化，复用 {file_path.name}")
+                    return key
+            except OSError:
+                pass
+        
+        write_file_lines(file_path, lines)
+        stat = file_path.stat()
+        self._input_files[key] = (digest, stat.st_size, stat.st_mtime_ns)
+        return key
+    
+    def _schedule_inputs(self, urls: List[str], context: Dict[str, Any]) -> List[str]:
+        """
+        按目标IP轮流排列扫描输入，并记录涉及的IP数（用于限制工具并发）
+        
+        Args:
+            urls: 扫描输入
+            context: 上下文数据
+        
+        Returns:
+            List[str]: 重新排列后的输入
+        """
+        from .scheduler import PolitenessScheduler
+        
+        urls, ip_count = PolitenessScheduler(context['ip_map']).interleave(urls)
+        context['scan_ip_count'] = ip_count
+        
+        if context['ip_map'] and ip_count < len(urls):
+            print_info(f"{len(urls)} 个目标分布在 {ip_count} 个IP上，按IP轮流扫描")
+        
+        return urls
+    
+    def _exclude_duplicate_hosts(self, subdomains: List[str], context: Dict[str, Any]) -> List[str]:
+        """
+        排除探测结果全部被聚类为重复的子域名
+        
+        没有探测结果的子域名保留（无法判断是否重复）
+        
+        Args:
+            subdomains: 子域名列表
+            context: 上下文数据
+        
+        Returns:
+            List[str]: 需要扫描的子域名
+        """
+        from urllib.parse import urlsplit
+        
+        # 子域名 -> 是否有代表性的探测结果
+        representative: Dict[str, bool] = {}
+        for probe in context['http_probes']:
+            host = urlsplit(probe.get('url', '')).hostname
+            if host:
+                representative[host] = representative.get(host, False) or not probe.get('duplicate')
+        
+        kept = [sub for sub in subdomains if representative.get(sub, True)]
+        skipped = len(subdomains) - len(kept)
+        if skipped:
+            print_info(f"跳过 {skipped} 个响应特征重复的站点，只扫描每组的代表")
+        
+        return kept
+    
+    def _exclude_catchall_hosts(self, urls: List[str],
+                                data_processor: 'DataProcessor') -> List[str]:
+        """
+        软404校准，并排除任意路径都返回页面的站点
+        
+        Args:
+            urls: 目录挖掘输入
+            data_processor: 数据处理器（保存校准基线，用于过滤结果）
+        
+        Returns:
+            List[str]: 需要字典扫描的URL
+        """
+        if not SOFT404_CALIBRATION or not urls:
+            return urls
+        
+        catchall = data_processor.calibrate_directory_baselines(urls)
+        if not catchall or not SOFT404_SKIP_CATCHALL:
+            return urls
+        
+        from urllib.parse import urlsplit
+        
+        print_info(f"跳过 {len(catchall)} 个任意路径都返回页面的站点")
+        return [url for url in urls if urlsplit(url).netloc.lower() not in catchall]
+    
+    def _get_probe_cache(self) -> 'ProbeCache':
+        """获取HTTP探测缓存（首次使用时创建）"""
+        if self._probe_cache is None:
+            from .cache import ProbeCache
+            self._probe_cache = ProbeCache()
+        return self._probe_cache
+    
+    def _exclude_cached_probes(self, urls: List[str], context: Dict[str, Any]) -> List[str]:
+        """
+        从探测输入中排除缓存有效的URL
+        
+        缓存中的探测结果保存在上下文中，处理httpx结果时一并合并
+        
+        Args:
+            urls: 探测输入
+            context: 上下文数据
+        
+        Returns:
+            List[str]: 需要实际探测的URL
+        """
+        context['cached_probes'] = []
+        context['pending_probes'] = None
+        
+        if not self.use_cache:
+            return urls
+        
+        cached, pending = self._get_probe_cache().split(urls)
+        context['cached_probes'] = cached
+        context['pending_probes'] = pending
+        
+        hits = len(urls) - len(pending)
+        if hits:
+            print_info(f"探测缓存命中 {hits} 个URL，待探测 {len(pending)} 个")
+        
+        return pending
+    
+    def _merge_cached_probes(self, data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        保存本次探测结果到缓存，并合并缓存中的探测结果
+        
+        Args:
+            data: httpx解析后的数据
+            context: 上下文数据
+        
+        Returns:
+            Dict: 合并缓存结果后的数据
+        """
+        pending = context.pop('pending_probes', None)
+        cached = context.pop('cached_probes', [])
+        results = data.get('results', [])
+        
+        if pending:
+            self._get_probe_cache().store(pending, results)
+        
+        if not cached:
+            return data
+        
+        from .parsers import RecordStream
+        
+        merged = dict(data)
+        merged['results'] = RecordStream(lambda: chain(cached, results))
+        return merged
+    
     def _process_tool_result(self, tool_name: str, alias: str, result: Any,
-                            context: Dict[str, Any], data_processor: DataProcessor):
+                            context: Dict[str, Any], data_processor: 'DataProcessor'):
         """
         处理工具执行结果
         
@@ -461,14 +854,18 @@ class LunaCore:
                     puzzle_data=data
                 )
                 # puzzle还会返回IP
-                if 'ips' in data:
-                    context['ips'].extend(data['ips'])
-                    context['ips'] = list(set(context['ips']))  # 去重
+                self._merge_ip_data(data, context)
             
             context['subdomains'].extend(subdomains)
             context['subdomains'] = list(set(context['subdomains']))  # 去重
             print_info(f"当前共有 {len(context['subdomains'])} 个子域名")
         
+        # 处理DNS解析结果
+        elif tool_name == 'dnsresolve':
+            data_processor.process_dns_results(data)
+            self._merge_ip_data(data, context)
+            print_info(f"当前共有 {len(context['ips'])} 个IP")
+        
         # 处理目录挖掘结果
         elif tool_name in ['dirsearch', 'ffuf']:
             if tool_name == 'dirsearch':
@@ -481,20 +878,41 @@ class LunaCore:
             print_info(f"当前共有 {len(context['urls'])} 个URL")
         
         # 处理HTTP探测结果
-        elif tool_name == 'httpx':
+        elif tool_name in HTTP_PROBE_TOOLS:
+            data = self._merge_cached_probes(data, context)
             probes = data_processor.process_http_probe_results(data, alias)
             context['http_probes'].extend(probes)
             print_info(f"探测到 {len(probes)} 个HTTP服务")
         
         # 处理端口扫描结果
-        elif tool_name in ['txportmap', 'fscan']:
-            if tool_name == 'txportmap':
-                ports = data_processor.process_port_scan_results(txportmap_data=data)
-            else:  # fscan
+        elif tool_name in PORT_SCAN_TOOLS:
+            if tool_name == 'fscan':
                 ports = data_processor.process_port_scan_results(fscan_data=data)
+            else:  # txportmap及内置端口扫描（记录格式相同）
+                ports = data_processor.process_port_scan_results(txportmap_data=data)
             
-            context['ports'].extend(ports)
-            print_info(f"当前共有 {len(context['ports'])} 个开放端口")
+            # 端口结果由数据处理器以紧凑形式累积保存
+            context['ports'] = data_processor.ports
+            print_info(f"本次发现 {len(ports)} 个开放端口，当前共有 {len(context['ports'])} 个")
+            if data.get('findings'):
+                print_warning(f"发现 {len(data['findings'])} 个漏洞/弱口令")
+    
+    def _merge_ip_data(self, data: Dict[str, Any], context: Dict[str, Any]):
+        """
+        合并工具返回的IP列表和子域名 -> IP映射
+        
+        Args:
+            data: 工具解析后的数据
+            context: 上下文数据
+        """
+        if 'ips' in data:
+            context['ips'].extend(data['ips'])
+            context['ips'] = list(set(context['ips']))  # 去重
+        
+        # 子域名 -> IP 映射（用于按IP调度扫描）
+        for subdomain, ips in data.get('ip_map', {}).items():
+            known = context['ip_map'].setdefault(subdomain, [])
+            known.extend(ip for ip in ips if ip not in known)
     
     def _is_critical_tool(self, tool_name: str) -> bool:
         """
@@ -6,37 +6,63 @@ Luna 数据处理模块
 import re
 import json
 import csv
+import secrets
 from pathlib import Path
-from typing import List, Dict, Any, Set, Optional
+from typing import List, Dict, Any, Set, Optional, Iterable, Iterator
 from collections import defaultdict
+from urllib.parse import urlsplit
 
 from .utils import (
     read_file_lines, write_file_lines, 
-    filter_email_domains, merge_and_deduplicate,
-    setup_logger
+    merge_and_deduplicate, setup_logger
+)
+from .filters import get_domain_filter
+from .targets import canonicalize_url
+from .store import StringTable, UrlStore, PortStore, PortMap
+from .scope import ScopeIndex
+from .fingerprint import response_fingerprint, cluster_probes, matches_baseline
+from .config import (
+    DEFAULT_PARAMS, WILDCARD_DETECTION, WILDCARD_PROBE_LIMIT,
+    SOFT404_PROBE_PATHS, SCOPE_FILTER
 )
 
 
 class DataProcessor:
     """数据处理器"""
     
-    def __init__(self, domain: str, output_dir: Path):
+    def __init__(self, domain: str, output_dir: Path,
+                 dns_params: Optional[Dict[str, Any]] = None):
         """
         初始化数据处理器
         
         Args:
             domain: 主域名
             output_dir: 输出目录
+            dns_params: 泛解析检测使用的DNS参数（流程中dnsresolve的参数），默认使用默认参数
         """
         self.domain = domain
         self.output_dir = output_dir
+        self.dns_params = dns_params if dns_params is not None else DEFAULT_PARAMS["dnsresolve"]
         self.logger = setup_logger(f"Luna.DataProcessor.{domain}")
         
-        # 数据存储
-        self.subdomains: List[Dict[str, Any]] = []
-        self.urls: List[Dict[str, Any]] = []
-        self.ports: List[Dict[str, Any]] = []
+        # 目标范围（用于尽早丢弃范围外的发现）
+        self.scope = ScopeIndex([domain]) if SCOPE_FILTER else None
+        
+        # 数据存储（子域名、URL和端口数量可能很大，使用紧凑存储）
+        self.subdomains = StringTable()
+        self.urls = UrlStore()
+        self.ports = PortStore()
+        # 上次运行的端口位图（首次处理端口结果时加载，用于对比端口变化）
+        self._previous_ports: Optional[PortMap] = None
         self.http_probes: List[Dict[str, Any]] = []
+        self.findings: List[Dict[str, Any]] = []
+        self.dns_records: List[Dict[str, Any]] = []
+        self.wildcard_clusters: List[Dict[str, Any]] = []
+        # 站点 -> 随机路径的基线响应 (状态码, 内容长度)，以及任意路径都返回页面的站点
+        self.soft404_baselines: Dict[str, List[tuple]] = {}
+        self.catchall_hosts: Set[str] = set()
+        self._soft404_filtered = 0
+        self._out_of_scope = 0
     
     def process_subdomain_results(self, oneforall_data: Dict = None, 
                                   puzzle_data: Dict = None) -> List[str]:
@@ -70,16 +96,179 @@ class DataProcessor:
         unique_subdomains = list(set(all_subdomains))
         self.logger.info(f"合并去重后: {len(unique_subdomains)} 个子域名")
         
-        # 过滤邮件域名
-        filtered_subdomains = filter_email_domains(unique_subdomains)
+        # 丢弃范围外的子域名
+        if self.scope:
+            in_scope = [sub for sub in unique_subdomains if self.scope.in_scope(sub)]
+            if len(in_scope) < len(unique_subdomains):
+                self.logger.info(f"过滤范围外子域名: 移除 {len(unique_subdomains) - len(in_scope)} 个")
+            unique_subdomains = in_scope
+        
+        # 按启用的规则集过滤（默认只过滤邮件域名）
+        filtered_subdomains = list(get_domain_filter().filter(unique_subdomains))
         removed_count = len(unique_subdomains) - len(filtered_subdomains)
-        self.logger.info(f"过滤邮件域名: 移除 {removed_count} 个")
+        self.logger.info(f"过滤邮件等域名: 移除 {removed_count} 个")
+        
+        # 泛解析子域名合并为代表（在生成扫描列表之前）
+        if WILDCARD_DETECTION and filtered_subdomains:
+            filtered_subdomains = self._prune_wildcards(filtered_subdomains)
         
         # 保存结果
+        self.subdomains.update(filtered_subdomains)
         self._save_subdomains(filtered_subdomains)
         
         return filtered_subdomains
     
+    def _prune_wildcards(self, subdomains: List[str]) -> List[str]:
+        """
+        合并泛解析子域名
+        
+        按父域探测随机子域名确定泛解析IP，解析结果落在泛解析IP内的子域名按 (父域, IP) 分组；
+        再用HTTP探测比对这些子域名与随机子域名的响应特征，特征不同的（真实配置的站点）保留，
+        其余每组只保留一个代表。候选子域名超过探测上限时无法比对响应特征，
+        分组只记录不移除（共享IP上可能有真实站点）
+        
+        Args:
+            subdomains: 子域名列表
+        
+        Returns:
+            List[str]: 合并后的子域名列表（保持原有顺序）
+        """
+        from .engines import HttpProber
+        from .modules import create_dns_resolver
+        
+        resolver = create_dns_resolver(dict(self.dns_params, scope=[self.domain]))
+        
+        try:
+            records, wildcards = resolver.lookup(subdomains)
+        except OSError as e:
+            self.logger.warning(f"泛解析检测失败: {e}")
+            return subdomains
+        
+        if not wildcards:
+            return subdomains
+        
+        # (父域, 解析IP) -> 候选子域名
+        groups: Dict[tuple, List[str]] = defaultdict(list)
+        for subdomain in subdomains:
+            record = records.get(subdomain)
+            if record and record.get('wildcard'):
+                zone = resolver.zone_for(subdomain)
+                groups[(zone, tuple(sorted(record['ips'])))].append(subdomain)
+        
+        candidates = [subdomain for members in groups.values() for subdomain in members]
+        if not candidates:
+            return subdomains
+        
+        # 候选子域名及每个父域的随机子域名的响应特征
+        fingerprints: Dict[str, tuple] = {}
+        baselines: Dict[str, str] = {}
+        probed = len(candidates) <= WILDCARD_PROBE_LIMIT
+        if probed:
+            for zone, _ in groups:
+                baselines.setdefault(zone, f"{secrets.token_hex(6)}.{zone}")
+            
+            http_params = DEFAULT_PARAMS["httpprobe"]
+            prober = HttpProber(threads=http_params["threads"], timeout=http_params["timeout"])
+            for probe in prober.probe_all(candidates + list(baselines.values())):
+                fingerprints[probe['input']] = response_fingerprint(probe)
+        else:
+            self.logger.info(f"泛解析候选子域名 {len(candidates)} 个，超过探测上限，只记录分组不移除")
+        
+        removed: Set[str] = set()
+        clusters = []
+        for (zone, ips), members in groups.items():
+            baseline_fingerprint = None
+            if probed:
+                baseline_fingerprint = fingerprints.get(baselines[zone])
+                members = [m for m in members if fingerprints.get(m) == baseline_fingerprint]
+            
+            if len(members) < 2:
+                continue
+            
+            # 只有响应特征与随机子域名相同的成员才能合并
+            if probed:
+                removed.update(members[1:])
+            clusters.append({
+                'zone': zone,
+                'ips': list(ips),
+                'fingerprint': list(baseline_fingerprint) if baseline_fingerprint else None,
+                'pruned': probed,
+                'representative': members[0],
+                'count': len(members),
+                'members': members
+            })
+        
+        if not clusters:
+            return subdomains
+        
+        self.wildcard_clusters.extend(clusters)
+        self._save_wildcard_clusters(self.wildcard_clusters)
+        self.logger.info(f"泛解析合并: {len(clusters)} 组，移除 {len(removed)} 个子域名")
+        
+        return [subdomain for subdomain in subdomains if subdomain not in removed]
+    
+    def calibrate_directory_baselines(self, urls: List[str]) -> Set[str]:
+        """
+        目录挖掘前的软404校准
+        
+        对每个站点请求若干随机路径，非404的响应作为基线（用于过滤目录挖掘结果）；
+        随机路径全部返回2xx的站点视为任意路径都返回页面（catch-all）
+        
+        Args:
+            urls: 站点URL列表（已校准过的站点不再请求）
+        
+        Returns:
+            Set[str]: catch-all站点（host[:port]）
+        """
+        from .engines import HttpProber
+        
+        hosts = set()
+        pending = {}
+        for url in urls:
+            host = urlsplit(url).netloc.lower()
+            hosts.add(host)
+            if host and host not in self.soft404_baselines and host not in pending:
+                pending[host] = url.rstrip('/')
+        
+        if not pending:
+            return hosts & self.catchall_hosts
+        
+        self.logger.info(f"软404校准: {len(pending)} 个站点")
+        
+        probe_urls = [
+            f"{base}/{secrets.token_hex(8)}"
+            for base in pending.values()
+            for _ in range(SOFT404_PROBE_PATHS)
+        ]
+        http_params = DEFAULT_PARAMS["httpprobe"]
+        prober = HttpProber(threads=http_params["threads"], timeout=http_params["timeout"])
+        
+        responses: Dict[str, List[tuple]] = defaultdict(list)
+        for probe in prober.probe_all(probe_urls):
+            host = urlsplit(probe.get('input') or probe.get('url', '')).netloc.lower()
+            responses[host].append((probe.get('status_code') or 0, probe.get('content_length') or 0))
+        
+        for host in pending:
+            baselines = [r for r in responses.get(host, []) if r[0] != 404]
+            self.soft404_baselines[host] = baselines
+            if (len(baselines) == SOFT404_PROBE_PATHS
+                    and all(200 <= status < 300 for status, _ in baselines)):
+                self.catchall_hosts.add(host)
+        
+        self._save_soft404_baselines()
+        
+        catchall = hosts & self.catchall_hosts
+        if catchall:
+            self.logger.info(f"软404校准: {len(catchall)} 个站点对任意路径都返回页面")
+        return catchall
+    
+    def _is_soft404(self, item: Dict[str, Any]) -> bool:
+        """目录挖掘结果是否与所在站点的基线响应相同"""
+        baselines = self.soft404_baselines.get(urlsplit(item.get('url', '')).netloc.lower())
+        if not baselines:
+            return False
+        return matches_baseline(item.get('status') or 0, item.get('length') or 0, baselines)
+    
     def process_directory_results(self, dirsearch_data: Dict = None,
                                   ffuf_data: Dict = None) -> List[str]:
         """
@@ -94,25 +283,34 @@ class DataProcessor:
         """
         self.logger.info("处理目录挖掘结果")
         
-        all_urls = []
+        # 逐条去重（保持发现顺序），不需要先把结果全部读入列表
+        all_urls = UrlStore()
+        
+        # 与软404基线相同的结果、范围外的URL不计入
+        self._soft404_filtered = 0
+        self._out_of_scope = 0
         
         # 处理dirsearch结果
         if dirsearch_data:
-            urls = self._parse_dirsearch_urls(dirsearch_data)
-            all_urls.extend(urls)
-            self.logger.info(f"dirsearch发现 {len(urls)} 个URL")
+            count = self._collect_urls(self._parse_dirsearch_urls(dirsearch_data), all_urls)
+            self.logger.info(f"dirsearch发现 {count} 个URL")
         
         # 处理ffuf结果
         if ffuf_data:
-            urls = self._parse_ffuf_urls(ffuf_data)
-            all_urls.extend(urls)
-            self.logger.info(f"ffuf发现 {len(urls)} 个URL")
+            count = self._collect_urls(self._parse_ffuf_urls(ffuf_data), all_urls)
+            self.logger.info(f"ffuf发现 {count} 个URL")
+        
+        if self._soft404_filtered:
+            self.logger.info(f"过滤软404结果: {self._soft404_filtered} 个")
+        if self._out_of_scope:
+            self.logger.info(f"过滤范围外URL: {self._out_of_scope} 个")
         
         # 去重
-        unique_urls = list(set(all_urls))
+        unique_urls = list(all_urls)
         self.logger.info(f"合并去重后: {len(unique_urls)} 个URL")
         
         # 保存结果
+        self.urls.update(unique_urls)
         self._save_urls(unique_urls)
         
         return unique_urls
@@ -134,16 +332,40 @@ class DataProcessor:
         probes = self._parse_httpx_results(httpx_data)
         self.logger.info(f"探测到 {len(probes)} 个HTTP服务")
         
-        # 添加到总列表
+        # 添加到总列表，并按响应特征聚类（跨多次调用标记重复）
         self.http_probes.extend(probes)
+        duplicates = cluster_probes(self.http_probes)
+        if duplicates:
+            self.logger.info(f"响应特征聚类: {duplicates} 个HTTP服务与其他服务重复")
         
         # 保存结果
         self._save_http_probes(probes, alias)
         
         return probes
     
+    def process_dns_results(self, dns_data: Dict) -> List[Dict[str, Any]]:
+        """
+        处理DNS解析结果
+        
+        Args:
+            dns_data: dnsresolve的输出数据
+        
+        Returns:
+            List[Dict]: 解析记录列表
+        """
+        self.logger.info("处理DNS解析结果")
+        
+        records = list(dns_data.get('results', []))
+        wildcard_count = sum(1 for record in records if record.get('wildcard'))
+        self.logger.info(f"解析成功 {len(records)} 个子域名，其中泛解析 {wildcard_count} 个")
+        
+        self.dns_records = records
+        self._save_dns_records(records)
+        
+        return records
+    
     def process_port_scan_results(self, txportmap_data: Dict = None,
-                                  fscan_data: Dict = None) -> List[Dict[str, Any]]:
+                                  fscan_data: Dict = None) -> PortStore:
         """
         处理端口扫描结果
         
@@ -152,34 +374,82 @@ class DataProcessor:
             fscan_data: fscan的输出数据
         
         Returns:
-            List[Dict]: 端口扫描结果列表
+            PortStore: 本次的端口扫描结果（已去重）
         """
         self.logger.info("处理端口扫描结果")
         
-        all_ports = []
+        # 逐条加入紧凑存储，同时按IP+端口去重
+        unique_ports = PortStore()
         
         # 处理TXPortMap结果
         if txportmap_data:
-            ports = self._parse_txportmap_ports(txportmap_data)
-            all_ports.extend(ports)
-            self.logger.info(f"TXPortMap发现 {len(ports)} 个开放端口")
+            count = len(unique_ports)
+            unique_ports.update(self._parse_txportmap_ports(txportmap_data))
+            self.logger.info(f"TXPortMap发现 {len(unique_ports) - count} 个开放端口")
         
         # 处理fscan结果
         if fscan_data:
-            ports = self._parse_fscan_ports(fscan_data)
-            all_ports.extend(ports)
-            self.logger.info(f"fscan发现 {len(ports)} 个开放端口")
+            count = len(unique_ports)
+            unique_ports.update(self._parse_fscan_ports(fscan_data))
+            self.logger.info(f"fscan发现 {len(unique_ports) - count} 个开放端口")
+            self._process_fscan_extras(fscan_data)
         
-        # 去重（基于IP+端口）
-        unique_ports = self._deduplicate_ports(all_ports)
         self.logger.info(f"合并去重后: {len(unique_ports)} 个开放端口")
         
-        # 保存结果
-        self.ports = unique_ports
-        self._save_ports(unique_ports)
+        # 保存结果（与之前的端口扫描结果合并）
+        self.ports.update(unique_ports)
+        self._save_ports(self.ports)
+        self._save_port_diff()
         
         return unique_ports
     
+    def ips_with_port(self, port: int) -> List[str]:
+        """
+        查询开放了指定端口的IP
+        
+        Args:
+            port: 端口
+        
+        Returns:
+            List[str]: IP列表
+        """
+        return self.ports.port_map.ips_with_port(port)
+    
+    def _load_previous_ports(self) -> PortMap:
+        """加载上次运行保存的端口位图"""
+        if self._previous_ports is None:
+            bitmap_file = self.output_dir / "port_bitmaps.json"
+            data = {}
+            if bitmap_file.exists():
+                try:
+                    with open(bitmap_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"加载上次的端口位图失败: {e}")
+            self._previous_ports = PortMap.from_json(data if isinstance(data, dict) else {})
+        return self._previous_ports
+    
+    def _save_port_diff(self):
+        """
+        对比上次运行的开放端口，保存新增/关闭的端口和本次的端口位图
+        
+        首次运行（没有上次的位图）时只保存位图
+        """
+        previous = self._load_previous_ports()
+        current = self.ports.port_map
+        
+        if previous:
+            opened = current.difference(previous)
+            closed = previous.difference(current)
+            output_file = self.output_dir / "port_diff.json"
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump({'opened': opened.to_dict(), 'closed': closed.to_dict()},
+                          f, indent=2, ensure_ascii=False)
+            self.logger.info(f"端口变化: 新增 {len(opened)} 个, 关闭 {len(closed)} 个")
+        
+        with open(self.output_dir / "port_bitmaps.json", 'w', encoding='utf-8') as f:
+            json.dump(current.to_json(), f, ensure_ascii=False)
+    
     def _parse_oneforall_subdomains(self, data: Dict) -> List[str]:
         """解析OneForAll的子域名结果"""
         # OneForAll通常输出CSV文件
@@ -206,32 +476,58 @@ class DataProcessor:
         
         return subdomains
     
-    def _parse_dirsearch_urls(self, data: Dict) -> List[str]:
-        """解析dirsearch的URL结果"""
-        urls = []
+    def _collect_urls(self, urls: Iterable[str], seen: UrlStore) -> int:
+        """
+        将URL流逐条规范化后加入去重集合
         
-        if 'urls' in data:
-            urls = data['urls']
-        elif 'results' in data:
-            for item in data['results']:
-                if 'url' in item:
-                    urls.append(item['url'])
+        Args:
+            urls: URL流
+            seen: URL集合（保持插入顺序）
         
-        return urls
+        Returns:
+            int: 流中的URL数量
+        """
+        count = 0
+        for url in urls:
+            count += 1
+            if self.scope and not self.scope.in_scope(url):
+                self._out_of_scope += 1
+                continue
+            seen.add(canonicalize_url(url))
+        return count
+    
+    def _parse_dirsearch_urls(self, data: Dict) -> Iterator[str]:
+        """解析dirsearch的URL结果（逐条返回）"""
+        yield from self._iter_scan_urls(data)
     
-    def _parse_ffuf_urls(self, data: Dict) -> List[str]:
-        """解析ffuf的URL结果"""
-        urls = []
+    def _parse_ffuf_urls(self, data: Dict) -> Iterator[str]:
+        """解析ffuf的URL结果（逐条返回）"""
+        yield from self._iter_scan_urls(data)
+    
+    def _iter_scan_urls(self, data: Dict) -> Iterator[str]:
+        """
+        逐条返回目录扫描结果中的URL
+        
+        优先读取带状态码和长度的results，以便过滤软404；只有没有results时才使用urls
+        
+        Args:
+            data: dirsearch或ffuf的输出数据
         
+        Yields:
+            str: URL
+        """
         if 'results' in data:
             for item in data['results']:
-                if 'url' in item:
-                    urls.append(item['url'])
-        
-        return urls
+                if isinstance(item, dict) and 'url' in item:
+                    if self._is_soft404(item):
+                        self._soft404_filtered += 1
+                        continue
+                    yield item['url']
+        elif 'urls' in data:
+            yield from data['urls']
     
     def _parse_httpx_results(self, data: Dict) -> List[Dict[str, Any]]:
-        """解析httpx的探测结果"""
+        """解析httpx的探测结果（逐条读取记录流）"""
         probes = []
         
         if 'results' in data:
@@ -247,50 +543,53 @@ class DataProcessor:
         
         return probes
     
-    def _parse_txportmap_ports(self, data: Dict) -> List[Dict[str, Any]]:
-        """解析TXPortMap的端口扫描结果"""
-        ports = []
-        
+    def _parse_txportmap_ports(self, data: Dict) -> Iterator[Dict[str, Any]]:
+        """解析TXPortMap的端口扫描结果（逐条返回）"""
         if 'results' in data:
             for item in data['results']:
-                port = {
+                yield {
                     'ip': item.get('ip', ''),
                     'port': item.get('port', 0),
                     'service': item.get('service', ''),
                     'banner': item.get('banner', '')
                 }
-                ports.append(port)
-        
-        return ports
     
-    def _parse_fscan_ports(self, data: Dict) -> List[Dict[str, Any]]:
-        """解析fscan的端口扫描结果"""
-        ports = []
-        
+    def _parse_fscan_ports(self, data: Dict) -> Iterator[Dict[str, Any]]:
+        """解析fscan的端口扫描结果（逐条返回）"""
         if 'ports' in data:
             for item in data['ports']:
-                port = {
+                yield {
                     'ip': item.get('ip', ''),
                     'port': item.get('port', 0),
                     'service': item.get('service', ''),
                     'banner': item.get('banner', '')
                 }
-                ports.append(port)
-        
-        return ports
     
-    def _deduplicate_ports(self, ports: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重端口列表（基于IP+端口）"""
-        seen = set()
-        unique = []
-        
-        for port in ports:
-            key = (port['ip'], port['port'])
-            if key not in seen:
-                seen.add(key)
-                unique.append(port)
-        
-        return unique
+    def _process_fscan_extras(self, data: Dict):
+        """
+        处理fscan的Web标题和漏洞/弱口令发现
+        
+        Web标题作为HTTP探测结果保存（报告中用于补全端口的状态码和标题），
+        发现项单独保存
+        """
+        web_titles = data.get('web_titles', [])
+        if web_titles:
+            probes = [{
+                'url': item.get('url', ''),
+                'status_code': item.get('status_code', 0),
+                'title': item.get('title', ''),
+                'content_length': item.get('content_length', 0),
+                'tech': []
+            } for item in web_titles]
+            self.http_probes.extend(probes)
+            self._save_http_probes(probes, "fscan_probe")
+            self.logger.info(f"fscan识别到 {len(probes)} 个Web服务")
+        
+        findings = data.get('findings', [])
+        if findings:
+            self.findings.extend(findings)
+            self._save_findings(findings, "fscan")
+            self.logger.info(f"fscan发现 {len(findings)} 个漏洞/弱口令")
     
     def _save_subdomains(self, subdomains: List[str]):
         """保存子域名列表"""
@@ -298,6 +597,23 @@ class DataProcessor:
         write_file_lines(output_file, subdomains)
         self.logger.info(f"子域名已保存到: {output_file}")
     
+    def _save_wildcard_clusters(self, clusters: List[Dict[str, Any]]):
+        """保存泛解析合并结果"""
+        output_file = self.output_dir / "wildcard_clusters.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(clusters, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"泛解析合并结果已保存到: {output_file}")
+    
+    def _save_soft404_baselines(self):
+        """保存软404校准结果"""
+        output_file = self.output_dir / "soft404_baselines.json"
+        data = {
+            host: {'catchall': host in self.catchall_hosts, 'baselines': baselines}
+            for host, baselines in self.soft404_baselines.items()
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    
     def _save_urls(self, urls: List[str]):
         """保存URL列表"""
         output_file = self.output_dir / "discovered_urls.txt"
@@ -311,13 +627,31 @@ class DataProcessor:
             json.dump(probes, f, indent=2, ensure_ascii=False)
         self.logger.info(f"HTTP探测结果已保存到: {output_file}")
     
-    def _save_ports(self, ports: List[Dict[str, Any]]):
-        """保存端口扫描结果"""
+    def _save_dns_records(self, records: List[Dict[str, Any]]):
+        """保存DNS解析结果"""
+        output_file = self.output_dir / "dns_results.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"DNS解析结果已保存到: {output_file}")
+    
+    def _save_ports(self, ports: Iterable[Dict[str, Any]]):
+        """保存端口扫描结果（逐条写入，每行一条记录）"""
         output_file = self.output_dir / "port_scan_results.json"
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(ports, f, indent=2, ensure_ascii=False)
+            f.write('[')
+            for index, port in enumerate(ports):
+                f.write(',\n  ' if index else '\n  ')
+                f.write(json.dumps(port, ensure_ascii=False))
+            f.write('\n]\n')
         self.logger.info(f"端口扫描结果已保存到: {output_file}")
     
+    def _save_findings(self, findings: List[Dict[str, Any]], tool_name: str):
+        """保存漏洞/弱口令发现"""
+        output_file = self.output_dir / f"{tool_name}_findings.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(findings, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"漏洞/弱口令发现已保存到: {output_file}")
+    
     def generate_summary(self) -> Dict[str, Any]:
         """
         生成数据汇总
@@ -330,7 +664,10 @@ class DataProcessor:
             'subdomain_count': len(self.subdomains),
             'url_count': len(self.urls),
             'port_count': len(self.ports),
-            'http_probe_count': len(self.http_probes)
+            'http_probe_count': len(self.http_probes),
+            'dns_record_count': len(self.dns_records),
+            'wildcard_cluster_count': len(self.wildcard_clusters),
+            'finding_count': len(self.findings)
         }
         
         return summary
@@ -0,0 +1,1128 @@
+"""
+Luna 内置扫描引擎模块
+基于asyncio实现的扫描引擎，在外部工具缺失或输入规模较小时使用
+"""
+
+import re
+import ssl
+import json
+import html
+import time
+import uuid
+import random
+import socket
+import struct
+import asyncio
+import ipaddress
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .governor import TokenBucket, get_governor
+from .scope import SuffixTrie
+
+# HTTP探测读取的响应体上限（只用于提取标题）
+HTTP_MAX_BODY = 512 * 1024
+
+# 每个主机保留的空闲连接数
+HTTP_MAX_IDLE_PER_HOST = 4
+
+# 跟随重定向的最大次数
+HTTP_MAX_REDIRECTS = 5
+
+HTTP_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+TITLE_PATTERN = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+CHARSET_PATTERN = re.compile(r'charset=([\w\-]+)', re.IGNORECASE)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# nmap默认扫描的1000个常见TCP端口（--top-ports 1000）
+TOP_1000_PORTS = (
+    "1,3-4,6-7,9,13,17,19-26,30,32-33,37,42-43,49,53,70,79-85,88-90,99-100,106,109-111,"
+    "113,119,125,135,139,143-144,146,161,163,179,199,211-212,222,254-256,259,264,280,301,"
+    "306,311,340,366,389,406-407,416-417,425,427,443-445,458,464-465,481,497,500,512-515,"
+    "524,541,543-545,548,554-555,563,587,593,616-617,625,631,636,646,648,666-668,683,687,"
+    "691,700,705,711,714,720,722,726,749,765,777,783,787,800-801,808,843,873,880,888,898,"
+    "900-903,911-912,981,987,990,992-993,995,999-1002,1007,1009-1011,1021-1100,1102,"
+    "1104-1108,1110-1114,1117,1119,1121-1124,1126,1130-1132,1137-1138,1141,1145,"
+    "1147-1149,1151-1152,1154,1163-1166,1169,1174-1175,1183,1185-1187,1192,1198-1199,"
+    "1201,1213,1216-1218,1233-1234,1236,1244,1247-1248,1259,1271-1272,1277,1287,1296,"
+    "1300-1301,1309-1311,1322,1328,1334,1352,1417,1433-1434,1443,1455,1461,1494,"
+    "1500-1501,1503,1521,1524,1533,1556,1580,1583,1594,1600,1641,1658,1666,1687-1688,"
+    "1700,1717-1721,1723,1755,1761,1782-1783,1801,1805,1812,1839-1840,1862-1864,1875,"
+    "1900,1914,1935,1947,1971-1972,1974,1984,1998-2010,2013,2020-2022,2030,2033-2035,"
+    "2038,2040-2043,2045-2049,2065,2068,2099-2100,2103,2105-2107,2111,2119,2121,2126,"
+    "2135,2144,2160-2161,2170,2179,2190-2191,2196,2200,2222,2251,2260,2288,2301,2323,"
+    "2366,2381-2383,2393-2394,2399,2401,2492,2500,2522,2525,2557,2601-2602,2604-2605,"
+    "2607-2608,2638,2701-2702,2710,2717-2718,2725,2800,2809,2811,2869,2875,2909-2910,"
+    "2920,2967-2968,2998,3000-3001,3003,3005-3007,3011,3013,3017,3030-3031,3052,3071,"
+    "3077,3128,3168,3211,3221,3260-3261,3268-3269,3283,3300-3301,3306,3322-3325,3333,"
+    "3351,3367,3369-3372,3389-3390,3404,3476,3493,3517,3527,3546,3551,3580,3659,"
+    "3689-3690,3703,3737,3766,3784,3800-3801,3809,3814,3826-3828,3851,3869,3871,3878,"
+    "3880,3889,3905,3914,3918,3920,3945,3971,3986,3995,3998,4000-4006,4045,4111,"
+    "4125-4126,4129,4224,4242,4279,4321,4343,4443-4446,4449,4550,4567,4662,4848,"
+    "4899-4900,4998,5000-5004,5009,5030,5033,5050-5051,5054,5060-5061,5080,5087,"
+    "5100-5102,5120,5190,5200,5214,5221-5222,5225-5226,5269,5280,5298,5357,5405,5414,"
+    "5431-5432,5440,5500,5510,5544,5550,5555,5560,5566,5631,5633,5666,5678-5679,5718,"
+    "5730,5800-5802,5810-5811,5815,5822,5825,5850,5859,5862,5877,5900-5904,5906-5907,"
+    "5910-5911,5915,5922,5925,5950,5952,5959-5963,5987-5989,5998-6007,6009,6025,6059,"
+    "6100-6101,6106,6112,6123,6129,6156,6346,6389,6502,6510,6543,6547,6565-6567,6580,"
+    "6646,6666-6669,6689,6692,6699,6779,6788-6789,6792,6839,6881,6901,6969,7000-7002,"
+    "7004,7007,7019,7025,7070,7100,7103,7106,7200-7201,7402,7435,7443,7496,7512,7625,"
+    "7627,7676,7741,7777-7778,7800,7911,7920-7921,7937-7938,7999-8002,8007-8011,"
+    "8021-8022,8031,8042,8045,8080-8090,8093,8099-8100,8180-8181,8192-8194,8200,8222,"
+    "8254,8290-8292,8300,8333,8383,8400,8402,8443,8500,8600,8649,8651-8652,8654,8701,"
+    "8800,8873,8888,8899,8994,9000-9003,9009-9011,9040,9050,9071,9080-9081,9090-9091,"
+    "9099-9103,9110-9111,9200,9207,9220,9290,9415,9418,9485,9500,9502-9503,9535,9575,"
+    "9593-9595,9618,9666,9876-9878,9898,9900,9917,9929,9943-9944,9968,9998-10004,"
+    "10009-10010,10012,10024-10025,10082,10180,10215,10243,10566,10616-10617,10621,10626,"
+    "10628-10629,10778,11110-11111,11967,12000,12174,12265,12345,13456,13722,13782-13783,"
+    "14000,14238,14441-14442,15000,15002-15004,15660,15742,16000-16001,16012,16016,16018,"
+    "16080,16113,16992-16993,17877,17988,18040,18101,18988,19101,19283,19315,19350,19780,"
+    "19801,19842,20000,20005,20031,20221-20222,20828,21571,22939,23502,24444,24800,"
+    "25734-25735,26214,27000,27352-27353,27355-27356,27715,28201,30000,30718,30951,31038,"
+    "31337,32768-32785,33354,33899,34571-34573,35500,38292,40193,40911,41511,42510,44176,"
+    "44442-44443,44501,45100,48080,49152-49161,49163,49165,49167,49175-49176,49400,"
+    "49999-50003,50006,50300,50389,50500,50636,50800,51103,51493,52673,52822,52848,52869,"
+    "54045,54328,55055-55056,55555,55600,56737-56738,57294,57797,58080,60020,60443,61532,"
+    "61900,62078,63331,64623,64680,65000,65129,65389"
+)
+
+# 等待服务端主动发送banner的时间上限（秒）
+BANNER_TIMEOUT = 2
+
+BANNER_READ_SIZE = 1024
+
+# 服务端不主动发送数据时使用的探测请求
+BANNER_PROBE = b"GET / HTTP/1.0\r\n\r\n"
+
+# 根据banner识别服务
+BANNER_SERVICES = [
+    (re.compile(rb'^SSH-'), 'ssh'),
+    (re.compile(rb'^HTTP/'), 'http'),
+    (re.compile(rb'^220[ -].*(?:FTP|FileZilla|vsFTPd)', re.IGNORECASE), 'ftp'),
+    (re.compile(rb'^220[ -].*(?:SMTP|ESMTP|Postfix|Exim)', re.IGNORECASE), 'smtp'),
+    (re.compile(rb'^\+OK'), 'pop3'),
+    (re.compile(rb'^\* OK'), 'imap'),
+    (re.compile(rb'^.\x00\x00\x00\x0a[0-9]'), 'mysql'),
+    (re.compile(rb'^-ERR|^\+PONG|redis', re.IGNORECASE), 'redis'),
+    (re.compile(rb'^RFB \d'), 'vnc'),
+]
+
+
+def _make_ssl_context() -> ssl.SSLContext:
+    """探测用的SSL上下文（不校验证书，与httpx默认行为一致）"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def extract_title(body: bytes, content_type: str = '') -> str:
+    """
+    从HTML中提取标题
+
+    Args:
+        body: 响应体
+        content_type: Content-Type头（用于确定编码）
+
+    Returns:
+        str: 标题（已去除多余空白），没有标题时返回空字符串
+    """
+    match = TITLE_PATTERN.search(body)
+    if not match:
+        return ''
+
+    charset = 'utf-8'
+    charset_match = CHARSET_PATTERN.search(content_type)
+    if charset_match:
+        charset = charset_match.group(1)
+
+    try:
+        title = match.group(1).decode(charset, errors='replace')
+    except LookupError:
+        title = match.group(1).decode('utf-8', errors='replace')
+
+    return ' '.join(html.unescape(title).split())
+
+
+class HttpResponse:
+    """HTTP响应（只保留探测需要的信息）"""
+
+    __slots__ = ('status', 'headers', 'body', 'length', 'reusable')
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes,
+                 length: int, reusable: bool):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.length = length
+        self.reusable = reusable
+
+
+class ConnectionPool:
+    """
+    HTTP连接池
+
+    按 (协议, 主机, 端口) 保存空闲的keep-alive连接，同一主机的后续请求直接复用
+    """
+
+    def __init__(self, timeout: float, max_idle_per_host: int = HTTP_MAX_IDLE_PER_HOST):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str, int], Deque[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl_context = _make_ssl_context()
+
+    async def acquire(self, scheme: str, host: str, port: int, reuse: bool = True):
+        """
+        获取连接
+
+        Returns:
+            Tuple: (reader, writer, 是否为复用的连接)
+        """
+        idle = self._idle.get((scheme, host, port))
+        while reuse and idle:
+            reader, writer = idle.popleft()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+
+        ssl_context = self._ssl_context if scheme == 'https' else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host, port, ssl=ssl_context,
+                server_hostname=host if ssl_context else None
+            ),
+            self.timeout
+        )
+        return reader, writer, False
+
+    def release(self, scheme: str, host: str, port: int, reader, writer, reusable: bool):
+        """归还连接，不可复用或空闲连接已满时关闭"""
+        idle = self._idle.setdefault((scheme, host, port), deque())
+        if reusable and len(idle) < self.max_idle_per_host:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    def close(self):
+        """关闭所有空闲连接"""
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str],
+                     status: int) -> Tuple[bytes, int, bool]:
+    """
+    读取响应体
+
+    Returns:
+        Tuple: (响应体（最多HTTP_MAX_BODY字节）, 响应体长度, 连接是否可以复用)
+    """
+    if status < 200 or status in (204, 304):
+        return b'', 0, True
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        size = 0
+        while True:
+            line = await reader.readline()
+            chunk_size = int(line.split(b';', 1)[0].strip() or b'0', 16)
+            if chunk_size == 0:
+                # 跳过trailer
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks), size, True
+            if size + chunk_size > HTTP_MAX_BODY:
+                chunks.append(await reader.read(HTTP_MAX_BODY - size))
+                return b''.join(chunks), size + chunk_size, False
+            chunks.append(await reader.readexactly(chunk_size))
+            await reader.readline()
+            size += chunk_size
+
+    content_length = headers.get('content-length')
+    if content_length and content_length.isdigit():
+        length = int(content_length)
+        if length > HTTP_MAX_BODY:
+            return await reader.read(HTTP_MAX_BODY), length, False
+        return await reader.readexactly(length), length, True
+
+    # 没有长度信息，读取到连接关闭
+    body = await reader.read(HTTP_MAX_BODY)
+    return body, len(body), False
+
+
+async def http_request(pool: ConnectionPool, url: str, reuse: bool = True) -> HttpResponse:
+    """
+    发送GET请求
+
+    复用的空闲连接可能已被服务端关闭，此时换用新连接重试一次
+
+    Args:
+        pool: 连接池
+        url: 请求URL
+        reuse: 是否允许复用空闲连接
+
+    Returns:
+        HttpResponse: 响应
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme
+    host = parts.hostname
+    port = parts.port or DEFAULT_PORTS[scheme]
+    path = parts.path or '/'
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    host_header = host if port == DEFAULT_PORTS[scheme] else f"{host}:{port}"
+    request = (
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: {host_header}\r\n"
+        f"User-Agent: {HTTP_USER_AGENT}\r\n"
+        "Accept: */*\r\n"
+        "Connection: keep-alive\r\n\r\n"
+    ).encode('latin-1', errors='replace')
+
+    reader, writer, reused = await pool.acquire(scheme, host, port, reuse)
+    try:
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        writer.close()
+        if not reused:
+            raise
+        status_line = b''
+    except BaseException:
+        writer.close()
+        raise
+
+    if not status_line:
+        writer.close()
+        if reused:
+            return await http_request(pool, url, reuse=False)
+        raise ConnectionError("连接被关闭")
+
+    try:
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        body, length, reusable = await _read_body(reader, headers, int(status))
+        reusable = (
+            reusable and version == 'HTTP/1.1'
+            and headers.get('connection', '').lower() != 'close'
+        )
+    except BaseException:
+        writer.close()
+        raise
+
+    pool.release(scheme, host, port, reader, writer, reusable)
+    return HttpResponse(int(status), headers, body, length, reusable)
+
+
+class HttpProber:
+    """
+    异步HTTP探测引擎
+
+    固定数量的worker从输入队列中取URL探测，同一主机的连接通过连接池复用；
+    输出为与httpx相同字段的JSONL记录
+    """
+
+    def __init__(self, threads: int = 50, timeout: float = 10, follow_redirects: bool = False,
+                 tech_detect: bool = False, rate_limit: Optional[int] = None):
+        """
+        初始化探测引擎
+
+        Args:
+            threads: 并发数
+            timeout: 单个URL的超时时间（秒）
+            follow_redirects: 是否跟随重定向
+            tech_detect: 是否根据响应头识别技术栈
+            rate_limit: 每秒请求数上限
+        """
+        self.threads = max(1, threads)
+        self.timeout = timeout
+        self.follow_redirects = follow_redirects
+        self.tech_detect = tech_detect
+        self.rate_limit = rate_limit
+        # 主机名 -> 解析目标IP的任务（同一主机只解析一次，每次运行重建）
+        self._ip_keys: Dict[str, asyncio.Task] = {}
+
+    def run(self, inputs: Iterable[str], output_file: Path,
+            timeout: Optional[float] = None) -> int:
+        """
+        探测所有输入并写入结果文件
+
+        Args:
+            inputs: URL或主机名
+            output_file: JSONL结果文件
+            timeout: 整体超时时间（秒），超时抛出 asyncio.TimeoutError
+
+        Returns:
+            int: 有响应的数量
+        """
+        with open(output_file, 'w', encoding='utf-8') as f:
+            return asyncio.run(asyncio.wait_for(self._run(
+                inputs, lambda record: f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            ), timeout))
+
+    def probe_all(self, inputs: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        探测所有输入并返回结果（不写文件，用于少量输入的内部比对）
+
+        Args:
+            inputs: URL或主机名
+
+        Returns:
+            List[Dict]: 有响应的探测结果
+        """
+        records: List[Dict[str, Any]] = []
+        asyncio.run(self._run(inputs, records.append))
+        return records
+
+    async def _run(self, inputs: Iterable[str], sink: Callable[[Dict[str, Any]], Any]) -> int:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.threads * 2)
+        pool = ConnectionPool(self.timeout)
+        bucket = TokenBucket(self.rate_limit) if self.rate_limit else None
+        self._ip_keys = {}
+        alive = 0
+
+        async def worker():
+            nonlocal alive
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                record = await self._probe(pool, bucket, item)
+                if record:
+                    sink(record)
+                    alive += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.threads)]
+
+        try:
+            for item in inputs:
+                item = item.strip()
+                if item:
+                    await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+
+            await asyncio.gather(*workers)
+        finally:
+            # 超时取消时同样关闭连接
+            pool.close()
+
+        return alive
+
+    async def _ip_key(self, host: str) -> str:
+        """
+        获取主机的单IP限速键
+
+        共享同一IP的虚拟主机使用同一个令牌桶（与扫描调度相同，有多个IP时取最小的）
+
+        Args:
+            host: 主机名或IP
+
+        Returns:
+            str: 解析到的IP，无法解析时返回主机名本身
+        """
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+
+        task = self._ip_keys.get(host)
+        if task is None:
+            task = self._ip_keys[host] = asyncio.ensure_future(self._resolve_ip(host))
+        return await asyncio.shield(task)
+
+    async def _resolve_ip(self, host: str) -> str:
+        """解析主机的IP（失败时返回主机名）"""
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(host, None, type=socket.SOCK_STREAM), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError, UnicodeError):
+            return host
+        return min((info[4][0] for info in infos), default=host)
+
+    async def _throttle(self, bucket: Optional[TokenBucket], host: str):
+        """按全局速率和单IP速率等待"""
+        delay = get_governor().throttle_delay(await self._ip_key(host))
+        if bucket:
+            delay = max(delay, bucket.reserve())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _probe(self, pool: ConnectionPool, bucket: Optional[TokenBucket],
+                     item: str) -> Optional[Dict[str, Any]]:
+        """探测单个输入（没有协议时先尝试https再尝试http）"""
+        if '://' in item:
+            candidates = [item]
+        else:
+            candidates = [f"https://{item}", f"http://{item}"]
+
+        for url in candidates:
+            try:
+                record = await asyncio.wait_for(self._fetch(pool, bucket, url), self.timeout)
+            except (OSError, asyncio.TimeoutError, ValueError, KeyError,
+                    asyncio.IncompleteReadError, ssl.SSLError):
+                continue
+            record['input'] = item
+            return record
+
+        return None
+
+    async def _fetch(self, pool: ConnectionPool, bucket: Optional[TokenBucket],
+                     url: str) -> Dict[str, Any]:
+        """请求URL（按需跟随重定向）并生成结果记录"""
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            await self._throttle(bucket, urlsplit(url).hostname or '')
+            response = await http_request(pool, url)
+
+            location = response.headers.get('location')
+            if not (self.follow_redirects and location and 300 <= response.status < 400):
+                break
+            url = urljoin(url, location)
+
+        content_type = response.headers.get('content-type', '')
+        record = {
+            'url': url,
+            'status_code': response.status,
+            'title': extract_title(response.body, content_type),
+            'content_length': response.length,
+            'content_type': content_type.split(';', 1)[0].strip(),
+            'webserver': response.headers.get('server', ''),
+            'tech': []
+        }
+
+        if self.tech_detect:
+            tech = [response.headers.get('server', ''), response.headers.get('x-powered-by', '')]
+            record['tech'] = [value for value in tech if value]
+
+        return record
+
+
+def parse_port_spec(spec: str) -> List[int]:
+    """
+    解析端口范围
+
+    支持 top1000、all、单个端口、逗号分隔的列表以及 a-b 范围，可以混合使用
+
+    Args:
+        spec: 端口范围
+
+    Returns:
+        List[int]: 去重后按原顺序排列的端口
+    """
+    ports: Dict[int, None] = {}
+    spec = str(spec).strip().lower()
+
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if part == 'top1000':
+            ports.update(dict.fromkeys(parse_port_spec(TOP_1000_PORTS)))
+            continue
+        if part == 'all':
+            part = '1-65535'
+
+        start, _, end = part.partition('-')
+        first, last = int(start), int(end or start)
+        if not (1 <= first <= last <= 65535):
+            raise ValueError(f"无效的端口范围: {part}")
+        ports.update(dict.fromkeys(range(first, last + 1)))
+
+    return list(ports)
+
+
+def expand_hosts(items: Iterable[str]) -> Iterator[str]:
+    """
+    展开扫描目标（CIDR展开为主机地址，IP和主机名原样返回）
+
+    Args:
+        items: IP、CIDR或主机名
+
+    Yields:
+        str: 单个扫描目标
+    """
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        if '/' in item:
+            try:
+                network = ipaddress.ip_network(item, strict=False)
+            except ValueError:
+                continue
+            if network.num_addresses == 1:
+                yield str(network.network_address)
+            else:
+                yield from (str(host) for host in network.hosts())
+        else:
+            yield item
+
+
+def identify_service(port: int, banner: bytes) -> str:
+    """
+    识别端口服务（优先根据banner，其次根据常见端口）
+
+    Args:
+        port: 端口
+        banner: 服务端返回的数据
+
+    Returns:
+        str: 服务名称，无法识别时返回空字符串
+    """
+    for pattern, service in BANNER_SERVICES:
+        if pattern.search(banner[:64]):
+            return service
+
+    try:
+        return socket.getservbyport(port, 'tcp')
+    except OSError:
+        return ''
+
+
+def format_banner(banner: bytes) -> str:
+    """banner转换为单行可读文本"""
+    text = banner.decode('utf-8', errors='replace')
+    return ' '.join(text.split())[:200]
+
+
+class PortScanner:
+    """
+    异步TCP连接扫描引擎
+
+    按 端口 x 主机 的顺序生成任务（相邻任务落在不同主机上），固定数量的worker完成TCP连接；
+    连接成功后可选读取banner识别服务
+    """
+
+    def __init__(self, ports: List[int], threads: int = 500, timeout: float = 3,
+                 banner: bool = True, rate_limit: Optional[int] = None):
+        """
+        初始化扫描引擎
+
+        Args:
+            ports: 端口列表
+            threads: 并发连接数
+            timeout: 连接超时时间（秒）
+            banner: 是否读取banner
+            rate_limit: 每秒连接数上限
+        """
+        self.ports = ports
+        self.threads = max(1, threads)
+        self.timeout = timeout
+        self.banner = banner
+        self.rate_limit = rate_limit
+
+    def run(self, hosts: Iterable[str], output_file: Path,
+            timeout: Optional[float] = None) -> int:
+        """
+        扫描所有主机并写入结果文件
+
+        Args:
+            hosts: IP、CIDR或主机名
+            output_file: JSONL结果文件
+            timeout: 整体超时时间（秒），超时抛出 asyncio.TimeoutError
+
+        Returns:
+            int: 开放端口数量
+        """
+        return asyncio.run(asyncio.wait_for(
+            self._run(list(expand_hosts(hosts)), output_file), timeout
+        ))
+
+    async def _run(self, hosts: List[str], output_file: Path) -> int:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.threads * 2)
+        bucket = TokenBucket(self.rate_limit) if self.rate_limit else None
+        found = 0
+
+        with open(output_file, 'w', encoding='utf-8') as f:
+            async def worker():
+                nonlocal found
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    if bucket:
+                        delay = bucket.reserve()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    record = await self._scan(*item)
+                    if record:
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                        found += 1
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.threads)]
+
+            for port in self.ports:
+                for host in hosts:
+                    await queue.put((host, port))
+            for _ in workers:
+                await queue.put(None)
+
+            await asyncio.gather(*workers)
+
+        return found
+
+    async def _scan(self, host: str, port: int) -> Optional[Dict[str, Any]]:
+        """连接单个端口，开放时返回记录"""
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return None
+
+        banner = b''
+        try:
+            if self.banner:
+                banner = await self._grab_banner(reader, writer)
+        finally:
+            writer.close()
+
+        return {
+            'ip': host,
+            'port': port,
+            'service': identify_service(port, banner),
+            'banner': format_banner(banner)
+        }
+
+    async def _grab_banner(self, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> bytes:
+        """读取banner：先等待服务端主动发送，没有数据时发送探测请求"""
+        wait = min(self.timeout, BANNER_TIMEOUT)
+        try:
+            return await asyncio.wait_for(reader.read(BANNER_READ_SIZE), wait)
+        except asyncio.TimeoutError:
+            pass
+        except OSError:
+            return b''
+
+        try:
+            writer.write(BANNER_PROBE)
+            await writer.drain()
+            return await asyncio.wait_for(reader.read(BANNER_READ_SIZE), wait)
+        except (OSError, asyncio.TimeoutError):
+            return b''
+
+
+# DNS记录类型
+DNS_TYPE_A = 1
+DNS_TYPE_CNAME = 5
+DNS_TYPE_AAAA = 28
+
+# DNS响应码
+DNS_RCODE_NXDOMAIN = 3
+DNS_RCODE_SERVFAIL = 2
+
+# 无记录（NXDOMAIN/空应答）结果的缓存时间（秒）
+DNS_NEGATIVE_TTL = 300
+
+# 泛解析检测时每个父域查询的随机子域名数量
+DNS_WILDCARD_PROBES = 2
+
+
+def build_dns_query(query_id: int, name: str, qtype: int) -> bytes:
+    """
+    构造DNS查询报文（递归查询，单个问题）
+
+    Args:
+        query_id: 报文ID
+        name: 查询的域名
+        qtype: 记录类型
+
+    Returns:
+        bytes: 查询报文
+    """
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    qname = b''.join(
+        bytes([len(label)]) + label
+        for label in name.rstrip('.').encode('ascii').split(b'.') if label
+    ) + b'\x00'
+    return header + qname + struct.pack('!HH', qtype, 1)
+
+
+def _read_dns_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """读取报文中的域名（支持压缩指针），返回 (域名, 域名之后的偏移)"""
+    labels = []
+    end = None
+    jumps = 0
+
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            pointer = ((length & 0x3F) << 8) | data[offset + 1]
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 64:
+                raise ValueError("DNS压缩指针循环")
+            offset = pointer
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode('ascii', errors='replace'))
+        offset += length
+
+    return '.'.join(labels).lower(), end if end is not None else offset
+
+
+def parse_dns_response(data: bytes) -> Tuple[int, int, List[Tuple[str, int, int, str]]]:
+    """
+    解析DNS响应报文
+
+    Args:
+        data: 响应报文
+
+    Returns:
+        Tuple: (报文ID, 响应码, 应答记录列表 [(名称, 类型, TTL, 值)])
+    """
+    query_id, flags, qdcount, ancount, _, _ = struct.unpack('!HHHHHH', data[:12])
+    rcode = flags & 0x0F
+    offset = 12
+
+    for _ in range(qdcount):
+        _, offset = _read_dns_name(data, offset)
+        offset += 4
+
+    answers = []
+    for _ in range(ancount):
+        name, offset = _read_dns_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack('!HHIH', data[offset:offset + 10])
+        offset += 10
+        rdata = data[offset:offset + rdlength]
+
+        if rtype == DNS_TYPE_A and rdlength == 4:
+            answers.append((name, rtype, ttl, socket.inet_ntop(socket.AF_INET, rdata)))
+        elif rtype == DNS_TYPE_AAAA and rdlength == 16:
+            answers.append((name, rtype, ttl, socket.inet_ntop(socket.AF_INET6, rdata)))
+        elif rtype == DNS_TYPE_CNAME:
+            answers.append((name, rtype, ttl, _read_dns_name(data, offset)[0]))
+
+        offset += rdlength
+
+    return query_id, rcode, answers
+
+
+class DnsCache:
+    """按记录TTL过期的DNS结果缓存（整个运行内共享）"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[name]
+            return None
+        return entry[1]
+
+    def put(self, name: str, record: Dict[str, Any], ttl: int):
+        self._entries[name] = (time.monotonic() + ttl, record)
+
+
+# 运行范围内共享的DNS缓存（多个目标的子域名可能指向相同的名称）
+DNS_CACHE = DnsCache()
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    """单个解析服务器的UDP连接，按报文ID分发响应"""
+
+    def __init__(self):
+        self.transport = None
+        self.pending: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        future = self.pending.pop(struct.unpack('!H', data[:2])[0], None)
+        if future and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        pass
+
+
+class DnsResolver:
+    """
+    异步DNS解析引擎
+
+    向配置的解析服务器轮流发送UDP查询，超时或SERVFAIL时换下一个服务器重试；
+    结果按TTL缓存，并按父域检测泛解析（父域不超出目标域名）
+    """
+
+    def __init__(self, resolvers: List[str], threads: int = 200, timeout: float = 2,
+                 retries: int = 2, ipv6: bool = True, cache: Optional[DnsCache] = None,
+                 scope: Iterable[str] = ()):
+        """
+        初始化解析引擎
+
+        Args:
+            resolvers: 解析服务器地址（可带端口，如 127.0.0.1:5353）
+            threads: 同时进行的查询数
+            timeout: 单次查询超时时间（秒）
+            retries: 失败后的重试次数
+            ipv6: 是否查询AAAA记录
+            cache: 结果缓存，默认使用运行范围内共享的缓存
+            scope: 目标域名，泛解析只在目标域名及其子域下检测
+        """
+        self.scope = SuffixTrie(scope)
+        self.resolvers = [self._parse_resolver(resolver) for resolver in resolvers]
+        self.threads = max(1, threads)
+        self.timeout = timeout
+        self.retries = retries
+        self.ipv6 = ipv6
+        self.cache = cache if cache is not None else DNS_CACHE
+        self._protocols: List[_DnsProtocol] = []
+        self._next = 0
+
+    @staticmethod
+    def _parse_resolver(resolver: str) -> Tuple[str, int]:
+        """解析服务器地址，支持 ip、ip:port、[ipv6]:port"""
+        resolver = resolver.strip()
+        if resolver.startswith('['):
+            host, _, port = resolver[1:].partition(']')
+            return host, int(port.lstrip(':') or 53)
+        if resolver.count(':') == 1:
+            host, _, port = resolver.partition(':')
+            return host, int(port)
+        return resolver, 53
+
+    def run(self, names: Iterable[str], output_file: Path, detect_wildcard: bool = True,
+            timeout: Optional[float] = None) -> int:
+        """
+        解析所有域名并写入结果文件
+
+        Args:
+            names: 域名
+            output_file: JSONL结果文件
+            detect_wildcard: 是否检测泛解析
+            timeout: 整体超时时间（秒），超时抛出 asyncio.TimeoutError
+
+        Returns:
+            int: 解析成功的域名数量
+        """
+        resolved = 0
+
+        with open(output_file, 'w', encoding='utf-8') as f:
+            def sink(record):
+                nonlocal resolved
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                resolved += 1
+
+            asyncio.run(asyncio.wait_for(self._run(names, sink, detect_wildcard), timeout))
+
+        return resolved
+
+    def lookup(self, names: Iterable[str],
+               detect_wildcard: bool = True) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Set[str]]]:
+        """
+        解析所有域名并返回结果（不写文件）
+
+        Args:
+            names: 域名
+            detect_wildcard: 是否检测泛解析
+
+        Returns:
+            Tuple: (域名 -> 解析记录（只包含有结果的域名）, 父域 -> 泛解析IP集合)
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        wildcards = asyncio.run(self._run(
+            names, lambda record: records.__setitem__(record['subdomain'], record), detect_wildcard
+        ))
+        return records, wildcards
+
+    async def _open(self):
+        loop = asyncio.get_running_loop()
+        for host, port in self.resolvers:
+            _, protocol = await loop.create_datagram_endpoint(
+                _DnsProtocol, remote_addr=(host, port)
+            )
+            self._protocols.append(protocol)
+
+    def _close(self):
+        for protocol in self._protocols:
+            if protocol.transport:
+                protocol.transport.close()
+        self._protocols = []
+
+    async def _run(self, names: Iterable[str], sink: Callable[[Dict[str, Any]], Any],
+                   detect_wildcard: bool) -> Dict[str, Set[str]]:
+        """解析所有域名，有结果的记录交给sink处理，返回泛解析检测结果"""
+        names = list(dict.fromkeys(name.strip().lower().rstrip('.') for name in names if name.strip()))
+        await self._open()
+
+        try:
+            wildcards = await self.detect_wildcards(names) if detect_wildcard else {}
+
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.threads * 2)
+
+            async def worker():
+                while True:
+                    name = await queue.get()
+                    if name is None:
+                        return
+                    record = await self.resolve(name)
+                    ips = record['a'] + record['aaaa']
+                    if not ips and not record['cname']:
+                        continue
+
+                    zone = self.zone_for(name)
+                    wildcard_ips = wildcards.get(zone) if zone else None
+                    sink(dict(record, subdomain=name, ips=ips,
+                              wildcard=bool(ips and wildcard_ips and set(ips) <= wildcard_ips)))
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.threads)]
+            for name in names:
+                await queue.put(name)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            self._close()
+
+        return wildcards
+
+    async def _query(self, name: str, qtype: int) -> Optional[Tuple[int, List[Tuple[str, int, int, str]]]]:
+        """发送单个查询（超时或SERVFAIL时换服务器重试），返回 (响应码, 应答记录)"""
+        for _ in range(self.retries + 1):
+            protocol = self._protocols[self._next % len(self._protocols)]
+            self._next += 1
+
+            query_id = random.getrandbits(16)
+            while query_id in protocol.pending:
+                query_id = random.getrandbits(16)
+
+            future = asyncio.get_running_loop().create_future()
+            protocol.pending[query_id] = future
+            try:
+                protocol.transport.sendto(build_dns_query(query_id, name, qtype))
+                data = await asyncio.wait_for(future, self.timeout)
+                _, rcode, answers = parse_dns_response(data)
+            except (asyncio.TimeoutError, OSError, ValueError, struct.error, IndexError):
+                continue
+            finally:
+                protocol.pending.pop(query_id, None)
+
+            if rcode == DNS_RCODE_SERVFAIL:
+                continue
+            return rcode, answers
+
+        return None
+
+    async def resolve(self, name: str) -> Dict[str, Any]:
+        """
+        解析单个域名的A/AAAA/CNAME记录
+
+        Args:
+            name: 域名
+
+        Returns:
+            Dict: {'a': [...], 'aaaa': [...], 'cname': [...]}
+        """
+        cached = self.cache.get(name)
+        if cached is not None:
+            return cached
+
+        qtypes = [DNS_TYPE_A, DNS_TYPE_AAAA] if self.ipv6 else [DNS_TYPE_A]
+        responses = await asyncio.gather(*(self._query(name, qtype) for qtype in qtypes))
+
+        record = {'a': [], 'aaaa': [], 'cname': []}
+        keys = {DNS_TYPE_A: 'a', DNS_TYPE_AAAA: 'aaaa', DNS_TYPE_CNAME: 'cname'}
+        ttls = []
+        failed = False
+
+        for response in responses:
+            if response is None:
+                failed = True
+                continue
+            for _, rtype, ttl, value in response[1]:
+                values = record[keys[rtype]]
+                if value not in values:
+                    values.append(value)
+                ttls.append(ttl)
+
+        # 查询失败的结果不缓存，下次重新查询
+        if not failed:
+            self.cache.put(name, record, min(ttls) if ttls else DNS_NEGATIVE_TTL)
+        return record
+
+    def zone_for(self, name: str) -> Optional[str]:
+        """
+        获取域名用于泛解析检测的父域
+
+        有目标域名时父域不超出目标域名（目标域名本身及范围外的域名没有父域）；
+        没有目标域名时不使用顶级域名作为父域
+
+        Args:
+            name: 域名
+
+        Returns:
+            Optional[str]: 父域，不需要检测时返回None
+        """
+        zone = name.partition('.')[2]
+        if len(self.scope):
+            root = self.scope.match(name)
+            if root is None or name == root:
+                return None
+            return zone
+        return zone if '.' in zone else None
+
+    async def detect_wildcards(self, names: List[str]) -> Dict[str, Set[str]]:
+        """
+        检测泛解析
+
+        对每个父域查询若干随机子域名，能解析出IP的父域视为泛解析
+
+        Args:
+            names: 域名列表
+
+        Returns:
+            Dict: 父域 -> 泛解析IP集合（只包含存在泛解析的父域）
+        """
+        zones = list(dict.fromkeys(filter(None, map(self.zone_for, names))))
+        semaphore = asyncio.Semaphore(self.threads)
+
+        async def probe(zone: str) -> Tuple[str, Set[str]]:
+            # 检测结果同样缓存，多个目标共享父域时不再重复检测
+            cached = self.cache.get(f"*.{zone}")
+            if cached is not None:
+                return zone, set(cached['ips'])
+
+            ips: Set[str] = set()
+            async with semaphore:
+                for _ in range(DNS_WILDCARD_PROBES):
+                    record = await self.resolve(f"{uuid.uuid4().hex[:12]}.{zone}")
+                    ips.update(record['a'] + record['aaaa'])
+
+            self.cache.put(f"*.{zone}", {'ips': sorted(ips)}, DNS_NEGATIVE_TTL)
+            return zone, ips
+
+        results = await asyncio.gather(*(probe(zone) for zone in zones if zone))
+        return {zone: ips for zone, ips in results if ips}
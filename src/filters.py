@@ -0,0 +1,186 @@
+"""
+Luna 域名过滤模块
+提供预编译的域名匹配器和批量过滤/校验接口
+"""
+
+import re
+import json
+from functools import lru_cache
+from itertools import filterfalse
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import (
+    EMAIL_PATTERNS, FILTER_RULES, ENABLED_FILTER_RULES, FILTER_RULES_FILE
+)
+
+# 域名格式校验（预编译，避免每次调用重新编译）
+# 标签首尾不能为'-'，用前后断言代替嵌套可选组，减少回溯
+DOMAIN_PATTERN = re.compile(r'^(?:(?!-)[a-zA-Z0-9\-]{1,63}(?<!-)\.)+[a-zA-Z]{2,}$')
+
+
+class DomainFilter:
+    """
+    域名匹配器
+
+    将多条规则合并编译为一个正则表达式，单次匹配即可判断是否命中任意规则；
+    批量接口基于内置的 filter/filterfalse，逐条惰性处理列表或迭代器
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        初始化匹配器
+
+        Args:
+            patterns: 正则规则列表（从域名开头匹配，忽略大小写）
+        """
+        self.patterns = list(dict.fromkeys(patterns))
+
+        if self.patterns:
+            combined = '|'.join(f'(?:{pattern})' for pattern in self.patterns)
+            self._match = re.compile(combined, re.IGNORECASE).match
+        else:
+            self._match = None
+
+    def matches(self, domain: str) -> bool:
+        """判断域名是否命中任意规则"""
+        return bool(self._match and self._match(domain))
+
+    def filter(self, domains: Iterable[str]) -> Iterator[str]:
+        """
+        过滤掉命中规则的域名
+
+        Args:
+            domains: 域名列表或迭代器
+
+        Returns:
+            Iterator[str]: 未命中规则的域名
+        """
+        if not self._match:
+            return iter(domains)
+        return filterfalse(self._match, domains)
+
+    def select(self, domains: Iterable[str]) -> Iterator[str]:
+        """
+        选出命中规则的域名
+
+        Args:
+            domains: 域名列表或迭代器
+
+        Returns:
+            Iterator[str]: 命中规则的域名
+        """
+        if not self._match:
+            return iter(())
+        return filter(self._match, domains)
+
+
+def _warn(message: str):
+    """记录过滤规则的警告（日志模块依赖本模块，使用时再导入）"""
+    from .utils import setup_logger
+    setup_logger("Luna.filters").warning(message)
+
+
+def _read_rules_file() -> Tuple[Dict[str, List[str]], Optional[List[str]]]:
+    """
+    读取并校验用户扩展规则文件
+
+    Returns:
+        Tuple: (规则集名 -> 规则列表, 启用的规则集名列表（未指定时为None）)
+
+    Raises:
+        ValueError: 文件不是合法的JSON或格式错误
+    """
+    with open(FILTER_RULES_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError("顶层必须是对象")
+
+    rules = data.get('rules', {})
+    if not isinstance(rules, dict) or not all(
+            isinstance(patterns, list) and all(isinstance(p, str) for p in patterns)
+            for patterns in rules.values()):
+        raise ValueError("rules 必须是 规则集名 -> 正则列表")
+
+    enabled = data.get('enabled')
+    if enabled is not None and not (
+            isinstance(enabled, list) and all(isinstance(name, str) for name in enabled)):
+        raise ValueError("enabled 必须是规则集名列表")
+
+    return rules, enabled
+
+
+def load_filter_rules() -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    加载过滤规则集（内置规则 + 用户扩展规则文件）
+
+    规则文件无法读取或格式错误时记录警告，只使用内置规则
+
+    Returns:
+        Tuple: (规则集名 -> 规则列表, 启用的规则集名列表)
+    """
+    rules = {name: list(patterns) for name, patterns in FILTER_RULES.items()}
+    enabled = list(ENABLED_FILTER_RULES)
+
+    if FILTER_RULES_FILE.exists():
+        try:
+            extra_rules, extra_enabled = _read_rules_file()
+        except (OSError, ValueError) as e:
+            _warn(f"过滤规则文件无效，使用内置规则: {FILTER_RULES_FILE}: {e}")
+            return rules, enabled
+
+        for name, patterns in extra_rules.items():
+            rules.setdefault(name, [])
+            rules[name].extend(patterns)
+        if extra_enabled is not None:
+            enabled = extra_enabled
+
+    return rules, enabled
+
+
+@lru_cache(maxsize=None)
+def get_domain_filter(rule_names: Optional[Tuple[str, ...]] = None) -> DomainFilter:
+    """
+    获取规则集组合对应的匹配器（按组合缓存）
+
+    规则集不存在或规则不是合法的正则时记录警告，使用内置的默认规则集
+
+    Args:
+        rule_names: 规则集名称，为None时使用配置中启用的规则集
+
+    Returns:
+        DomainFilter: 匹配器
+    """
+    rules, enabled = load_filter_rules()
+    names = rule_names if rule_names is not None else enabled
+
+    try:
+        patterns = []
+        for name in names:
+            if name not in rules:
+                raise ValueError(f"未知的过滤规则集: {name}")
+            patterns.extend(rules[name])
+
+        return DomainFilter(patterns)
+    except (ValueError, re.error) as e:
+        _warn(f"过滤规则无效，使用内置默认规则: {e}")
+        return DomainFilter(
+            pattern for name in ENABLED_FILTER_RULES for pattern in FILTER_RULES[name]
+        )
+
+
+# 邮件域名匹配器
+EMAIL_FILTER = DomainFilter(EMAIL_PATTERNS)
+
+
+def iter_valid_domains(domains: Iterable[str]) -> Iterator[str]:
+    """
+    批量校验域名格式，只保留合法域名
+
+    Args:
+        domains: 域名列表或迭代器
+
+    Returns:
+        Iterator[str]: 合法域名
+    """
+    return filter(DOMAIN_PATTERN.match, domains)
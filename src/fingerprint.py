@@ -0,0 +1,85 @@
+"""
+Luna 响应特征模块
+根据状态码、标题、内容长度和技术栈计算HTTP响应特征，用于识别泛解析和聚类重复页面
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .config import RESPONSE_LENGTH_BUCKET
+
+
+def response_fingerprint(record: Dict[str, Any],
+                         length_bucket: int = RESPONSE_LENGTH_BUCKET) -> Tuple[int, str, int]:
+    """
+    计算HTTP探测结果的响应特征
+
+    Args:
+        record: HTTP探测结果（status_code、title、content_length）
+        length_bucket: 内容长度的分桶大小
+
+    Returns:
+        Tuple: (状态码, 规范化后的标题, 长度分桶)
+    """
+    status_code = record.get('status_code') or 0
+    title = ' '.join(str(record.get('title') or '').split()).lower()
+    length = record.get('content_length') or 0
+    return int(status_code), title, int(length) // max(1, length_bucket)
+
+
+def matches_baseline(status: int, length: int, baselines: Iterable[Tuple[int, int]],
+                     tolerance: int = RESPONSE_LENGTH_BUCKET) -> bool:
+    """
+    判断响应是否与基线响应相同（软404判断）
+
+    Args:
+        status: 状态码
+        length: 内容长度
+        baselines: 基线响应 (状态码, 内容长度) 列表
+        tolerance: 允许的长度差（页面中回显路径等导致的长度变化）
+
+    Returns:
+        bool: 是否与任一基线相同
+    """
+    return any(status == base_status and abs(length - base_length) <= tolerance
+               for base_status, base_length in baselines)
+
+
+def probe_fingerprint(record: Dict[str, Any]) -> Tuple:
+    """
+    计算HTTP探测结果的聚类特征（响应特征 + 技术栈）
+
+    Args:
+        record: HTTP探测结果
+
+    Returns:
+        Tuple: (状态码, 标题, 长度分桶, 技术栈)
+    """
+    tech = record.get('tech') or []
+    return response_fingerprint(record) + (tuple(sorted(str(item).lower() for item in tech)),)
+
+
+def cluster_probes(probes: Iterable[Dict[str, Any]]) -> int:
+    """
+    按聚类特征对HTTP探测结果分组，并在每条结果上标记分组信息
+
+    每组第一条结果作为代表，其余标记为重复；
+    每条结果写入 cluster_size（所在分组的结果数）和 duplicate（是否为重复）
+
+    Args:
+        probes: HTTP探测结果
+
+    Returns:
+        int: 重复结果数量
+    """
+    clusters: Dict[Tuple, List[Dict[str, Any]]] = {}
+    for probe in probes:
+        clusters.setdefault(probe_fingerprint(probe), []).append(probe)
+
+    duplicates = 0
+    for members in clusters.values():
+        for index, probe in enumerate(members):
+            probe['cluster_size'] = len(members)
+            probe['duplicate'] = index > 0
+        duplicates += len(members) - 1
+
+    return duplicates
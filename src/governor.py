@@ -0,0 +1,256 @@
+"""
+Luna 资源调度模块
+在整个运行范围内限制工具进程数、线程/连接总数和单个目标IP的请求速率
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .config import (
+    GOVERNOR_MAX_PROCESSES, GOVERNOR_THREAD_BUDGET, GOVERNOR_FD_RESERVE,
+    GOVERNOR_MIN_THREADS, GOVERNOR_MAX_RATE, PER_IP_RATE_LIMIT,
+    TOOL_CONCURRENCY_PARAMS, TOOL_RATE_PARAMS, MULTI_HOST_RATE_TOOLS
+)
+from .utils import setup_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def get_fd_limit() -> Optional[int]:
+    """
+    获取进程可打开的文件描述符数量（软限制）
+
+    Returns:
+        Optional[int]: 文件描述符上限，无法获取或无限制时返回None
+    """
+    if resource is None:
+        return None
+
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return None
+    return soft
+
+
+class TokenBucket:
+    """令牌桶（非线程安全，由调用方加锁）"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶容量，默认等于rate
+        """
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        取出一个令牌
+
+        Returns:
+            float: 需要等待的秒数（令牌不足时预支，等待后即可使用）
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class ResourceGovernor:
+    """
+    全局资源调度器
+
+    工具执行前申请资源：进程名额不足或剩余线程预算过少时等待，
+    否则按剩余预算等比例缩小工具的并发参数，并根据单IP速率上限设置工具的限速参数
+    """
+
+    def __init__(self, max_processes: int = GOVERNOR_MAX_PROCESSES,
+                 thread_budget: Optional[int] = None,
+                 rate_budget: int = GOVERNOR_MAX_RATE,
+                 per_ip_rate: int = PER_IP_RATE_LIMIT):
+        """
+        初始化资源调度器
+
+        Args:
+            max_processes: 同时运行的工具进程数
+            thread_budget: 线程/连接总数，默认取配置值与文件描述符上限中较小者
+            rate_budget: 请求速率总和（每秒）
+            per_ip_rate: 单个目标IP的请求速率（每秒）
+        """
+        if thread_budget is None:
+            thread_budget = GOVERNOR_THREAD_BUDGET
+            fd_limit = get_fd_limit()
+            if fd_limit:
+                thread_budget = min(thread_budget, max(1, fd_limit - GOVERNOR_FD_RESERVE))
+
+        self.max_processes = max_processes
+        self.thread_budget = thread_budget
+        self.rate_budget = rate_budget
+        self.per_ip_rate = per_ip_rate
+        self.logger = setup_logger("Luna.governor")
+
+        self._cond = threading.Condition()
+        self._processes = 0
+        self._threads = 0
+        self._rate = 0
+
+        self._bucket_lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def requested_threads(tool_name: str, params: Dict[str, Any]) -> int:
+        """计算工具参数申请的线程/连接总数"""
+        total = 0
+        for name in TOOL_CONCURRENCY_PARAMS.get(tool_name, []):
+            value = params.get(name)
+            if isinstance(value, int) and value > 0:
+                total += value
+        return total
+
+    def desired_rate(self, tool_name: str, params: Dict[str, Any], hosts: int = 1) -> int:
+        """
+        计算工具的请求速率上限
+
+        Args:
+            tool_name: 工具名称
+            params: 工具参数（用户设置的速率上限优先）
+            hosts: 目标主机数量（仅对同时扫描多个主机的工具生效）
+
+        Returns:
+            int: 每秒请求数，工具不支持限速时返回0
+        """
+        rate_param = TOOL_RATE_PARAMS.get(tool_name)
+        if not rate_param:
+            return 0
+
+        if tool_name not in MULTI_HOST_RATE_TOOLS:
+            hosts = 1
+        rate = self.per_ip_rate * max(1, hosts)
+
+        user_rate = params.get(rate_param)
+        if isinstance(user_rate, int) and user_rate > 0:
+            rate = min(rate, user_rate)
+
+        return min(rate, self.rate_budget)
+
+    def _can_start(self, need_threads: int, need_rate: int) -> bool:
+        if self._processes >= self.max_processes:
+            return False
+        if self.thread_budget - self._threads < need_threads:
+            return False
+        if self.rate_budget - self._rate < need_rate:
+            return False
+        return True
+
+    @contextmanager
+    def lease(self, tool_name: str, params: Dict[str, Any],
+              hosts: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        申请执行工具所需的资源，退出时归还
+
+        Args:
+            tool_name: 工具名称
+            params: 工具参数
+            hosts: 目标主机数量
+
+        Yields:
+            Dict: 按分配结果调整后的工具参数
+        """
+        requested = self.requested_threads(tool_name, params)
+        rate = self.desired_rate(tool_name, params, hosts)
+
+        # 至少需要的资源（申请量小于下限时按申请量）
+        need_threads = min(requested, GOVERNOR_MIN_THREADS, self.thread_budget)
+        need_rate = min(rate, self.per_ip_rate)
+
+        with self._cond:
+            while not self._can_start(need_threads, need_rate):
+                self._cond.wait()
+
+            granted_threads = min(requested, self.thread_budget - self._threads)
+            granted_rate = min(rate, self.rate_budget - self._rate)
+
+            self._processes += 1
+            self._threads += granted_threads
+            self._rate += granted_rate
+
+        try:
+            yield self._apply(tool_name, params, requested, granted_threads, granted_rate)
+        finally:
+            with self._cond:
+                self._processes -= 1
+                self._threads -= granted_threads
+                self._rate -= granted_rate
+                self._cond.notify_all()
+
+    def _apply(self, tool_name: str, params: Dict[str, Any], requested: int,
+               granted_threads: int, granted_rate: int) -> Dict[str, Any]:
+        """按分配结果调整工具参数"""
+        adjusted = dict(params)
+
+        if requested and granted_threads < requested:
+            factor = granted_threads / requested
+            for name in TOOL_CONCURRENCY_PARAMS.get(tool_name, []):
+                value = params.get(name)
+                if isinstance(value, int) and value > 0:
+                    adjusted[name] = max(1, int(value * factor))
+            self.logger.info(
+                f"{tool_name} 并发由 {requested} 调整为 {granted_threads}（全局预算 {self.thread_budget}）"
+            )
+
+        rate_param = TOOL_RATE_PARAMS.get(tool_name)
+        if rate_param and granted_rate:
+            adjusted[rate_param] = granted_rate
+
+        return adjusted
+
+    def throttle(self, ip: str):
+        """
+        按单IP速率上限等待（供进程内的扫描引擎在每次请求前调用）
+
+        Args:
+            ip: 目标IP
+        """
+        delay = self.throttle_delay(ip)
+        if delay > 0:
+            time.sleep(delay)
+
+    def throttle_delay(self, ip: str) -> float:
+        """
+        取出目标IP的一个令牌并返回需要等待的秒数（供异步引擎使用，由调用方自行等待）
+
+        Args:
+            ip: 目标IP
+
+        Returns:
+            float: 等待秒数
+        """
+        with self._bucket_lock:
+            bucket = self._buckets.get(ip)
+            if bucket is None:
+                bucket = self._buckets[ip] = TokenBucket(self.per_ip_rate)
+            return bucket.reserve()
+
+
+_governor: Optional[ResourceGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> ResourceGovernor:
+    """获取全局资源调度器（整个运行共享一个实例）"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor()
+        return _governor
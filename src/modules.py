@@ -3,13 +3,17 @@ Luna 工具模块
 各工具的具体实现
 """
 
-import json
 import csv
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
-from .tools_wrapper import ToolWrapper
-from .utils import read_file_lines
+from .config import DNS_RESOLVERS
+from .tools_wrapper import ToolWrapper, BuiltinToolWrapper
+from .utils import iter_file_lines
+from .parsers import (
+    RecordStream, iter_jsonl, iter_httpx_results, iter_dirsearch_results,
+    iter_ffuf_results, iter_field, iter_fscan_records
+)
 
 
 class OneForAllWrapper(ToolWrapper):
@@ -136,14 +140,13 @@ class PuzzleWrapper(ToolWrapper):
         """解析puzzle输出"""
         subdomains = []
         ips = []
+        ip_map = {}
         
         # 从输出文件读取
         result_file = self.module_dir / "puzzle_result.txt"
         if result_file.exists():
-            lines = read_file_lines(result_file)
-            
-            for line in lines:
-                # puzzle输出格式通常是: subdomain [IP]
+            for line in iter_file_lines(result_file):
+                # puzzle输出格式通常是: subdomain [IP]（多个IP以逗号分隔）
                 parts = line.split()
                 if parts:
                     subdomain = parts[0]
@@ -151,13 +154,16 @@ class PuzzleWrapper(ToolWrapper):
                     
                     # 提取IP
                     if len(parts) > 1:
-                        ip = parts[1].strip('[]')
-                        if ip:
-                            ips.append(ip)
+                        for ip in parts[1].strip('[]').split(','):
+                            ip = ip.strip()
+                            if ip:
+                                ips.append(ip)
+                                ip_map.setdefault(subdomain, []).append(ip)
         
         return {
             "subdomains": subdomains,
             "ips": list(set(ips)),  # 去重
+            "ip_map": ip_map,
             "count": len(subdomains)
         }
 
@@ -188,6 +194,11 @@ class HttpxWrapper(ToolWrapper):
         timeout = params.get("timeout", 10)
         cmd.extend(["-timeout", str(timeout)])
         
+        # 每秒请求数上限
+        rate_limit = params.get("rate_limit")
+        if rate_limit:
+            cmd.extend(["-rl", str(rate_limit)])
+        
         # 状态码
         if params.get("status_code", True):
             cmd.append("-status-code")
@@ -211,36 +222,24 @@ class HttpxWrapper(ToolWrapper):
         return cmd
     
     def parse_output(self, output: str, output_file: Optional[Path] = None) -> Dict[str, Any]:
-        """解析httpx输出"""
-        results = []
+        """
+        解析httpx输出
         
-        # 从JSON文件读取
+        结果以记录流的形式返回，遍历时才从JSONL文件逐行读取
+        """
+        # httpx输出的是JSONL格式（每行一个JSON对象）
         result_file = self.module_dir / "httpx_result.json"
-        if result_file.exists():
-            try:
-                # httpx输出的是JSONL格式（每行一个JSON对象）
-                with open(result_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            try:
-                                item = json.loads(line)
-                                result = {
-                                    'url': item.get('url', ''),
-                                    'status_code': item.get('status-code', item.get('status_code', 0)),
-                                    'title': item.get('title', ''),
-                                    'content_length': item.get('content-length', item.get('content_length', 0)),
-                                    'tech': item.get('tech', [])
-                                }
-                                results.append(result)
-                            except json.JSONDecodeError:
-                                continue
-            except Exception as e:
-                self.logger.error(f"解析httpx结果失败: {e}")
         
         return {
-            "results": results,
-            "count": len(results)
+            "results": RecordStream(lambda: self._iter_results(result_file))
         }
+    
+    def _iter_results(self, result_file: Path):
+        """逐条读取httpx结果"""
+        try:
+            yield from iter_httpx_results(result_file)
+        except Exception as e:
+            self.logger.error(f"解析httpx结果失败: {e}")
 
 
 class DirsearchWrapper(ToolWrapper):
@@ -274,6 +273,11 @@ class DirsearchWrapper(ToolWrapper):
         timeout = params.get("timeout", 10)
         cmd.extend(["--timeout", str(timeout)])
         
+        # 每秒请求数上限
+        rate_limit = params.get("rate_limit")
+        if rate_limit:
+            cmd.extend(["--max-rate", str(rate_limit)])
+        
         # 递归
         if params.get("recursive", False):
             cmd.append("-r")
@@ -291,31 +295,25 @@ class DirsearchWrapper(ToolWrapper):
         return cmd
     
     def parse_output(self, output: str, output_file: Optional[Path] = None) -> Dict[str, Any]:
-        """解析dirsearch输出"""
-        urls = []
+        """
+        解析dirsearch输出
         
-        # 从JSON文件读取
+        结果以记录流的形式返回，遍历时才从JSON文件逐条读取
+        """
         result_file = self.module_dir / "dirsearch_result.json"
-        if result_file.exists():
-            try:
-                with open(result_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # dirsearch的JSON格式可能不同，需要适配
-                    if isinstance(data, dict):
-                        for url, info in data.items():
-                            urls.append(url)
-                    elif isinstance(data, list):
-                        for item in data:
-                            if 'url' in item:
-                                urls.append(item['url'])
-            except Exception as e:
-                self.logger.error(f"解析dirsearch结果失败: {e}")
+        results = RecordStream(lambda: self._iter_results(result_file))
         
         return {
-            "urls": urls,
-            "count": len(urls)
+            "urls": RecordStream(lambda: iter_field(results, 'url')),
+            "results": results
         }
+    
+    def _iter_results(self, result_file: Path):
+        """逐条读取dirsearch结果"""
+        try:
+            yield from iter_dirsearch_results(result_file)
+        except Exception as e:
+            self.logger.error(f"解析dirsearch结果失败: {e}")
 
 
 class FfufWrapper(ToolWrapper):
@@ -348,10 +346,19 @@ class FfufWrapper(ToolWrapper):
         timeout = params.get("timeout", 10)
         cmd.extend(["-timeout", str(timeout)])
         
+        # 每秒请求数上限
+        rate_limit = params.get("rate_limit")
+        if rate_limit:
+            cmd.extend(["-rate", str(rate_limit)])
+        
         # 匹配状态码
         mc = params.get("mc", "200,301,302,403")
         cmd.extend(["-mc", mc])
         
+        # 自动校准（过滤与随机路径响应相同的结果）
+        if params.get("auto_calibrate", False):
+            cmd.append("-ac")
+        
         # 递归
         if params.get("recursion", False):
             cmd.append("-recursion")
@@ -365,29 +372,25 @@ class FfufWrapper(ToolWrapper):
         return cmd
     
     def parse_output(self, output: str, output_file: Optional[Path] = None) -> Dict[str, Any]:
-        """解析ffuf输出"""
-        urls = []
+        """
+        解析ffuf输出
         
-        # 从JSON文件读取
+        结果以记录流的形式返回，遍历时才从JSON文件逐条读取
+        """
         result_file = self.module_dir / "ffuf_result.json"
-        if result_file.exists():
-            try:
-                with open(result_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    results = data.get('results', [])
-                    for item in results:
-                        url = item.get('url', '')
-                        if url:
-                            urls.append(url)
-            except Exception as e:
-                self.logger.error(f"解析ffuf结果失败: {e}")
+        results = RecordStream(lambda: self._iter_results(result_file))
         
         return {
-            "urls": urls,
-            "results": urls,  # 兼容性
-            "count": len(urls)
+            "urls": RecordStream(lambda: iter_field(results, 'url')),
+            "results": results
         }
+    
+    def _iter_results(self, result_file: Path):
+        """逐条读取ffuf结果"""
+        try:
+            yield from iter_ffuf_results(result_file)
+        except Exception as e:
+            self.logger.error(f"解析ffuf结果失败: {e}")
 
 
 class FscanWrapper(ToolWrapper):
@@ -432,27 +435,61 @@ class FscanWrapper(ToolWrapper):
         return cmd
     
     def parse_output(self, output: str, output_file: Optional[Path] = None) -> Dict[str, Any]:
-        """解析fscan输出"""
-        ports = []
+        """
+        解析fscan输出
+        
+        逐行解析结果文件，提取开放端口、服务Banner、Web标题以及
+        漏洞/弱口令等发现；结果文件不存在时解析标准输出
+        """
+        ports: Dict[tuple, Dict[str, Any]] = {}
+        web_titles = []
+        findings = []
         
-        # 从输出文件读取
         result_file = self.module_dir / "fscan_result.txt"
-        if result_file.exists():
-            lines = read_file_lines(result_file)
-            
-            for line in lines:
-                # 简单解析（fscan输出格式较复杂，这里只是示例）
-                # 实际需要根据fscan的具体输出格式进行解析
-                if "open" in line.lower():
-                    # 提取IP和端口信息
-                    # 这里需要根据实际输出格式调整
-                    pass
+        
+        try:
+            if result_file.exists():
+                self._collect_records(iter_file_lines(result_file), ports, web_titles, findings)
+            else:
+                self._collect_records(output.splitlines(), ports, web_titles, findings)
+        except Exception as e:
+            self.logger.error(f"解析fscan结果失败: {e}")
         
         return {
-            "ports": ports,
-            "raw_output": output,
+            "ports": list(ports.values()),
+            "web_titles": web_titles,
+            "findings": findings,
             "count": len(ports)
         }
+    
+    def _collect_records(self, lines, ports: Dict[tuple, Dict[str, Any]],
+                         web_titles: List[Dict[str, Any]], findings: List[Dict[str, Any]]):
+        """
+        汇总fscan记录
+        
+        同一IP:端口的多条记录合并为一条，服务和Banner取最先识别到的值
+        """
+        for kind, record in iter_fscan_records(lines):
+            if kind == 'finding':
+                findings.append(record)
+                continue
+            
+            if kind == 'web':
+                web_titles.append(record)
+                record = {
+                    'ip': record['ip'],
+                    'port': record['port'],
+                    'service': record['url'].split('://', 1)[0],
+                    'banner': record['title']
+                }
+            
+            key = (record['ip'], record['port'])
+            existing = ports.get(key)
+            if existing is None:
+                ports[key] = record
+            else:
+                existing['service'] = existing['service'] or record['service']
+                existing['banner'] = existing['banner'] or record['banner']
 
 
 class TXPortMapWrapper(ToolWrapper):
@@ -498,9 +535,7 @@ class TXPortMapWrapper(ToolWrapper):
         # 从输出文件读取
         result_file = self.module_dir / "txportmap_result.txt"
         if result_file.exists():
-            lines = read_file_lines(result_file)
-            
-            for line in lines:
+            for line in iter_file_lines(result_file):
                 # TXPortMap输出格式: IP:PORT SERVICE
                 parts = line.split()
                 if len(parts) >= 2:
@@ -519,3 +554,155 @@ class TXPortMapWrapper(ToolWrapper):
             "ports": ports,  # 兼容性
             "count": len(ports)
         }
+
+
+class HttpProbeWrapper(BuiltinToolWrapper):
+    """内置HTTP探测引擎封装（httpx不存在时的替代）"""
+    
+    def __init__(self, output_dir: Path):
+        super().__init__("httpprobe", output_dir)
+        self.module_dir = output_dir / "httpprobe"
+        self.module_dir.mkdir(parents=True, exist_ok=True)
+    
+    def run_engine(self, target: str, params: Dict[str, Any], timeout: int) -> str:
+        """运行内置HTTP探测"""
+        from .engines import HttpProber
+        
+        prober = HttpProber(
+            threads=params.get("threads", 50),
+            timeout=params.get("timeout", 10),
+            follow_redirects=params.get("follow_redirects", False),
+            tech_detect=params.get("tech_detect", False),
+            rate_limit=params.get("rate_limit")
+        )
+        alive = prober.run(self._iter_inputs(target), self.module_dir / "httpprobe_result.json",
+                           timeout=timeout)
+        
+        return f"探测到 {alive} 个HTTP服务"
+    
+    def parse_output(self, output: str, output_file: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        解析探测结果（与httpx结果格式相同）
+        """
+        result_file = self.module_dir / "httpprobe_result.json"
+        
+        return {
+            "results": RecordStream(lambda: self._iter_results(result_file))
+        }
+    
+    def _iter_results(self, result_file: Path):
+        """逐条读取探测结果"""
+        try:
+            yield from iter_httpx_results(result_file)
+        except Exception as e:
+            self.logger.error(f"解析探测结果失败: {e}")
+
+
+class PortScanWrapper(BuiltinToolWrapper):
+    """内置端口扫描引擎封装（TXPortMap/fscan不存在时的替代）"""
+    
+    def __init__(self, output_dir: Path):
+        super().__init__("portscan", output_dir)
+        self.module_dir = output_dir / "portscan"
+        self.module_dir.mkdir(parents=True, exist_ok=True)
+    
+    def run_engine(self, target: str, params: Dict[str, Any], timeout: int) -> str:
+        """运行内置端口扫描"""
+        from .engines import PortScanner, parse_port_spec
+        
+        # 兼容TXPortMap的port_range和fscan的port参数
+        port_spec = params.get("port_range") or params.get("port") or "top1000"
+        
+        scanner = PortScanner(
+            parse_port_spec(port_spec),
+            threads=params.get("threads", 500),
+            timeout=params.get("timeout", 3),
+            banner=params.get("banner", True),
+            rate_limit=params.get("rate_limit")
+        )
+        found = scanner.run(self._iter_inputs(target), self.module_dir / "portscan_result.json",
+                            timeout=timeout)
+        
+        return f"发现 {found} 个开放端口"
+    
+    def parse_output(self, output: str, output_file: Optional[Path] = None) -> Dict[str, Any]:
+        """解析扫描结果（记录格式与TXPortMap相同）"""
+        result_file = self.module_dir / "portscan_result.json"
+        ports = list(iter_jsonl(result_file)) if result_file.exists() else []
+        
+        return {
+            "results": ports,
+            "ports": ports,  # 兼容性
+            "count": len(ports)
+        }
+
+
+def create_dns_resolver(params: Dict[str, Any]):
+    """
+    按dnsresolve的工具参数创建DNS解析引擎
+    
+    Args:
+        params: dnsresolve工具参数（resolvers可为列表或逗号分隔的字符串，
+                scope为泛解析检测的目标域名列表，由执行流程设置）
+    
+    Returns:
+        DnsResolver: 解析引擎
+    """
+    from .engines import DnsResolver
+    
+    resolvers = params.get("resolvers") or []
+    if isinstance(resolvers, str):
+        resolvers = [resolver.strip() for resolver in resolvers.split(',') if resolver.strip()]
+    resolvers = resolvers or DNS_RESOLVERS
+    
+    return DnsResolver(
+        resolvers,
+        threads=params.get("threads", 200),
+        timeout=params.get("timeout", 2),
+        retries=params.get("retries", 2),
+        ipv6=params.get("ipv6", True),
+        scope=params.get("scope") or ()
+    )
+
+
+class DnsResolveWrapper(BuiltinToolWrapper):
+    """内置DNS解析引擎封装"""
+    
+    def __init__(self, output_dir: Path):
+        super().__init__("dnsresolve", output_dir)
+        self.module_dir = output_dir / "dnsresolve"
+        self.module_dir.mkdir(parents=True, exist_ok=True)
+    
+    def run_engine(self, target: str, params: Dict[str, Any], timeout: int) -> str:
+        """运行内置DNS解析"""
+        resolver = create_dns_resolver(params)
+        resolved = resolver.run(
+            self._iter_inputs(target), self.module_dir / "dnsresolve_result.json",
+            detect_wildcard=params.get("wildcard", True),
+            timeout=timeout
+        )
+        
+        return f"解析成功 {resolved} 个域名"
+    
+    def parse_output(self, output: str, output_file: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        解析DNS结果
+        
+        泛解析命中的子域名保留在结果中（标记wildcard）
+        """
+        result_file = self.module_dir / "dnsresolve_result.json"
+        records = list(iter_jsonl(result_file)) if result_file.exists() else []
+        
+        ip_map = {}
+        ips = set()
+        for record in records:
+            if record.get('ips'):
+                ip_map[record['subdomain']] = record['ips']
+                ips.update(record['ips'])
+        
+        return {
+            "results": records,
+            "ips": sorted(ips),
+            "ip_map": ip_map,
+            "count": len(records)
+        }
@@ -0,0 +1,448 @@
+"""
+Luna 流式解析模块
+逐条解析工具的JSON/JSONL输出，避免一次性加载整个结果文件
+"""
+
+import re
+import json
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+# 优先使用更快的JSON解码器
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# 每次读取的字符数
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class RecordStream:
+    """
+    可重复迭代的记录流
+
+    每次迭代都会重新调用工厂函数，从结果文件中逐条读取记录，
+    因此可以像列表一样被多次遍历，但不会在内存中保存全部记录
+    """
+
+    def __init__(self, factory: Callable[[], Iterator[Any]]):
+        """
+        初始化记录流
+
+        Args:
+            factory: 返回记录迭代器的函数
+        """
+        self._factory = factory
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._factory())
+
+
+def iter_jsonl(file_path) -> Iterator[Any]:
+    """
+    逐行解析JSONL文件
+
+    Args:
+        file_path: 文件路径
+
+    Yields:
+        解析后的JSON对象（无法解析的行会被跳过）
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        return
+
+    with open(file_path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield _loads(line)
+            except ValueError:
+                continue
+
+
+class _JsonEventReader:
+    """增量JSON读取器，按需从文件读取数据并逐个解码值"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """读取更多数据，返回是否读到了新数据"""
+        if self.eof:
+            return False
+
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符（文件结束返回空字符串）"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """读取一个结构字符，必须属于chars"""
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"JSON格式错误: 期望 {chars!r}，实际为 {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        """解码下一个完整的JSON值"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # 值恰好位于缓冲区末尾时（如数字）可能被截断，需继续读取确认
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_json_records(file_path) -> Iterator[Tuple[Optional[str], Any]]:
+    """
+    事件式解析JSON文件，逐条返回记录
+
+    - 顶层为数组时，逐个返回 (None, 元素)
+    - 顶层为对象时，数组类型的值逐个返回 (键, 元素)，其他值返回 (键, 值)
+
+    Args:
+        file_path: 文件路径
+
+    Yields:
+        Tuple: (所属键, 记录)
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        return
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = _JsonEventReader(f)
+
+        first = reader.peek()
+        if not first:
+            return
+
+        if first == '[':
+            yield from ((None, item) for item in _iter_array(reader))
+            return
+
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+
+        while True:
+            key = reader.value()
+            reader.expect(':')
+
+            if reader.peek() == '[':
+                for item in _iter_array(reader):
+                    yield key, item
+            else:
+                yield key, reader.value()
+
+            if reader.expect(',}') == '}':
+                return
+
+
+def _iter_array(reader: _JsonEventReader) -> Iterator[Any]:
+    """逐个返回数组元素（读取器位于'['处）"""
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+def iter_httpx_results(file_path) -> Iterator[dict]:
+    """
+    逐条解析httpx的JSONL结果
+
+    Args:
+        file_path: httpx结果文件
+
+    Yields:
+        Dict: 探测结果
+    """
+    for item in iter_jsonl(file_path):
+        if not isinstance(item, dict):
+            continue
+        yield {
+            'input': item.get('input', ''),
+            'url': item.get('url', ''),
+            'status_code': item.get('status-code', item.get('status_code', 0)),
+            'title': item.get('title', ''),
+            'content_length': item.get('content-length', item.get('content_length', 0)),
+            'tech': item.get('tech', [])
+        }
+
+
+def iter_dirsearch_results(file_path) -> Iterator[dict]:
+    """
+    逐条解析dirsearch的JSON结果
+
+    兼容新版格式 {"info": ..., "results": [{"url": ...}]}、
+    旧版格式 {"http://host/": [{"path": ..., "status": ...}]} 以及顶层数组
+
+    Args:
+        file_path: dirsearch结果文件
+
+    Yields:
+        Dict: {'url', 'status', 'length'}
+    """
+    for key, item in iter_json_records(file_path):
+        if not isinstance(item, dict):
+            continue
+
+        url = item.get('url', '')
+        if not url and key and key.startswith(('http://', 'https://')):
+            path = item.get('path', '')
+            url = key.rstrip('/') + '/' + path.lstrip('/') if path else key
+
+        if url:
+            yield {
+                'url': url,
+                'status': item.get('status', 0),
+                'length': item.get('content-length', item.get('content_length', 0))
+            }
+
+
+def iter_ffuf_results(file_path) -> Iterator[dict]:
+    """
+    逐条解析ffuf的JSON结果（只读取results数组）
+
+    Args:
+        file_path: ffuf结果文件
+
+    Yields:
+        Dict: {'url', 'status', 'length'}
+    """
+    for key, item in iter_json_records(file_path):
+        if key != 'results' or not isinstance(item, dict):
+            continue
+
+        url = item.get('url', '')
+        if url:
+            yield {
+                'url': url,
+                'status': item.get('status', 0),
+                'length': item.get('length', 0)
+            }
+
+
+# fscan输出格式
+_IPV4 = r'\d{1,3}(?:\.\d{1,3}){3}'
+
+# 192.168.1.1:22 open / [+] 端口开放 192.168.1.1:22
+FSCAN_OPEN_PATTERN = re.compile(
+    rf'(?:^|\s)(?P<ip>{_IPV4}):(?P<port>\d{{1,5}})\s+open\b'
+    rf'|端口开放\s+(?P<ip2>{_IPV4}):(?P<port2>\d{{1,5}})'
+)
+
+# [+] 服务识别 192.168.1.1:22 => [ssh] SSH-2.0-OpenSSH_7.4
+FSCAN_SERVICE_PATTERN = re.compile(
+    rf'(?P<ip>{_IPV4}):(?P<port>\d{{1,5}})\s*=>\s*\[?(?P<service>[\w\-.]+)\]?\s*(?P<banner>.*)$'
+)
+
+# [*] WebTitle: http://192.168.1.1:8080 code:200 len:612 title:Welcome to nginx!
+FSCAN_WEBTITLE_PATTERN = re.compile(
+    r'WebTitle:?\s*(?P<url>https?://\S+)\s+code:(?P<code>\d+)\s+len:(?P<len>\d+)\s+title:(?P<title>.*?)'
+    r'(?:\s+跳转url:\s*\S+)?\s*$'
+)
+
+# [+] mysql:192.168.1.1:3306:root 123456 / [+] Redis 192.168.1.1:6379 unauthorized
+FSCAN_SERVICE_FINDING_PATTERN = re.compile(
+    rf'^\[\+\]\s*(?P<service>[A-Za-z][\w\-]*)(?::|\s+)(?:[a-z]+://)?(?P<ip>{_IPV4}):(?P<port>\d{{1,5}})(?P<rest>.*)$'
+)
+
+# [+] http://192.168.1.1:8080 poc-yaml-thinkphp5023-method-rce
+FSCAN_POC_PATTERN = re.compile(r'(?P<url>https?://\S+)\s+(?P<poc>poc-yaml-\S+)')
+
+# [+] MS17-010 192.168.1.1 (Windows Server 2008 R2)
+FSCAN_VULN_PATTERN = re.compile(r'\b(?P<vuln>MS17-010|SMBGhost|DOUBLEPULSAR|CVE-\d{4}-\d{4,})\b', re.IGNORECASE)
+
+# [+] InfoScan http://192.168.1.1:80 [Weblogic]
+FSCAN_INFOSCAN_PATTERN = re.compile(r'InfoScan:?\s*(?P<url>https?://\S+)\s+\[(?P<detail>.+)\]')
+
+FSCAN_IP_PATTERN = re.compile(_IPV4)
+
+_UNAUTHORIZED_KEYWORDS = ('unauthorized', '未授权')
+_SMB_VULNS = ('MS17-010', 'SMBGHOST', 'DOUBLEPULSAR')
+
+
+def _url_ip_port(url: str) -> Tuple[str, int]:
+    """从URL中提取主机和端口"""
+    scheme, _, rest = url.partition('://')
+    host = rest.split('/', 1)[0]
+    if ':' in host:
+        host, _, port = host.rpartition(':')
+        if port.isdigit():
+            return host, int(port)
+    return host, 443 if scheme == 'https' else 80
+
+
+def iter_fscan_records(lines: Iterable[str]) -> Iterator[Tuple[str, dict]]:
+    """
+    逐行解析fscan输出
+
+    Args:
+        lines: fscan输出行
+
+    Yields:
+        Tuple: (记录类型, 记录)，类型为 'port' / 'web' / 'finding'
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # 端口开放（最常见的 "IP:端口 open" 行走字符串快速路径）
+        if line.endswith(' open'):
+            ip, sep, port = line[:-5].rstrip().rpartition(' ')[2].rpartition(':')
+            if sep and port.isdigit() and FSCAN_IP_PATTERN.fullmatch(ip):
+                yield 'port', {'ip': ip, 'port': int(port), 'service': '', 'banner': ''}
+                continue
+
+        if 'open' in line or '端口开放' in line:
+            match = FSCAN_OPEN_PATTERN.search(line)
+            if match:
+                yield 'port', {
+                    'ip': match.group('ip') or match.group('ip2'),
+                    'port': int(match.group('port') or match.group('port2')),
+                    'service': '',
+                    'banner': ''
+                }
+                continue
+
+        # 服务识别（Banner）
+        if '=>' in line:
+            match = FSCAN_SERVICE_PATTERN.search(line)
+            if match:
+                yield 'port', {
+                    'ip': match.group('ip'),
+                    'port': int(match.group('port')),
+                    'service': match.group('service').lower(),
+                    'banner': match.group('banner').strip()
+                }
+                continue
+
+        # Web标题
+        if 'WebTitle' in line:
+            match = FSCAN_WEBTITLE_PATTERN.search(line)
+            if match:
+                url = match.group('url')
+                ip, port = _url_ip_port(url)
+                yield 'web', {
+                    'url': url,
+                    'ip': ip,
+                    'port': port,
+                    'status_code': int(match.group('code')),
+                    'content_length': int(match.group('len')),
+                    'title': match.group('title').strip()
+                }
+                continue
+
+        if not line.startswith('[+]'):
+            continue
+
+        # 漏洞（POC）
+        match = FSCAN_POC_PATTERN.search(line)
+        if match:
+            ip, port = _url_ip_port(match.group('url'))
+            yield 'finding', {
+                'type': 'vulnerability',
+                'target': match.group('url'),
+                'ip': ip,
+                'port': port,
+                'service': 'http',
+                'detail': match.group('poc')
+            }
+            continue
+
+        # Web指纹
+        match = FSCAN_INFOSCAN_PATTERN.search(line)
+        if match:
+            ip, port = _url_ip_port(match.group('url'))
+            yield 'finding', {
+                'type': 'fingerprint',
+                'target': match.group('url'),
+                'ip': ip,
+                'port': port,
+                'service': 'http',
+                'detail': match.group('detail')
+            }
+            continue
+
+        # 弱口令 / 未授权访问
+        match = FSCAN_SERVICE_FINDING_PATTERN.match(line)
+        if match and not FSCAN_VULN_PATTERN.search(match.group('service')):
+            rest = match.group('rest')
+            if rest.startswith(':'):
+                finding_type = 'weak_password'
+                detail = rest[1:].strip()
+            elif any(keyword in rest.lower() for keyword in _UNAUTHORIZED_KEYWORDS):
+                finding_type = 'unauthorized'
+                detail = rest.strip()
+            else:
+                finding_type = 'finding'
+                detail = rest.strip()
+
+            yield 'finding', {
+                'type': finding_type,
+                'target': f"{match.group('ip')}:{match.group('port')}",
+                'ip': match.group('ip'),
+                'port': int(match.group('port')),
+                'service': match.group('service').lower(),
+                'detail': detail
+            }
+            continue
+
+        # 系统漏洞（MS17-010等）
+        match = FSCAN_VULN_PATTERN.search(line)
+        if match:
+            ip_match = FSCAN_IP_PATTERN.search(line)
+            ip = ip_match.group(0) if ip_match else ''
+            smb = match.group('vuln').upper() in _SMB_VULNS
+            yield 'finding', {
+                'type': 'vulnerability',
+                'target': ip,
+                'ip': ip,
+                'port': 445 if smb else 0,
+                'service': 'smb' if smb else '',
+                'detail': line[3:].strip()
+            }
+
+
+def iter_field(records: Iterable[dict], field: str) -> Iterator[Any]:
+    """从记录流中提取单个字段"""
+    for record in records:
+        yield record[field]
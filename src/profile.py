@@ -3,12 +3,14 @@ Luna 流程管理模块
 负责流程的创建、加载、保存和管理
 """
 
+import os
+import copy
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
-from .config import PROFILES_DIR, TOOL_INFO, get_default_params
+from .config import PROFILES_DIR, PROFILE_INDEX_FILE, TOOL_INFO, get_default_params
 from .utils import (
     load_json, save_json, ask_yes_no, ask_input, 
     ask_choice, print_header, print_section, print_success,
@@ -97,11 +99,10 @@ class Profile:
         Returns:
             Profile: 流程对象，如果不存在则返回None
         """
-        file_path = PROFILES_DIR / f"{name}.json"
-        if not file_path.exists():
+        data = ProfileRegistry.get_data(name)
+        if data is None:
             return None
         
-        data = load_json(file_path)
         return cls.from_dict(data)
     
     def display(self):
@@ -127,6 +128,178 @@ class Profile:
                 print(f"       - {key}: {value}")
 
 
+def validate_profile_data(data: Any) -> List[str]:
+    """
+    按流程结构校验流程数据
+    
+    Args:
+        data: 流程JSON数据
+    
+    Returns:
+        List[str]: 错误列表（为空表示合法）
+    """
+    if not isinstance(data, dict):
+        return ["流程必须是JSON对象"]
+    
+    errors = []
+    
+    if not isinstance(data.get("name"), str) or not data.get("name"):
+        errors.append("name 必须是非空字符串")
+    if not isinstance(data.get("description", ""), str):
+        errors.append("description 必须是字符串")
+    
+    tools = data.get("tools", [])
+    if not isinstance(tools, list):
+        return errors + ["tools 必须是列表"]
+    
+    for i, tool in enumerate(tools, 1):
+        if not isinstance(tool, dict):
+            errors.append(f"tools[{i}] 必须是对象")
+            continue
+        
+        tool_name = tool.get("name")
+        if tool_name not in TOOL_INFO:
+            errors.append(f"tools[{i}] 未知的工具: {tool_name}")
+        if not isinstance(tool.get("order", i), int):
+            errors.append(f"tools[{i}] order 必须是整数")
+        if tool.get("alias") is not None and not isinstance(tool.get("alias"), str):
+            errors.append(f"tools[{i}] alias 必须是字符串或null")
+        if not isinstance(tool.get("params", {}), dict):
+            errors.append(f"tools[{i}] params 必须是对象")
+    
+    return errors
+
+
+class ProfileRegistry:
+    """
+    流程注册表
+    
+    维护流程索引缓存（名称、描述、修改时间、工具列表及校验结果），
+    按文件修改时间失效；list/show 只读取索引，文件未变化时不重新解析JSON
+    """
+    
+    # 进程内已加载的流程数据: 名称 -> (mtime_ns, size, 数据)
+    _loaded: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+    
+    @staticmethod
+    def _stat(name: str) -> Optional[os.stat_result]:
+        """获取流程文件状态（不存在返回None）"""
+        try:
+            return os.stat(PROFILES_DIR / f"{name}.json")
+        except OSError:
+            return None
+    
+    @classmethod
+    def get_data(cls, name: str) -> Optional[Dict[str, Any]]:
+        """
+        获取流程数据（文件未变化时使用进程内缓存）
+        
+        Args:
+            name: 流程名称
+        
+        Returns:
+            Dict: 流程数据副本，不存在返回None
+        """
+        stat = cls._stat(name)
+        if stat is None:
+            cls._loaded.pop(name, None)
+            return None
+        
+        cached = cls._loaded.get(name)
+        if not cached or cached[0] != stat.st_mtime_ns or cached[1] != stat.st_size:
+            data = load_json(PROFILES_DIR / f"{name}.json")
+            cached = (stat.st_mtime_ns, stat.st_size, data)
+            cls._loaded[name] = cached
+        
+        # 返回副本，调用方修改参数不影响缓存
+        return copy.deepcopy(cached[2])
+    
+    @classmethod
+    def index(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        获取流程索引
+        
+        只重新解析修改时间或大小发生变化的流程文件，并在解析时完成一次校验
+        
+        Returns:
+            Dict: 流程名称 -> {description, tools, mtime_ns, size, errors}
+        """
+        # 索引损坏（如写入中断）时视为空索引并重建
+        try:
+            old_index = load_json(PROFILE_INDEX_FILE)
+        except (OSError, ValueError):
+            old_index = {}
+        if not isinstance(old_index, dict):
+            old_index = {}
+        index = {}
+        changed = False
+        
+        if PROFILES_DIR.exists():
+            with os.scandir(PROFILES_DIR) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or not entry.is_file():
+                        continue
+                    
+                    name = entry.name[:-len(".json")]
+                    stat = entry.stat()
+                    old = old_index.get(name)
+                    
+                    if (isinstance(old, dict) and old.get('mtime_ns') == stat.st_mtime_ns
+                            and old.get('size') == stat.st_size):
+                        index[name] = old
+                        continue
+                    
+                    index[name] = cls._index_entry(Path(entry.path), stat)
+                    changed = True
+        
+        if changed or set(index) != set(old_index):
+            try:
+                cls._save_index(index)
+            except OSError:
+                # 索引只是缓存，无法写入时不影响使用
+                pass
+        
+        return index
+    
+    @staticmethod
+    def _save_index(index: Dict[str, Dict[str, Any]]):
+        """写入临时文件后替换索引文件，写入中断不会留下损坏的索引"""
+        PROFILE_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = PROFILE_INDEX_FILE.with_name(f"{PROFILE_INDEX_FILE.name}.tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, PROFILE_INDEX_FILE)
+        except OSError:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+    
+    @staticmethod
+    def _index_entry(file_path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        """解析并校验流程文件，生成索引项"""
+        try:
+            data = load_json(file_path)
+            errors = validate_profile_data(data)
+        except (OSError, ValueError) as e:
+            data = {}
+            errors = [f"无法解析: {e}"]
+        
+        tools = data.get('tools', []) if isinstance(data, dict) else []
+        return {
+            'description': data.get('description', '') if isinstance(data, dict) else '',
+            'tools': [tool.get('name') for tool in tools if isinstance(tool, dict)],
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'errors': errors
+        }
+    
+    @classmethod
+    def errors(cls, name: str) -> List[str]:
+        """获取流程的校验错误（来自索引）"""
+        return cls.index().get(name, {}).get('errors', [])
+
+
 class ProfileManager:
     """流程管理器"""
     
@@ -138,10 +311,7 @@ class ProfileManager:
         Returns:
             List[str]: 流程名称列表
         """
-        profiles = []
-        for file_path in PROFILES_DIR.glob("*.json"):
-            profiles.append(file_path.stem)
-        return sorted(profiles)
+        return sorted(ProfileRegistry.index())
     
     @staticmethod
     def profile_exists(name: str) -> bool:
@@ -432,10 +602,13 @@ class ProfileManager:
             "oneforall": ["path"],  # 字典路径
             "puzzle": ["timeout"],
             "httpx": ["threads", "timeout"],
+            "httpprobe": ["threads", "timeout"],
             "dirsearch": ["wordlist", "threads"],
             "ffuf": ["wordlist", "threads"],
             "fscan": ["port", "threads"],
-            "txportmap": ["port_range"]
+            "txportmap": ["port_range"],
+            "portscan": ["port_range", "threads"],
+            "dnsresolve": ["threads"]
         }
         
         keys = key_params.get(tool_name, [])
@@ -0,0 +1,418 @@
+"""
+Luna 进度显示模块
+按工具结果文件的增长显示各阶段进度，根据历史吞吐量估算剩余时间，并写出运行状态文件
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from .config import (
+    PROGRESS_BAR, PROGRESS_INTERVAL, PROGRESS_MIN_SECONDS, THROUGHPUT_FILE, STATUS_DIR,
+    ensure_dir
+)
+from .utils import setup_logger, count_file_lines, LINE_COUNT_CHUNK_SIZE
+
+# tqdm为可选依赖，未安装时只写状态文件
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# 历史吞吐量的平滑系数（新记录所占的权重）
+THROUGHPUT_SMOOTHING = 0.3
+
+
+def format_duration(seconds: float) -> str:
+    """
+    格式化时长
+
+    Args:
+        seconds: 秒数
+
+    Returns:
+        str: H:MM:SS 或 M:SS
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def _write_json_atomic(path: Path, data: Any):
+    """写入临时文件后替换，读取方不会看到写了一半的文件"""
+    ensure_dir(path.parent)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+class ThroughputHistory:
+    """
+    工具的历史吞吐量（每秒处理的输入行数）
+
+    每次执行后按指数平滑更新，跨运行保存在缓存目录中
+    """
+
+    def __init__(self, history_file: Path = THROUGHPUT_FILE):
+        self.history_file = history_file
+        self.logger = setup_logger("Luna.progress")
+        self.records: Dict[str, Dict[str, float]] = {}
+
+        try:
+            with open(history_file, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            if isinstance(records, dict):
+                self.records = records
+        except (OSError, ValueError):
+            pass
+
+    def rate(self, tool_name: str) -> Optional[float]:
+        """获取工具的历史吞吐量（行/秒），没有记录时返回None"""
+        record = self.records.get(tool_name)
+        if isinstance(record, dict) and record.get('rate', 0) > 0:
+            return record['rate']
+        return None
+
+    def estimate(self, tool_name: str, lines: int) -> Optional[float]:
+        """
+        估算工具处理输入所需的时间
+
+        Args:
+            tool_name: 工具名称
+            lines: 输入行数
+
+        Returns:
+            Optional[float]: 预计秒数，没有历史记录时返回None
+        """
+        rate = self.rate(tool_name)
+        return lines / rate if rate else None
+
+    def record(self, tool_name: str, lines: int, seconds: float):
+        """
+        记录一次执行并保存
+
+        Args:
+            tool_name: 工具名称
+            lines: 输入行数
+            seconds: 执行时间
+        """
+        rate = lines / seconds
+        previous = self.rate(tool_name)
+        if previous:
+            rate = previous + THROUGHPUT_SMOOTHING * (rate - previous)
+
+        runs = self.records.get(tool_name, {}).get('runs', 0) if previous else 0
+        self.records[tool_name] = {'rate': rate, 'runs': runs + 1}
+
+        try:
+            _write_json_atomic(self.history_file, self.records)
+        except OSError as e:
+            self.logger.warning(f"保存吞吐量记录失败: {e}")
+
+
+class StageProgress:
+    """单个工具的执行进度（结果数按监视目录中本次执行写入的文件行数统计）"""
+
+    def __init__(self, tool_name: str, alias: str, inputs: int,
+                 watch_dir: Path, expected: Optional[float]):
+        self.tool_name = tool_name
+        self.alias = alias
+        self.inputs = inputs
+        self.watch_dir = watch_dir
+        self.expected = expected
+        self.results = 0
+        # 由调用方在执行成功后设置，执行抛出异常时不计入历史吞吐量
+        self.success = False
+        self.started = time.monotonic()
+        # 修改时间早于开始时间的文件是之前的结果（留1秒余量应对文件系统时间精度）
+        self._since = time.time() - 1
+        # 文件路径 -> [已统计的字节数, 完整行数, 末尾是否有未结束的行]
+        self._counted: Dict[Path, list] = {}
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def eta(self) -> Optional[float]:
+        """预计剩余秒数（超出预计时间时为0），没有历史记录时返回None"""
+        if self.expected is None:
+            return None
+        return max(0.0, self.expected - self.elapsed)
+
+    def poll(self) -> int:
+        """
+        重新统计结果行数（每个文件只读取上次统计之后追加的部分）
+
+        Returns:
+            int: 新增的行数
+        """
+        results = 0
+        try:
+            for path in self.watch_dir.iterdir():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if path.is_file() and stat.st_mtime >= self._since:
+                    _, lines, partial = self._count_appended(path, stat.st_size)
+                    results += lines + partial
+        except OSError:
+            return 0
+
+        added = max(0, results - self.results)
+        self.results = results
+        return added
+
+    def _count_appended(self, path: Path, size: int) -> list:
+        """统计文件新追加部分的行数，文件变小（被重写）时从头统计"""
+        counted = self._counted.get(path)
+        if counted is None or size < counted[0]:
+            counted = self._counted[path] = [0, 0, False]
+
+        if size > counted[0]:
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(counted[0])
+                    remaining = size - counted[0]
+                    while remaining > 0:
+                        chunk = f.read(min(LINE_COUNT_CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        remaining -= len(chunk)
+                        counted[0] += len(chunk)
+                        counted[1] += chunk.count(b'\n')
+                        counted[2] = not chunk.endswith(b'\n')
+            except OSError:
+                pass
+
+        return counted
+
+    def to_dict(self) -> Dict[str, Any]:
+        eta = self.eta
+        return {
+            'tool': self.tool_name,
+            'alias': self.alias,
+            'inputs': self.inputs,
+            'results': self.results,
+            'elapsed': round(self.elapsed, 1),
+            'eta': round(eta, 1) if eta is not None else None,
+        }
+
+
+class RunProgress:
+    """
+    整个运行的进度
+
+    跟踪目标和工具阶段，刷新进度条，并把运行状态原子写入状态文件
+    """
+
+    def __init__(self, profile_name: str, total: Optional[int],
+                 status_file: Optional[Path] = None, show_bar: bool = PROGRESS_BAR):
+        """
+        初始化运行进度
+
+        Args:
+            profile_name: 流程名称
+            total: 目标总数（目标流为None）
+            status_file: 状态文件路径，默认为状态目录下的 <进程号>.json（同时运行的多个流程互不覆盖）
+            show_bar: 是否显示进度条（tqdm未安装时不显示）
+        """
+        self.profile_name = profile_name
+        self.total = total
+        self.status_file = status_file or STATUS_DIR / f"{os.getpid()}.json"
+        self.show_bar = show_bar and tqdm is not None
+        self.history = ThroughputHistory()
+        self.logger = setup_logger("Luna.progress")
+
+        self.state = 'running'
+        self.started = time.monotonic()
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+
+        self.done = 0
+        self.succeeded = 0
+        self.failed = 0
+        # 已完成目标的累计耗时（用于估算剩余目标）
+        self._finished_seconds = 0.0
+
+        self.target: Optional[str] = None
+        self.target_started = 0.0
+        self.stage_index = 0
+        self.stage_count = 0
+        self.stage: Optional[StageProgress] = None
+
+        self._lock = threading.Lock()
+        self.write_status()
+
+    def start_target(self, target: str, stage_count: int):
+        """
+        开始处理目标
+
+        Args:
+            target: 目标
+            stage_count: 流程中的工具数量
+        """
+        self.target = target
+        self.target_started = time.monotonic()
+        self.stage_index = 0
+        self.stage_count = stage_count
+        self.write_status()
+
+    def finish_target(self, success: bool):
+        """目标处理完成"""
+        self.done += 1
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self._finished_seconds += time.monotonic() - self.target_started
+        self.target = None
+        self.write_status()
+
+    def finish(self, completed: bool = True):
+        """
+        运行结束
+
+        Args:
+            completed: 是否正常结束（中断时状态记为aborted）
+        """
+        self.state = 'finished' if completed else 'aborted'
+        self.target = None
+        self.stage = None
+        self.write_status()
+
+    def eta(self) -> Optional[float]:
+        """
+        估算整个运行的剩余时间
+
+        剩余目标按已完成目标的平均耗时估算；还没有完成的目标时只能估算当前阶段
+
+        Returns:
+            Optional[float]: 预计剩余秒数，无法估算时返回None
+        """
+        if self.total is None:
+            return None
+
+        if not self.done:
+            return self.stage.eta if self.stage is not None else None
+
+        average = self._finished_seconds / self.done
+        remaining = max(0, self.total - self.done)
+        if self.target is not None:
+            # 当前目标按平均耗时扣除已用时间
+            current = time.monotonic() - self.target_started
+            return max(0.0, average - current) + average * (remaining - 1)
+        return average * remaining
+
+    @contextmanager
+    def track_stage(self, tool_name: str, alias: str, tool_target: str,
+                    watch_dir: Path) -> Iterator[StageProgress]:
+        """
+        跟踪工具的执行
+
+        执行期间后台线程定期统计结果行数并刷新进度条和状态文件；
+        成功且耗时足够长的执行计入历史吞吐量
+
+        Args:
+            tool_name: 工具名称
+            alias: 工具别名
+            tool_target: 目标或输入文件路径
+            watch_dir: 工具结果目录
+
+        Yields:
+            StageProgress: 阶段进度（调用方设置success）
+        """
+        inputs = count_file_lines(tool_target) if Path(tool_target).is_file() else 1
+        stage = StageProgress(tool_name, alias, inputs, watch_dir,
+                              self.history.estimate(tool_name, inputs))
+
+        self.stage_index += 1
+        self.stage = stage
+        self.write_status()
+
+        bar = None
+        if self.show_bar:
+            # 非终端输出时（disable=None）不显示
+            bar = tqdm(desc=alias, unit='行', leave=False, dynamic_ncols=True, disable=None)
+
+        stop = threading.Event()
+
+        def refresh():
+            added = stage.poll()
+            if bar is not None:
+                if added:
+                    bar.update(added)
+                eta = stage.eta
+                if eta is not None:
+                    bar.set_postfix_str(f"预计剩余 {format_duration(eta)}")
+            self.write_status()
+
+        def monitor():
+            while not stop.wait(PROGRESS_INTERVAL):
+                refresh()
+
+        thread = threading.Thread(target=monitor, name=f"progress-{tool_name}", daemon=True)
+        thread.start()
+        try:
+            yield stage
+        finally:
+            stop.set()
+            thread.join()
+            refresh()
+            if bar is not None:
+                bar.close()
+
+            elapsed = stage.elapsed
+            if stage.success and elapsed >= PROGRESS_MIN_SECONDS:
+                self.history.record(tool_name, inputs, elapsed)
+            self.logger.info(
+                f"{alias} 用时 {format_duration(elapsed)}，输入 {inputs} 行，结果 {stage.results} 行"
+            )
+
+            self.stage = None
+            self.write_status()
+
+    def to_dict(self) -> Dict[str, Any]:
+        eta = self.eta()
+        current = None
+        if self.target is not None:
+            current = {
+                'target': self.target,
+                'elapsed': round(time.monotonic() - self.target_started, 1),
+                'stage_index': self.stage_index,
+                'stage_count': self.stage_count,
+                'stage': self.stage.to_dict() if self.stage is not None else None,
+            }
+
+        return {
+            'profile': self.profile_name,
+            'state': self.state,
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'elapsed': round(time.monotonic() - self.started, 1),
+            'targets': {
+                'total': self.total,
+                'done': self.done,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+            },
+            'current': current,
+            'eta': round(eta, 1) if eta is not None else None,
+        }
+
+    def write_status(self):
+        """写出状态文件（失败只记录日志，不影响扫描）"""
+        with self._lock:
+            try:
+                _write_json_atomic(self.status_file, self.to_dict())
+            except OSError as e:
+                self.logger.debug(f"写入状态文件失败: {e}")
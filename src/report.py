@@ -5,17 +5,189 @@ Luna 报告生成模块
 
 import csv
 import json
+import hashlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+from .utils import setup_logger, iter_file_lines
+from .fingerprint import cluster_probes
+from .targets import canonicalize_url
+from .parsers import iter_json_records
+from .store import UrlStore, PortStore
+from .scope import ScopeIndex, extract_host
 
-from .utils import setup_logger, read_file_lines
+
+# 增量报告缓存目录（位于目标输出目录下）
+REPORT_CACHE_DIRNAME = ".report_cache"
+REPORT_MANIFEST_VERSION = 2
+
+# 报告表格分段及其依赖的输入
+# 输入未变化的分段直接复用缓存行；行文件仅追加时只为新增行构建数据
+REPORT_SECTIONS = {
+    'subdomain_assets': ['subdomains', 'http_probes'],
+    'url_assets': ['urls', 'http_probes'],
+    'ip_ports': ['ip_map', 'ports', 'http_probes'],
+}
+
+
+def _hash_file(file_path: Path, prefix_size: int = -1) -> Tuple[str, Optional[str]]:
+    """
+    计算文件的SHA1，可同时计算前prefix_size字节的SHA1
+    
+    Args:
+        file_path: 文件路径
+        prefix_size: 前缀长度（小于0表示不计算）
+    
+    Returns:
+        Tuple: (完整内容哈希, 前缀哈希)
+    """
+    hasher = hashlib.sha1()
+    prefix_digest = None
+    remaining = prefix_size
+    
+    with open(file_path, 'rb') as f:
+        while True:
+            if remaining >= 0:
+                chunk = f.read(min(remaining, 1 << 20)) if remaining else b''
+                hasher.update(chunk)
+                remaining -= len(chunk)
+                if remaining == 0 or not chunk:
+                    prefix_digest = hasher.copy().hexdigest()
+                    remaining = -1
+                continue
+            
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    
+    return hasher.hexdigest(), prefix_digest
+
+
+class ReportManifest:
+    """
+    报告输入指纹清单
+    
+    记录每个输入文件的大小/修改时间/哈希，用于判断报告各分段是否需要重建
+    """
+    
+    def __init__(self, cache_dir: Path):
+        """
+        初始化清单
+        
+        Args:
+            cache_dir: 报告缓存目录
+        """
+        self.cache_dir = cache_dir
+        self.manifest_file = cache_dir / "manifest.json"
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.current: Dict[str, Dict[str, Any]] = {}
+        self.changes: Dict[str, Dict[str, Any]] = {}
+        
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == REPORT_MANIFEST_VERSION:
+                    self.previous = data.get('inputs', {})
+            except (OSError, ValueError):
+                self.previous = {}
+    
+    def check(self, name: str, files: List[Path]) -> Dict[str, Any]:
+        """
+        检查一个输入（可由多个文件组成）相对上次的变化
+        
+        Args:
+            name: 输入名称
+            files: 组成该输入的文件列表
+        
+        Returns:
+            Dict: 变化信息 {'state': 'unchanged'|'appended'|'changed', 'offset': 追加起始位置}
+        """
+        previous = self.previous.get(name, {})
+        fingerprints = {}
+        states = []
+        offset = 0
+        
+        for file_path in files:
+            if not file_path.exists():
+                continue
+            
+            key = str(file_path)
+            stat = file_path.stat()
+            old = previous.get(key)
+            
+            # 大小和修改时间都未变，视为未变化，不计算哈希
+            if old and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                fingerprints[key] = old
+                states.append('unchanged')
+                continue
+            
+            prefix_size = old['size'] if old and stat.st_size > old['size'] else -1
+            digest, prefix_digest = _hash_file(file_path, prefix_size)
+            fingerprints[key] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha1': digest
+            }
+            
+            if old and old['sha1'] == digest:
+                states.append('unchanged')
+            elif old and prefix_digest == old['sha1']:
+                states.append('appended')
+                offset = old['size']
+            else:
+                states.append('changed')
+        
+        if set(fingerprints) != set(previous):
+            state = 'changed'
+        elif all(state == 'unchanged' for state in states):
+            state = 'unchanged'
+        elif len(states) == 1 and states[0] == 'appended':
+            state = 'appended'
+        else:
+            state = 'changed'
+        
+        self.current[name] = fingerprints
+        self.changes[name] = {'state': state, 'offset': offset}
+        return self.changes[name]
+    
+    def state(self, name: str) -> str:
+        """获取输入的变化状态"""
+        return self.changes.get(name, {}).get('state', 'changed')
+    
+    def offset(self, name: str) -> int:
+        """获取追加输入的起始偏移"""
+        return self.changes.get(name, {}).get('offset', 0)
+    
+    def load_rows(self, section: str) -> Optional[List[Dict[str, Any]]]:
+        """加载分段的缓存行"""
+        rows_file = self.cache_dir / f"{section}.json"
+        if not rows_file.exists():
+            return None
+        
+        try:
+            with open(rows_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save_rows(self, section: str, rows: List[Dict[str, Any]]):
+        """保存分段的缓存行"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        rows_file = self.cache_dir / f"{section}.json"
+        with open(rows_file, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False)
+    
+    def save(self):
+        """保存清单"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': REPORT_MANIFEST_VERSION,
+                'inputs': self.current
+            }, f, indent=2, ensure_ascii=False)
 
 
 class ReportGenerator:
@@ -32,13 +204,14 @@ class ReportGenerator:
         self.domain = domain
         self.output_dir = output_dir
         self.logger = setup_logger(f"Luna.Report.{domain}")
+        self.scope = ScopeIndex([domain])
         
         # 数据容器
         self.web_assets = []  # 表1: Web资产
         self.ip_ports = []    # 表2: IP端口
     
     def load_data(self):
-        """加载所有数据"""
+        """加载所有数据（全量重建）"""
         self.logger.info("开始加载数据")
         
         # 加载子域名
@@ -64,154 +237,296 @@ class ReportGenerator:
         
         self.logger.info(f"数据加载完成: Web资产 {len(self.web_assets)} 条, IP端口 {len(self.ip_ports)} 条")
     
-    def _load_subdomains(self) -> List[str]:
-        """加载子域名列表"""
-        subdomain_file = self.output_dir / "filtered_subdomains.txt"
-        if subdomain_file.exists():
-            return read_file_lines(subdomain_file)
-        return []
+    def load_data_incremental(self):
+        """
+        增量加载数据
+        
+        根据输入文件指纹清单，只重建输入发生变化的表格分段；
+        行文件仅有追加时只为新增行构建数据，其余分段复用缓存
+        """
+        self.logger.info("开始增量加载数据")
+        
+        manifest = ReportManifest(self.output_dir / REPORT_CACHE_DIRNAME)
+        for name, files in self._input_files().items():
+            manifest.check(name, files)
+        
+        # HTTP探测结果按需加载（只加载一次）
+        probes_cache = {}
+        
+        def http_probes():
+            if 'probes' not in probes_cache:
+                probes_cache['probes'] = self._load_http_probes()
+            return probes_cache['probes']
+        
+        input_files = self._input_files()
+        sections = {}
+        for section, inputs in REPORT_SECTIONS.items():
+            states = [manifest.state(name) for name in inputs]
+            unchanged = all(state == 'unchanged' for state in states)
+            # 行文件（子域名/URL）仅追加，且其余输入未变化
+            appended = (section != 'ip_ports' and states[0] == 'appended'
+                        and all(state == 'unchanged' for state in states[1:]))
+            
+            rows = None
+            cached = manifest.load_rows(section) if unchanged or appended else None
+            
+            if cached is not None and unchanged:
+                self.logger.info(f"{section}: 输入未变化，复用缓存 {len(cached)} 行")
+                rows = cached
+            elif cached is not None and appended:
+                new_lines = self._read_appended_lines(
+                    input_files[inputs[0]][0], manifest.offset(inputs[0])
+                )
+                if new_lines is not None:
+                    rows = cached + self._build_section(section, new_lines, http_probes())
+                    self.logger.info(f"{section}: 追加 {len(new_lines)} 行")
+            
+            if rows is None:
+                rows = self._build_section(section, None, http_probes())
+                self.logger.info(f"{section}: 重建 {len(rows)} 行")
+            
+            if rows is not cached:
+                manifest.save_rows(section, rows)
+            sections[section] = rows
+        
+        manifest.save()
+        
+        self.web_assets = sections['subdomain_assets'] + sections['url_assets']
+        self.ip_ports = sections['ip_ports']
+        
+        self.logger.info(f"数据加载完成: Web资产 {len(self.web_assets)} 条, IP端口 {len(self.ip_ports)} 条")
+    
+    def _input_files(self) -> Dict[str, List[Path]]:
+        """报告各输入对应的文件"""
+        return {
+            'subdomains': [self.output_dir / "filtered_subdomains.txt"],
+            'urls': [self.output_dir / "discovered_urls.txt"],
+            'http_probes': sorted(self._http_probe_files()),
+            'ports': [self.output_dir / "port_scan_results.json"],
+            'ip_map': [self.output_dir / "puzzle" / "puzzle_result.txt",
+                       self.output_dir / "dns_results.json"],
+        }
+    
+    def _read_appended_lines(self, file_path: Path, offset: int) -> Optional[List[str]]:
+        """
+        读取文件offset之后追加的行
+        
+        Returns:
+            Optional[List[str]]: 新增行，原末行被续写时返回None（需要重建）
+        """
+        with open(file_path, 'rb') as f:
+            if offset > 0:
+                f.seek(offset - 1)
+                if f.read(1) != b'\n':
+                    return None
+            data = f.read().decode('utf-8')
+        return [line.strip() for line in data.splitlines() if line.strip()]
     
-    def _load_urls(self) -> List[str]:
-        """加载URL列表"""
+    def _build_section(self, section: str, lines: Optional[List[str]],
+                       http_probes: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        构建一个表格分段
+        
+        Args:
+            section: 分段名称
+            lines: 行输入（为None时从文件全量加载）
+            http_probes: HTTP探测结果
+        
+        Returns:
+            List[Dict]: 分段的行
+        """
+        if section == 'subdomain_assets':
+            subdomains = self._load_subdomains() if lines is None else lines
+            return self._build_subdomain_asset_rows(subdomains, http_probes)
+        
+        if section == 'url_assets':
+            urls = self._load_urls() if lines is None else lines
+            return self._build_url_asset_rows(urls, http_probes)
+        
+        return self._build_ip_port_rows(self._load_subdomain_ip_map(),
+                                        self._load_ports(), http_probes)
+    
+    def _load_subdomains(self) -> Iterator[str]:
+        """逐行加载子域名列表（只能遍历一次）"""
+        return iter_file_lines(self.output_dir / "filtered_subdomains.txt")
+    
+    def _load_urls(self) -> UrlStore:
+        """加载URL列表（按站点驻留存储）"""
+        urls = UrlStore()
         url_file = self.output_dir / "discovered_urls.txt"
-        if url_file.exists():
-            return read_file_lines(url_file)
-        return []
+        urls.update(iter_file_lines(url_file))
+        return urls
+    
+    def _http_probe_files(self) -> List[Path]:
+        """查找所有httpx结果文件"""
+        return [
+            probe_file for probe_file in self.output_dir.glob("*_results.json")
+            if probe_file.stem.startswith("httpx") or "probe" in probe_file.stem
+        ]
     
     def _load_http_probes(self) -> Dict[str, Dict[str, Any]]:
         """
         加载HTTP探测结果
         
         Returns:
-            Dict: URL -> 探测信息的映射
+            Dict: 规范化URL -> 探测信息的映射
         """
         probes = {}
         
         # 查找所有httpx结果文件
-        for probe_file in self.output_dir.glob("*_results.json"):
-            if probe_file.stem.startswith("httpx") or "probe" in probe_file.stem:
-                try:
-                    with open(probe_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        
-                        if isinstance(data, list):
-                            for item in data:
-                                url = item.get('url', '')
-                                if url:
-                                    probes[url] = item
-                        elif isinstance(data, dict) and 'results' in data:
-                            for item in data['results']:
-                                url = item.get('url', '')
-                                if url:
-                                    probes[url] = item
-                except Exception as e:
-                    self.logger.warning(f"加载HTTP探测结果失败 {probe_file}: {e}")
+        for probe_file in self._http_probe_files():
+            try:
+                with open(probe_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    
+                    if isinstance(data, list):
+                        for item in data:
+                            url = item.get('url', '')
+                            if url:
+                                probes[canonicalize_url(url)] = item
+                    elif isinstance(data, dict) and 'results' in data:
+                        for item in data['results']:
+                            url = item.get('url', '')
+                            if url:
+                                probes[canonicalize_url(url)] = item
+            except Exception as e:
+                self.logger.warning(f"加载HTTP探测结果失败 {probe_file}: {e}")
+        
+        # 按响应特征聚类，报告中显示每条结果所在分组的大小
+        cluster_probes(probes.values())
         
         return probes
     
-    def _load_ports(self) -> List[Dict[str, Any]]:
-        """加载端口扫描结果"""
-        ports = []
+    def _load_ports(self) -> PortStore:
+        """加载端口扫描结果（逐条读入紧凑存储）"""
+        ports = PortStore()
         
         port_file = self.output_dir / "port_scan_results.json"
-        if port_file.exists():
-            try:
-                with open(port_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        ports = data
-                    elif isinstance(data, dict) and 'ports' in data:
-                        ports = data['ports']
-            except Exception as e:
-                self.logger.warning(f"加载端口扫描结果失败: {e}")
+        try:
+            for key, item in iter_json_records(port_file):
+                if key in (None, 'ports') and isinstance(item, dict):
+                    ports.add_record(item)
+        except Exception as e:
+            self.logger.warning(f"加载端口扫描结果失败: {e}")
         
         return ports
     
-    def _load_subdomain_ip_map(self) -> Dict[str, str]:
+    def _load_subdomain_ip_map(self) -> Dict[str, List[str]]:
         """
-        加载子域名到IP的映射（从puzzle结果）
+        加载子域名到IP的映射（从puzzle结果和DNS解析结果）
         
         Returns:
-            Dict: 子域名 -> IP的映射
+            Dict: 子域名 -> IP列表的映射
         """
         mapping = {}
         
+        def add(subdomain: str, ips: List[str]):
+            known = mapping.setdefault(subdomain, [])
+            known.extend(ip for ip in ips if ip and ip not in known)
+        
         puzzle_file = self.output_dir / "puzzle" / "puzzle_result.txt"
         if puzzle_file.exists():
-            lines = read_file_lines(puzzle_file)
-            for line in lines:
-                # puzzle输出格式: subdomain [IP]
+            for line in iter_file_lines(puzzle_file):
+                # puzzle输出格式: subdomain [IP]（多个IP以逗号分隔）
                 parts = line.split()
                 if len(parts) >= 2:
-                    subdomain = parts[0]
-                    ip = parts[1].strip('[]')
-                    if ip:
-                        mapping[subdomain] = ip
+                    add(parts[0], parts[1].strip('[]').split(','))
+        
+        dns_file = self.output_dir / "dns_results.json"
+        if dns_file.exists():
+            try:
+                with open(dns_file, 'r', encoding='utf-8') as f:
+                    for record in json.load(f):
+                        add(record.get('subdomain', ''), record.get('ips', []))
+            except Exception as e:
+                self.logger.warning(f"加载DNS解析结果失败: {e}")
         
+        mapping.pop('', None)
         return mapping
     
-    def _build_web_assets_table(self, subdomains: List[str], urls: List[str], 
+    def _build_web_assets_table(self, subdomains: Iterable[str], urls: Iterable[str], 
                                 http_probes: Dict[str, Dict[str, Any]]):
         """
         构建表1: Web资产表
         
-        格式: 主域名 | 子域名 | 目录URL | 状态码 | 网页标题
+        格式: 主域名 | 子域名 | 目录URL | 状态码 | 网页标题 | 聚类数量
         """
         self.logger.info("构建Web资产表")
         
+        self.web_assets.extend(self._build_subdomain_asset_rows(subdomains, http_probes))
+        self.web_assets.extend(self._build_url_asset_rows(urls, http_probes))
+    
+    def _build_subdomain_asset_rows(self, subdomains: Iterable[str],
+                                    http_probes: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """构建Web资产表的子域名行"""
+        rows = []
+        
         # 首先添加所有子域名（即使没有探测结果）
         for subdomain in subdomains:
             # 尝试匹配HTTP探测结果
-            http_url = f"http://{subdomain}"
-            https_url = f"https://{subdomain}"
+            http_url = canonicalize_url(f"http://{subdomain}")
+            https_url = canonicalize_url(f"https://{subdomain}")
             
             probe = http_probes.get(https_url) or http_probes.get(http_url)
             
             if probe:
-                self.web_assets.append({
+                rows.append({
                     'domain': self.domain,
                     'subdomain': subdomain,
                     'url': probe.get('url', ''),
                     'status_code': probe.get('status_code', ''),
-                    'title': probe.get('title', '')
+                    'title': probe.get('title', ''),
+                    'cluster_size': probe.get('cluster_size', '')
                 })
             else:
                 # 没有探测结果，只记录子域名
-                self.web_assets.append({
+                rows.append({
                     'domain': self.domain,
                     'subdomain': subdomain,
                     'url': '',
                     'status_code': '',
-                    'title': ''
+                    'title': '',
+                    'cluster_size': ''
                 })
         
+        return rows
+    
+    def _build_url_asset_rows(self, urls: Iterable[str],
+                              http_probes: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """构建Web资产表的目录URL行"""
+        rows = []
+        
         # 添加目录挖掘发现的URL
         for url in urls:
-            probe = http_probes.get(url)
+            probe = http_probes.get(canonicalize_url(url))
             
             # 从URL提取子域名
             subdomain = self._extract_subdomain_from_url(url)
             
             if probe:
-                self.web_assets.append({
+                rows.append({
                     'domain': self.domain,
                     'subdomain': subdomain,
                     'url': url,
                     'status_code': probe.get('status_code', ''),
-                    'title': probe.get('title', '')
+                    'title': probe.get('title', ''),
+                    'cluster_size': probe.get('cluster_size', '')
                 })
             else:
-                self.web_assets.append({
+                rows.append({
                     'domain': self.domain,
                     'subdomain': subdomain,
                     'url': url,
                     'status_code': '',
-                    'title': ''
+                    'title': '',
+                    'cluster_size': ''
                 })
+        
+        return rows
     
-    def _build_ip_ports_table(self, subdomains: List[str], 
-                             subdomain_ip_map: Dict[str, str],
-                             ports: List[Dict[str, Any]], 
+    def _build_ip_ports_table(self, subdomains: Iterable[str], 
+                             subdomain_ip_map: Dict[str, List[str]],
+                             ports: Iterable[Dict[str, Any]], 
                              http_probes: Dict[str, Dict[str, Any]]):
         """
         构建表2: IP端口表
@@ -220,16 +535,27 @@ class ReportGenerator:
         """
         self.logger.info("构建IP端口表")
         
+        self.ip_ports.extend(self._build_ip_port_rows(subdomain_ip_map, ports, http_probes))
+    
+    def _build_ip_port_rows(self, subdomain_ip_map: Dict[str, List[str]],
+                            ports: Iterable[Dict[str, Any]],
+                            http_probes: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """构建IP端口表的行"""
+        rows = []
+        
+        # IP -> 子域名列表（反向索引）
+        ip_subdomains: Dict[str, List[str]] = {}
+        for subdomain, ips in subdomain_ip_map.items():
+            for ip in ips:
+                ip_subdomains.setdefault(ip, []).append(subdomain)
+        
         # 为每个端口扫描结果匹配子域名
         for port_info in ports:
             ip = port_info.get('ip', '')
             port = port_info.get('port', '')
             
             # 查找对应的子域名
-            matching_subdomains = [sub for sub, sub_ip in subdomain_ip_map.items() if sub_ip == ip]
-            
-            if not matching_subdomains:
-                matching_subdomains = ['']
+            matching_subdomains = ip_subdomains.get(ip) or ['']
             
             for subdomain in matching_subdomains:
                 # 尝试匹配HTTP探测结果
@@ -243,12 +569,13 @@ class ReportGenerator:
                 
                 probe = None
                 for url in possible_urls:
-                    if url and url in http_probes:
-                        probe = http_probes[url]
-                        break
+                    if url:
+                        probe = http_probes.get(canonicalize_url(url))
+                        if probe:
+                            break
                 
                 if probe:
-                    self.ip_ports.append({
+                    rows.append({
                         'domain': self.domain,
                         'subdomain': subdomain,
                         'ip': ip,
@@ -257,7 +584,7 @@ class ReportGenerator:
                         'title': probe.get('title', '')
                     })
                 else:
-                    self.ip_ports.append({
+                    rows.append({
                         'domain': self.domain,
                         'subdomain': subdomain,
                         'ip': ip,
@@ -265,15 +592,13 @@ class ReportGenerator:
                         'status_code': '',
                         'title': ''
                     })
+        
+        return rows
     
     def _extract_subdomain_from_url(self, url: str) -> str:
-        """从URL提取子域名"""
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            return parsed.netloc.split(':')[0]  # 移除端口号
-        except:
-            return ''
+        """从URL提取子域名（不属于目标范围的主机返回空）"""
+        host = extract_host(url)
+        return host if host and self.scope.in_scope(host) else ''
     
     def generate_csv(self):
         """生成CSV格式报告"""
@@ -282,7 +607,7 @@ class ReportGenerator:
         # 表1: Web资产表
         table1_file = self.output_dir / f"{self.domain}_web_assets.csv"
         with open(table1_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=['domain', 'subdomain', 'url', 'status_code', 'title'])
+            writer = csv.DictWriter(f, fieldnames=['domain', 'subdomain', 'url', 'status_code', 'title', 'cluster_size'])
             writer.writeheader()
             writer.writerows(self.web_assets)
         
@@ -301,7 +626,10 @@ class ReportGenerator:
     
     def generate_excel(self):
         """生成Excel格式报告"""
-        if not PANDAS_AVAILABLE:
+        # pandas/openpyxl只在导出Excel时导入，避免拖慢其他命令的启动
+        try:
+            import pandas as pd
+        except ImportError:
             self.logger.warning("pandas未安装，无法生成Excel报告")
             return None
         
@@ -313,7 +641,7 @@ class ReportGenerator:
             with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
                 # 表1: Web资产
                 df1 = pd.DataFrame(self.web_assets)
-                df1.columns = ['主域名', '子域名', '目录URL', '状态码', '网页标题']
+                df1.columns = ['主域名', '子域名', '目录URL', '状态码', '网页标题', '聚类数量']
                 df1.to_excel(writer, sheet_name='Web资产', index=False)
                 
                 # 表2: IP端口
@@ -348,20 +676,24 @@ class ReportGenerator:
         
         return summary
     
-    def generate_all(self, format: str = 'csv'):
+    def generate_all(self, format: str = 'csv', incremental: bool = True):
         """
         生成所有报告
         
         Args:
             format: 报告格式 ('csv' 或 'xlsx')
+            incremental: 是否按输入文件指纹增量构建
         
         Returns:
             List[Path]: 生成的报告文件列表
         """
         self.logger.info(f"开始生成报告 (格式: {format})")
         
-        # 加载数据
-        self.load_data()
+        # 加载数据（按输入指纹增量重建）
+        if incremental:
+            self.load_data_incremental()
+        else:
+            self.load_data()
         
         # 生成汇总
         summary = self.generate_summary()
@@ -391,7 +723,8 @@ class ReportGenerator:
         return report_files, summary
 
 
-def generate_report(domain: str, output_dir: Path, format: str = 'csv') -> tuple:
+def generate_report(domain: str, output_dir: Path, format: str = 'csv',
+                    incremental: bool = True) -> tuple:
     """
     生成报告的便捷函数
     
@@ -399,9 +732,10 @@ def generate_report(domain: str, output_dir: Path, format: str = 'csv') -> tuple
         domain: 主域名
         output_dir: 输出目录
         format: 报告格式
+        incremental: 是否增量构建
     
     Returns:
         tuple: (报告文件列表, 汇总信息)
     """
     generator = ReportGenerator(domain, output_dir)
-    return generator.generate_all(format)
+    return generator.generate_all(format, incremental)
@@ -0,0 +1,143 @@
+"""
+Luna 扫描调度模块
+按解析到的目标IP对扫描输入分组，限制单个IP的并发并轮流排列各IP的主机
+"""
+
+from itertools import cycle, islice
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+from .config import (
+    PER_IP_CONCURRENCY, PER_IP_RATE_LIMIT, MULTI_HOST_RATE_TOOLS, TOOL_RATE_PARAMS
+)
+from .utils import setup_logger
+
+
+def _roundrobin(groups: List[List[str]]) -> Iterable[str]:
+    """依次从每个分组取一个元素，直到所有分组取完"""
+    iterators = cycle(iter(group) for group in groups)
+    remaining = len(groups)
+
+    while remaining:
+        try:
+            for next_item in iterators:
+                yield next(next_item)
+        except StopIteration:
+            remaining -= 1
+            iterators = cycle(islice(iterators, remaining))
+
+
+class PolitenessScheduler:
+    """
+    按目标IP调度扫描输入
+
+    同一IP上的主机被分散到输入列表的不同位置，工具按顺序取输入时各IP轮流被访问；
+    工具的总并发和速率按输入涉及的IP数计算上限，避免集中压向少数共享IP
+    """
+
+    def __init__(self, ip_map: Dict[str, List[str]],
+                 per_ip_concurrency: int = PER_IP_CONCURRENCY,
+                 per_ip_rate: int = PER_IP_RATE_LIMIT):
+        """
+        初始化调度器
+
+        Args:
+            ip_map: 子域名 -> IP列表（调度时读取，可在运行过程中继续补充）
+            per_ip_concurrency: 单个IP的并发上限
+            per_ip_rate: 单个IP的每秒请求数上限
+        """
+        self.ip_map = ip_map
+        self.per_ip_concurrency = per_ip_concurrency
+        self.per_ip_rate = per_ip_rate
+        self.logger = setup_logger("Luna.scheduler")
+
+    def ip_key(self, item: str) -> str:
+        """
+        获取输入对应的分组键
+
+        Args:
+            item: URL或主机名
+
+        Returns:
+            str: 解析到的IP（有多个时取最小的），未知时返回主机名本身
+        """
+        host = urlsplit(item).hostname if '://' in item else item.split('/', 1)[0]
+        host = host or item
+
+        ips = self.ip_map.get(host)
+        return min(ips) if ips else host
+
+    def group(self, items: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        按目标IP分组
+
+        Args:
+            items: URL或主机名列表
+
+        Returns:
+            Dict: IP -> 输入列表（保持原有顺序）
+        """
+        groups: Dict[str, List[str]] = {}
+        for item in items:
+            groups.setdefault(self.ip_key(item), []).append(item)
+        return groups
+
+    def interleave(self, items: Iterable[str]) -> Tuple[List[str], int]:
+        """
+        按IP轮流排列输入
+
+        Args:
+            items: URL或主机名列表
+
+        Returns:
+            Tuple: (重新排列后的输入, 涉及的IP数)
+        """
+        groups = self.group(items)
+        # 主机多的IP排在前面，避免列表末尾集中在同一个IP上
+        ordered = sorted(groups.values(), key=len, reverse=True)
+        return list(_roundrobin(ordered)), len(groups)
+
+    def limit_params(self, tool_name: str, params: Dict[str, Any], ip_count: int) -> Dict[str, Any]:
+        """
+        按涉及的IP数限制工具的并发和速率
+
+        同时扫描多个主机的工具上限为 IP数 x 单IP上限，逐个主机扫描的工具上限为单IP上限；
+        用户设置的值被降低时记录日志
+
+        Args:
+            tool_name: 工具名称
+            params: 工具参数
+            ip_count: 输入涉及的IP数
+
+        Returns:
+            Dict: 调整后的工具参数
+        """
+        multi_host = tool_name in MULTI_HOST_RATE_TOOLS
+        ip_count = max(1, ip_count) if multi_host else 1
+        scope = f"{ip_count} 个IP x " if multi_host else "逐个主机扫描，"
+        limited = dict(params)
+
+        threads = params.get("threads")
+        max_threads = ip_count * self.per_ip_concurrency
+        if isinstance(threads, int) and threads > 0:
+            limited["threads"] = min(threads, max_threads)
+            if threads > max_threads:
+                self.logger.info(
+                    f"{tool_name} 并发数 {threads} 降为 {max_threads}"
+                    f"（{scope}单IP并发上限 {self.per_ip_concurrency}）"
+                )
+
+        rate_param = TOOL_RATE_PARAMS.get(tool_name)
+        if rate_param:
+            rate = ip_count * self.per_ip_rate
+            user_rate = params.get(rate_param)
+            if isinstance(user_rate, int) and user_rate > 0:
+                if user_rate > rate:
+                    self.logger.info(
+                        f"{tool_name} 速率 {user_rate}/s 降为 {rate}/s"
+                        f"（{scope}单IP速率上限 {self.per_ip_rate}/s）"
+                    )
+                rate = min(rate, user_rate)
+            limited[rate_param] = rate
+
+        return limited
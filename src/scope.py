@@ -0,0 +1,221 @@
+"""
+Luna 范围判断模块
+基于反向标签后缀树判断主机是否属于目标范围，以及按目标对主机分组
+"""
+
+import ipaddress
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+# 节点中保存匹配值的键（标签不会是None）
+_VALUE = None
+
+
+def _labels(host: str) -> List[str]:
+    """主机名按标签反向拆分（顶级域名在前）"""
+    return host.lower().rstrip('.').split('.')[::-1]
+
+
+class SuffixTrie:
+    """
+    域名后缀树
+
+    按 com -> example -> www 的顺序逐级保存标签，查询的复杂度只与主机名的标签数有关；
+    返回最长匹配的后缀对应的值
+    """
+
+    def __init__(self, suffixes: Iterable[str] = ()):
+        self._root: Dict[Any, Any] = {}
+        self._labels: Dict[str, str] = {}
+        self._size = 0
+        for suffix in suffixes:
+            self.add(suffix)
+
+    def add(self, suffix: str, value: Any = None):
+        """
+        添加后缀
+
+        Args:
+            suffix: 域名后缀（如 example.com）
+            value: 匹配时返回的值，默认为后缀本身
+        """
+        suffix = suffix.lower().rstrip('.')
+        if not suffix:
+            return
+
+        node = self._root
+        for label in _labels(suffix):
+            # 相同标签共享同一个字符串对象
+            label = self._labels.setdefault(label, label)
+            node = node.setdefault(label, {})
+
+        if _VALUE not in node:
+            self._size += 1
+        node[_VALUE] = suffix if value is None else value
+
+    def match(self, host: str) -> Optional[Any]:
+        """
+        查找主机名的最长匹配后缀
+
+        Args:
+            host: 主机名
+
+        Returns:
+            Optional[Any]: 匹配后缀对应的值，不匹配返回None
+        """
+        node = self._root
+        found = None
+        for label in _labels(host):
+            node = node.get(label)
+            if node is None:
+                break
+            if _VALUE in node:
+                found = node[_VALUE]
+        return found
+
+    def group(self, hosts: Iterable[str]) -> Dict[Any, List[str]]:
+        """
+        按匹配的后缀对主机分组（不匹配的主机不返回）
+
+        Args:
+            hosts: 主机名列表
+
+        Returns:
+            Dict: 后缀对应的值 -> 主机列表
+        """
+        groups: Dict[Any, List[str]] = {}
+        for host in hosts:
+            value = self.match(host)
+            if value is not None:
+                groups.setdefault(value, []).append(host)
+        return groups
+
+    def __contains__(self, host: str) -> bool:
+        return self.match(host) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def extract_host(value: str) -> str:
+    """
+    从URL或 host:port 中取出主机名
+
+    Args:
+        value: URL、host:port 或主机名
+
+    Returns:
+        str: 小写的主机名（IPv6地址不带方括号），无法解析时返回空字符串
+    """
+    value = value.strip()
+    if '://' in value:
+        try:
+            return urlsplit(value).hostname or ''
+        except ValueError:
+            return ''
+
+    value = value.split('/', 1)[0]
+    if value.startswith('['):
+        return value[1:].split(']', 1)[0]
+    if value.count(':') == 1:
+        value = value.split(':', 1)[0]
+    return value.lower().rstrip('.')
+
+
+def _parse_ip(host: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    if not host or not (host[0].isdigit() or ':' in host):
+        return None
+    try:
+        return ipaddress.ip_address(host)
+    except ValueError:
+        return None
+
+
+class ScopeIndex:
+    """
+    目标范围索引
+
+    域名目标保存在后缀树中（目标本身及其所有子域名都在范围内），IP/CIDR目标按网段匹配；
+    只有域名目标时IP视为在范围内（子域名解析出的IP），只有IP目标时域名视为在范围内
+    """
+
+    def __init__(self, targets: Iterable[str] = ()):
+        self.domains = SuffixTrie()
+        self.networks: List[Tuple[Any, str]] = []
+        for target in targets:
+            self.add(target)
+
+    def add(self, target: str):
+        """
+        添加目标
+
+        Args:
+            target: 域名、IP或CIDR
+        """
+        target = target.strip().lower()
+        if not target:
+            return
+
+        if target[0].isdigit() or ':' in target:
+            try:
+                self.networks.append((ipaddress.ip_network(target, strict=False), target))
+                return
+            except ValueError:
+                pass
+
+        self.domains.add(target)
+
+    def target_for(self, value: str) -> Optional[str]:
+        """
+        查找主机/URL所属的目标
+
+        Args:
+            value: 主机名、IP或URL
+
+        Returns:
+            Optional[str]: 所属目标，不属于任何目标时返回None
+        """
+        host = extract_host(value)
+        ip = _parse_ip(host)
+        if ip is not None:
+            for network, target in self.networks:
+                if ip.version == network.version and ip in network:
+                    return target
+            return None
+        return self.domains.match(host)
+
+    def in_scope(self, value: str) -> bool:
+        """
+        判断主机/URL是否在范围内
+
+        Args:
+            value: 主机名、IP或URL
+
+        Returns:
+            bool: 是否在范围内
+        """
+        host = extract_host(value)
+        if not host:
+            return False
+
+        if _parse_ip(host) is not None:
+            return not self.networks or self.target_for(host) is not None
+        return not len(self.domains) or self.domains.match(host) is not None
+
+    def group(self, values: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        按所属目标分组
+
+        Args:
+            values: 主机名、IP或URL列表
+
+        Returns:
+            Dict: 目标 -> 主机/URL列表（不属于任何目标的不返回）
+        """
+        groups: Dict[str, List[str]] = {}
+        for value in values:
+            target = self.target_for(value)
+            if target is not None:
+                groups.setdefault(target, []).append(value)
+        return groups
+
@@ -0,0 +1,443 @@
+"""
+Luna 紧凑存储模块
+大规模资产集合的内存存储：字符串驻留、端口记录按列存放在数组中、URL按 (站点ID, 路径) 保存、
+开放端口按IP保存为位图
+"""
+
+import socket
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class StringTable:
+    """
+    字符串驻留表
+
+    相同字符串只保存一份，按添加顺序分配整数ID
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+        self.update(values)
+
+    def intern(self, value: str) -> int:
+        """
+        添加字符串并返回其ID（已存在时返回原ID）
+
+        Args:
+            value: 字符串
+
+        Returns:
+            int: 字符串ID
+        """
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self._values)
+            self._values.append(value)
+        return value_id
+
+    def update(self, values: Iterable[str]):
+        """批量添加字符串"""
+        for value in values:
+            self.intern(value)
+
+    def get_id(self, value: str) -> Optional[int]:
+        """查找字符串ID，不存在时返回None"""
+        return self._ids.get(value)
+
+    def __getitem__(self, value_id: int) -> str:
+        return self._values[value_id]
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._ids
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+
+class UrlStore:
+    """
+    URL集合
+
+    URL拆分为站点（协议+主机+端口）和路径：站点和路径字符串都驻留（目录字典在各站点上的路径相同），
+    路径按站点分组保存，另用uint32数组记录添加顺序中每条URL的站点ID；
+    按添加顺序去重（调用方负责规范化）
+    """
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self.origins = StringTable()
+        self._origin_ids = array('I')
+        # 站点ID -> 路径（字典保持同一站点内的添加顺序）
+        self._paths: Dict[int, Dict[str, None]] = {}
+        # 路径字符串池（相同路径共享同一个对象）
+        self._path_pool: Dict[str, str] = {}
+        self.update(urls)
+
+    @staticmethod
+    def split(url: str) -> Tuple[str, str]:
+        """
+        拆分URL
+
+        Args:
+            url: URL
+
+        Returns:
+            Tuple: (站点, 路径及查询参数)
+        """
+        start = url.find('://')
+        start = start + 3 if start != -1 else 0
+        slash = url.find('/', start)
+        if slash == -1:
+            return url, ''
+        return url[:slash], url[slash:]
+
+    def add(self, url: str) -> bool:
+        """
+        添加URL
+
+        Args:
+            url: URL
+
+        Returns:
+            bool: 是否为新URL
+        """
+        origin, path = self.split(url)
+        origin_id = self.origins.intern(origin)
+
+        paths = self._paths.get(origin_id)
+        if paths is None:
+            paths = self._paths[origin_id] = {}
+        elif path in paths:
+            return False
+
+        paths[self._path_pool.setdefault(path, path)] = None
+        self._origin_ids.append(origin_id)
+        return True
+
+    def update(self, urls: Iterable[str]) -> int:
+        """
+        批量添加URL
+
+        Returns:
+            int: 新增的URL数量
+        """
+        return sum(1 for url in urls if self.add(url))
+
+    def __contains__(self, url: str) -> bool:
+        origin, path = self.split(url)
+        origin_id = self.origins.get_id(origin)
+        return origin_id is not None and path in self._paths.get(origin_id, ())
+
+    def __len__(self) -> int:
+        return len(self._origin_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        """按添加顺序返回URL（依次从对应站点的路径中取下一条）"""
+        origins = self.origins
+        iterators: Dict[int, Iterator[str]] = {}
+        for origin_id in self._origin_ids:
+            paths = iterators.get(origin_id)
+            if paths is None:
+                paths = iterators[origin_id] = iter(self._paths[origin_id])
+            yield origins[origin_id] + next(paths)
+
+
+# 端口号上限（位图长度）
+PORT_COUNT = 1 << 16
+
+# 开放端口数不超过该值的IP用有序uint16数组保存，超过时转为位图
+# （高位端口的位图最大8KB，少量端口时数组更省内存）
+SPARSE_PORT_LIMIT = 64
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    """按从小到大的顺序返回整数中为1的位"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+class PortMap:
+    """
+    开放端口集合（按IP）
+
+    每个IP的端口保存为位图整数（第N位为1表示端口N开放），
+    端口很少时保存为有序数组（类似Roaring Bitmap的数组容器）；
+    合并、差集按IP转为位图后做位运算。IPv4地址在内部以整数作为键
+    """
+
+    def __init__(self, bitmaps: Optional[Dict[str, int]] = None):
+        self._containers: Dict[Any, Any] = {}
+        for ip, bits in (bitmaps or {}).items():
+            if bits:
+                self._containers[self._key(ip)] = self._pack(bits)
+
+    @staticmethod
+    def _key(ip: str) -> Any:
+        """IP转为内部键（IPv4为整数，其他保持字符串）"""
+        try:
+            return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+        except (OSError, ValueError, TypeError):
+            return ip
+
+    @staticmethod
+    def _ip(key: Any) -> str:
+        """内部键转回IP"""
+        if isinstance(key, int):
+            return socket.inet_ntop(socket.AF_INET, key.to_bytes(4, 'big'))
+        return key
+
+    @staticmethod
+    def _pack(bits: int) -> Any:
+        """位图转为容器（端口少时为数组）"""
+        if _popcount(bits) <= SPARSE_PORT_LIMIT:
+            return array('H', _iter_bits(bits))
+        return bits
+
+    @staticmethod
+    def _bits(container: Any) -> int:
+        """容器转为位图"""
+        if isinstance(container, int):
+            return container
+        bits = 0
+        for port in container:
+            bits |= 1 << port
+        return bits
+
+    def bitmap(self, ip: str) -> int:
+        """获取IP的端口位图"""
+        container = self._containers.get(self._key(ip))
+        return self._bits(container) if container is not None else 0
+
+    def add(self, ip: str, port: int) -> bool:
+        """
+        标记端口开放
+
+        Returns:
+            bool: 之前是否未标记
+        """
+        key = self._key(ip)
+        container = self._containers.get(key)
+        if container is None:
+            self._containers[key] = array('H', (port,))
+            return True
+
+        if isinstance(container, int):
+            mask = 1 << port
+            if container & mask:
+                return False
+            self._containers[key] = container | mask
+            return True
+
+        index = bisect_left(container, port)
+        if index < len(container) and container[index] == port:
+            return False
+        container.insert(index, port)
+        if len(container) > SPARSE_PORT_LIMIT:
+            self._containers[key] = self._bits(container)
+        return True
+
+    def has(self, ip: str, port: int) -> bool:
+        """端口是否开放"""
+        container = self._containers.get(self._key(ip))
+        if container is None:
+            return False
+        if isinstance(container, int):
+            return bool(container >> port & 1)
+        return port in container
+
+    def ports(self, ip: str) -> List[int]:
+        """获取IP的开放端口（从小到大）"""
+        return self._ports(self._containers.get(self._key(ip)))
+
+    @staticmethod
+    def _ports(container: Any) -> List[int]:
+        if container is None:
+            return []
+        if isinstance(container, int):
+            return list(_iter_bits(container))
+        return list(container)
+
+    def ips_with_port(self, port: int) -> List[str]:
+        """获取开放了指定端口的IP"""
+        mask = 1 << port
+        return [
+            self._ip(key) for key, container in self._containers.items()
+            if (container & mask if isinstance(container, int) else port in container)
+        ]
+
+    def merge(self, other: 'PortMap') -> 'PortMap':
+        """合并另一个集合（就地按位或），返回自身"""
+        for key, container in other._containers.items():
+            current = self._containers.get(key)
+            bits = self._bits(current) if current is not None else 0
+            self._containers[key] = self._pack(bits | self._bits(container))
+        return self
+
+    def difference(self, other: 'PortMap') -> 'PortMap':
+        """
+        差集
+
+        Returns:
+            PortMap: 在本集合中开放、在另一集合中未开放的端口
+        """
+        result = PortMap()
+        for key, container in self._containers.items():
+            other_container = other._containers.get(key)
+            bits = self._bits(container)
+            if other_container is not None:
+                bits &= ~self._bits(other_container)
+            if bits:
+                result._containers[key] = self._pack(bits)
+        return result
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        """转换为 IP -> 端口列表"""
+        return {self._ip(key): self._ports(container) for key, container in self._containers.items()}
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        转换为可保存的格式
+
+        Returns:
+            Dict: IP -> 端口列表（端口少时）或十六进制位图
+        """
+        return {
+            self._ip(key): format(container, 'x') if isinstance(container, int) else list(container)
+            for key, container in self._containers.items()
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'PortMap':
+        """从 to_json 的结果恢复（忽略无效的值）"""
+        bitmaps = {}
+        for ip, value in data.items():
+            try:
+                if isinstance(value, str):
+                    bits = int(value, 16)
+                else:
+                    bits = 0
+                    for port in value:
+                        bits |= 1 << int(port)
+            except (TypeError, ValueError):
+                continue
+            if 0 < bits < 1 << PORT_COUNT:
+                bitmaps[ip] = bits
+        return cls(bitmaps)
+
+    def __len__(self) -> int:
+        """开放端口总数"""
+        return sum(
+            _popcount(container) if isinstance(container, int) else len(container)
+            for container in self._containers.values()
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._containers)
+
+
+class PortStore:
+    """
+    端口扫描结果集合
+
+    按列存放：IPv4地址为uint32、端口为uint16、服务名驻留后保存ID，
+    Banner和IPv6地址只在存在时单独保存；按 (IP, 端口) 去重（端口位图），先添加的记录优先
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self._ips = array('I')
+        self._ports = array('H')
+        self._services = array('I')
+        self.service_names = StringTable([''])
+        # 序号 -> Banner / 非IPv4地址（大多数记录没有）
+        self._banners: Dict[int, str] = {}
+        self._other_ips: Dict[int, str] = {}
+        # 已有记录的端口位图
+        self.port_map = PortMap()
+        self.update(records)
+
+    @staticmethod
+    def _pack_ipv4(ip: str) -> Optional[int]:
+        """IPv4地址转为整数，不是IPv4地址时返回None"""
+        try:
+            return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def add(self, ip: str, port: int, service: str = '', banner: str = '') -> bool:
+        """
+        添加端口记录
+
+        Args:
+            ip: IP地址
+            port: 端口
+            service: 服务名
+            banner: Banner
+
+        Returns:
+            bool: 是否为新记录
+        """
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            port = 0
+        if not 0 <= port < PORT_COUNT:
+            port = 0
+
+        if not self.port_map.add(ip, port):
+            return False
+
+        packed = self._pack_ipv4(ip)
+        index = len(self._ports)
+        self._ips.append(packed or 0)
+        self._ports.append(port)
+        self._services.append(self.service_names.intern(service or ''))
+        if packed is None:
+            self._other_ips[index] = ip
+        if banner:
+            self._banners[index] = banner
+        return True
+
+    def add_record(self, record: Dict[str, Any]) -> bool:
+        """添加 {'ip', 'port', 'service', 'banner'} 格式的记录"""
+        return self.add(record.get('ip', ''), record.get('port', 0),
+                        record.get('service', ''), record.get('banner', ''))
+
+    def update(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        批量添加记录
+
+        Returns:
+            int: 新增的记录数量
+        """
+        return sum(1 for record in records if self.add_record(record))
+
+    def ip_at(self, index: int) -> str:
+        """获取指定序号记录的IP"""
+        other = self._other_ips.get(index)
+        if other is not None:
+            return other
+        return socket.inet_ntop(socket.AF_INET, self._ips[index].to_bytes(4, 'big'))
+
+    def __len__(self) -> int:
+        return len(self._ports)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """逐条返回记录字典（按需生成，不常驻内存）"""
+        for index in range(len(self._ports)):
+            yield {
+                'ip': self.ip_at(index),
+                'port': self._ports[index],
+                'service': self.service_names[self._services[index]],
+                'banner': self._banners.get(index, '')
+            }
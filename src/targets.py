@@ -0,0 +1,254 @@
+"""
+Luna 目标输入模块
+负责目标和URL的规范化、去重和流式读取
+"""
+
+import re
+import hashlib
+import ipaddress
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from .filters import DOMAIN_PATTERN
+from .utils import print_error, print_info, print_warning, iter_file_lines
+
+# 无效目标的示例保留数量（每种原因）
+INVALID_SAMPLE_LIMIT = 5
+
+# 协议默认端口（规范化URL时省略）
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 百分号编码（非保留字符解码，其余统一为大写十六进制）
+_PERCENT_PATTERN = re.compile(r'%([0-9A-Fa-f]{2})')
+_UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+
+
+def _looks_like_ip(value: str) -> bool:
+    """快速判断是否可能是IP/CIDR（避免对每个域名都抛出解析异常）"""
+    return value[0].isdigit() or ':' in value
+
+
+def normalize_target(raw: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    规范化单个目标
+
+    支持域名（含IDN）、URL（去除协议/路径/端口/认证信息）、IP和CIDR
+
+    Args:
+        raw: 原始输入
+
+    Returns:
+        Tuple: (规范化后的目标, 无效原因)；空行和注释返回 (None, None)
+    """
+    value = raw.strip()
+    if not value or value.startswith('#'):
+        return None, None
+
+    value = value.lower()
+
+    # 去除协议
+    scheme_pos = value.find('://')
+    if scheme_pos != -1:
+        value = value[scheme_pos + 3:]
+    elif '/' in value and _looks_like_ip(value):
+        # 无协议时的 a.b.c.d/n 视为CIDR
+        try:
+            return str(ipaddress.ip_network(value, strict=False)), None
+        except ValueError:
+            pass
+
+    # 去除路径、查询参数和片段
+    for sep in '/?#':
+        value = value.split(sep, 1)[0]
+
+    # 去除认证信息
+    value = value.rpartition('@')[2]
+
+    # 去除端口（兼容 [IPv6]:port）
+    if value.startswith('['):
+        value = value[1:].split(']', 1)[0]
+    elif value.count(':') == 1:
+        value = value.split(':', 1)[0]
+
+    value = value.rstrip('.')
+    if not value:
+        return None, 'empty'
+
+    if _looks_like_ip(value):
+        try:
+            return str(ipaddress.ip_address(value)), None
+        except ValueError:
+            pass
+
+    # 国际化域名转换为punycode
+    if not value.isascii():
+        try:
+            value = value.encode('idna').decode('ascii')
+        except UnicodeError:
+            return None, 'idna'
+
+    if not DOMAIN_PATTERN.match(value):
+        return None, 'format'
+
+    return value, None
+
+
+def _normalize_percent(value: str) -> str:
+    """规范化百分号编码"""
+    def replace(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else '%' + match.group(1).upper()
+    return _PERCENT_PATTERN.sub(replace, value)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化URL，用于去重和探测结果匹配
+
+    协议和主机名转小写，省略默认端口，去除片段；路径为空时补 /，
+    非根路径去除末尾的 /；百分号编码中非保留字符解码，其余转为大写；
+    没有协议的输入按 http 处理
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        str: 规范化后的URL，无法解析时返回去除空白后的原值
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = 'http://' + url
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"
+
+    netloc = host
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+    if parts.username is not None:
+        userinfo = parts.netloc.rpartition('@')[0]
+        netloc = f"{userinfo}@{netloc}"
+
+    path = _normalize_percent(parts.path) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    return urlunsplit((scheme, netloc, path, _normalize_percent(parts.query), ''))
+
+
+class TargetStream:
+    """
+    目标流
+
+    按输入顺序惰性读取命令行和目标文件中的目标，逐条规范化并去重；
+    无效行只做统计，读取结束后统一输出汇总
+    """
+
+    def __init__(self, target: Optional[str] = None, target_file: Optional[str] = None):
+        """
+        初始化目标流
+
+        Args:
+            target: 单个目标或逗号分隔的多个目标
+            target_file: 目标文件路径（每行一个目标）
+        """
+        self.target = target
+        self.target_file = Path(target_file) if target_file else None
+
+        self.valid = 0
+        self.duplicates = 0
+        self.invalid: Counter = Counter()
+        self.invalid_samples: Dict[str, List[str]] = {}
+
+        self._iterator: Optional[Iterator[str]] = None
+        self._peeked: List[str] = []
+
+    def _iter_raw(self) -> Iterator[str]:
+        """逐条返回原始输入"""
+        if self.target:
+            yield from self.target.split(',')
+
+        if self.target_file:
+            if not self.target_file.exists():
+                print_error(f"文件不存在: {self.target_file}")
+                return
+
+            yield from iter_file_lines(self.target_file)
+
+    def _iter_targets(self) -> Iterator[str]:
+        """规范化并去重"""
+        # 只保存目标的16字节摘要用于去重，每个唯一目标占用固定大小的内存
+        # （不使用hash()：64位哈希碰撞会把不同的目标当作重复丢弃）
+        seen = set()
+
+        for raw in self._iter_raw():
+            target, reason = normalize_target(raw)
+
+            if reason:
+                self.invalid[reason] += 1
+                samples = self.invalid_samples.setdefault(reason, [])
+                if len(samples) < INVALID_SAMPLE_LIMIT:
+                    samples.append(raw.strip())
+                continue
+
+            if target is None:
+                continue
+
+            key = hashlib.blake2b(target.encode('utf-8'), digest_size=16).digest()
+            if key in seen:
+                self.duplicates += 1
+                continue
+
+            seen.add(key)
+            self.valid += 1
+            yield target
+
+    def __iter__(self) -> Iterator[str]:
+        if self._iterator is None:
+            self._iterator = self._iter_targets()
+
+        while self._peeked:
+            yield self._peeked.pop(0)
+        yield from self._iterator
+
+    def has_targets(self) -> bool:
+        """
+        是否至少有一个有效目标（只读取到第一个有效目标为止）
+
+        Returns:
+            bool: 是否有有效目标
+        """
+        if self._peeked:
+            return True
+
+        if self._iterator is None:
+            self._iterator = self._iter_targets()
+
+        for target in self._iterator:
+            self._peeked.append(target)
+            return True
+        return False
+
+    def print_summary(self):
+        """输出目标读取汇总"""
+        print_info(f"有效目标: {self.valid} 个")
+        if self.duplicates:
+            print_info(f"重复目标: {self.duplicates} 个")
+
+        total_invalid = sum(self.invalid.values())
+        if total_invalid:
+            print_warning(f"无效目标: {total_invalid} 个")
+            for reason, count in self.invalid.most_common():
+                samples = ', '.join(self.invalid_samples.get(reason, []))
+                print_warning(f"  {reason}: {count} 个 (示例: {samples})")
+
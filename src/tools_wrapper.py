@@ -3,15 +3,42 @@ Luna 工具调用封装模块
 提供统一的工具调用接口
 """
 
+import asyncio
 import subprocess
 import logging
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional, List
+from urllib.parse import urlsplit
 from abc import ABC, abstractmethod
 
-from .config import get_tool_path, get_tool_type, TOOL_PATHS
-from .utils import setup_logger
+from .config import (
+    get_tool_path, get_tool_type, TOOL_PATHS, MULTI_HOST_RATE_TOOLS, BUILTIN_FALLBACKS
+)
+from .cache import ResultCache
+from .governor import get_governor
+from .utils import setup_logger, iter_file_lines
+
+
+def count_target_hosts(target: str) -> int:
+    """
+    统计工具输入中的不同主机数量
+    
+    Args:
+        target: 目标或输入文件路径
+    
+    Returns:
+        int: 主机数量（单个目标为1）
+    """
+    target_path = Path(target)
+    if not target_path.is_file():
+        return 1
+    
+    hosts = set()
+    for line in iter_file_lines(target_path):
+        hosts.add(urlsplit(line).hostname if '://' in line else line.split('/', 1)[0])
+    
+    return max(1, len(hosts))
 
 
 class ToolResult:
@@ -56,8 +83,8 @@ class ToolWrapper(ABC):
         # 确保输出目录存在
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 检查工具是否存在
-        if not self.tool_path or not self.tool_path.exists():
+        # 检查工具是否存在（内置引擎不需要外部程序）
+        if self.tool_type != "builtin" and (not self.tool_path or not self.tool_path.exists()):
             self.logger.warning(f"工具路径不存在: {self.tool_path}")
     
     @abstractmethod
@@ -88,7 +115,8 @@ class ToolWrapper(ABC):
         """
         pass
     
-    def execute(self, target: str, params: Dict[str, Any], timeout: int = 300) -> ToolResult:
+    def execute(self, target: str, params: Dict[str, Any], timeout: int = 300,
+                use_cache: bool = True) -> ToolResult:
         """
         执行工具
         
@@ -96,6 +124,7 @@ class ToolWrapper(ABC):
             target: 目标（域名或IP）
             params: 工具参数
             timeout: 超时时间（秒）
+            use_cache: 是否使用结果缓存
         
         Returns:
             ToolResult: 执行结果
@@ -104,6 +133,40 @@ class ToolWrapper(ABC):
         self.logger.info(f"目标: {target}")
         self.logger.info(f"参数: {params}")
         
+        # 相同工具、参数和输入集合的结果在有效期内直接复用
+        cache = cache_key = None
+        if use_cache and ResultCache.is_cacheable(self.tool_name):
+            cache = ResultCache()
+            cache_key = cache.make_key(self.tool_name, target, params)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"命中结果缓存: {cache_key[:12]}")
+                return ToolResult(success=True, data=cached)
+        
+        # 在全局资源限制内执行（并发和限速参数可能被调整）
+        governor = get_governor()
+        hosts = count_target_hosts(target) if self.tool_name in MULTI_HOST_RATE_TOOLS else 1
+        with governor.lease(self.tool_name, params, hosts) as granted_params:
+            result = self._run(target, granted_params, timeout)
+        
+        # 只缓存成功的结果
+        if result.success and cache:
+            cache.put(cache_key, self.tool_name, result.data)
+        
+        return result
+    
+    def _run(self, target: str, params: Dict[str, Any], timeout: int) -> ToolResult:
+        """
+        构建命令并执行工具进程
+        
+        Args:
+            target: 目标（域名或IP）
+            params: 工具参数
+            timeout: 超时时间（秒）
+        
+        Returns:
+            ToolResult: 执行结果
+        """
         # 构建命令
         try:
             cmd = self.build_command(target, params)
@@ -187,7 +250,8 @@ class ToolWrapper(ABC):
         Returns:
             Path: 完整的输出文件路径
         """
-        output_file = self.output_dir / filename
+        # 输出到工具的模块目录（与parse_output读取的位置一致）
+        output_file = getattr(self, 'module_dir', self.output_dir) / filename
         
         # 特殊处理：puzzle如果文件存在会拒绝输出
         if self.tool_name == "puzzle" and output_file.exists():
@@ -197,6 +261,62 @@ class ToolWrapper(ABC):
         return output_file
 
 
+class BuiltinToolWrapper(ToolWrapper):
+    """
+    内置引擎封装基类
+    
+    在当前进程内运行扫描引擎，不启动外部程序；结果文件格式与对应的外部工具一致
+    """
+    
+    def build_command(self, target: str, params: Dict[str, Any]) -> List[str]:
+        """内置引擎没有命令行，仅用于日志"""
+        return ["builtin", self.tool_name, target]
+    
+    @abstractmethod
+    def run_engine(self, target: str, params: Dict[str, Any], timeout: int) -> str:
+        """
+        运行内置引擎
+        
+        Args:
+            target: 目标或输入文件路径
+            params: 工具参数
+            timeout: 整体超时时间（秒），超时由引擎抛出 asyncio.TimeoutError
+        
+        Returns:
+            str: 执行摘要（作为标准输出记录）
+        """
+        pass
+    
+    def _run(self, target: str, params: Dict[str, Any], timeout: int) -> ToolResult:
+        """在当前进程内运行引擎"""
+        try:
+            output = self.run_engine(target, params, timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"执行超时（{timeout}秒）")
+            return ToolResult(success=False, error=f"执行超时（{timeout}秒）")
+        except Exception as e:
+            self.logger.exception(f"执行异常: {e}")
+            return ToolResult(success=False, error=str(e))
+        
+        output_file = self._get_output_file()
+        return ToolResult(
+            success=True,
+            output=output,
+            output_file=output_file,
+            data=self.parse_output(output, output_file)
+        )
+    
+    @staticmethod
+    def _iter_inputs(target: str):
+        """逐行读取输入文件，单个目标直接返回"""
+        target_path = Path(target)
+        if not target_path.is_file():
+            yield target
+            return
+        
+        yield from iter_file_lines(target_path)
+
+
 class DummyToolWrapper(ToolWrapper):
     """
     虚拟工具封装（用于测试）
@@ -230,7 +350,8 @@ def get_tool_wrapper(tool_name: str, output_dir: Path) -> ToolWrapper:
     # 导入具体的工具封装类
     from .modules import (
         OneForAllWrapper, PuzzleWrapper, HttpxWrapper,
-        DirsearchWrapper, FfufWrapper, FscanWrapper, TXPortMapWrapper
+        DirsearchWrapper, FfufWrapper, FscanWrapper, TXPortMapWrapper,
+        HttpProbeWrapper, PortScanWrapper, DnsResolveWrapper
     )
     
     wrapper_map = {
@@ -240,11 +361,21 @@ def get_tool_wrapper(tool_name: str, output_dir: Path) -> ToolWrapper:
         "dirsearch": DirsearchWrapper,
         "ffuf": FfufWrapper,
         "fscan": FscanWrapper,
-        "txportmap": TXPortMapWrapper
+        "txportmap": TXPortMapWrapper,
+        "httpprobe": HttpProbeWrapper,
+        "portscan": PortScanWrapper,
+        "dnsresolve": DnsResolveWrapper
     }
     
     wrapper_class = wrapper_map.get(tool_name)
     
+    # 外部工具不存在时使用对应的内置引擎
+    tool_path = get_tool_path(tool_name)
+    fallback = BUILTIN_FALLBACKS.get(tool_name)
+    if fallback and (not tool_path or not tool_path.exists()):
+        logging.getLogger("Luna").info(f"{tool_name} 不存在，使用内置引擎 {fallback}")
+        wrapper_class = wrapper_map[fallback]
+    
     if wrapper_class:
         return wrapper_class(output_dir)
     else:
@@ -4,14 +4,17 @@ Luna 工具函数模块
 """
 
 import os
-import re
 import json
+import mmap
+import stat
+import hashlib
 import logging
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 
-from .config import EMAIL_PATTERNS
+from .filters import EMAIL_FILTER, DOMAIN_PATTERN
 
 
 def setup_logger(name: str, log_file: Optional[Path] = None, level=logging.INFO):
@@ -62,10 +65,7 @@ def is_email_related(subdomain: str) -> bool:
     Returns:
         bool: 是否为邮件相关域名
     """
-    for pattern in EMAIL_PATTERNS:
-        if re.match(pattern, subdomain, re.IGNORECASE):
-            return True
-    return False
+    return EMAIL_FILTER.matches(subdomain)
 
 
 def filter_email_domains(subdomains: List[str]) -> List[str]:
@@ -78,44 +78,165 @@ def filter_email_domains(subdomains: List[str]) -> List[str]:
     Returns:
         List[str]: 过滤后的子域名列表
     """
-    filtered = [sub for sub in subdomains if not is_email_related(sub)]
-    return filtered
+    return list(EMAIL_FILTER.filter(subdomains))
+
+
+# 逐行读取和统计行数时每次处理的字节数
+LINE_COUNT_CHUNK_SIZE = 1 << 20
+
+# 写入文件时每批拼接的行数
+WRITE_BATCH_LINES = 8192
+
+
+def iter_file_lines(file_path) -> Iterator[str]:
+    """
+    逐行读取文件（内存映射，去除空行和空白字符）
+    
+    文件内容由操作系统按页映射，每次只切出一个数据块按换行符拆分，不会整体读入内存；
+    管道等非普通文件（如 /dev/stdin、<(...)）或无法映射时逐行读取；
+    无法解码的字节以替换字符代替
+    
+    Args:
+        file_path: 文件路径
+    
+    Yields:
+        str: 文件行（文件不存在时不返回任何行，其他打开错误直接抛出）
+    """
+    file_path = Path(file_path)
+    try:
+        f = open(file_path, 'rb')
+    except FileNotFoundError:
+        return
+    
+    with f:
+        info = os.fstat(f.fileno())
+        # 空文件无法映射
+        if stat.S_ISREG(info.st_mode) and info.st_size == 0:
+            return
+        
+        mapped = None
+        if stat.S_ISREG(info.st_mode):
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass
+        
+        if mapped is None:
+            for raw in f:
+                line = raw.strip()
+                if line:
+                    yield line.decode('utf-8', errors='replace')
+            return
+        
+        with mapped:
+            size = len(mapped)
+            start = 0
+            while start < size:
+                # 数据块在最后一个换行符处截断，不完整的行留到下一块
+                end = mapped.rfind(b'\n', start, start + LINE_COUNT_CHUNK_SIZE) + 1
+                if end <= start:
+                    # 单行超过块大小（或最后一行没有换行符）
+                    end = mapped.find(b'\n', start) + 1 or size
+                
+                for raw in mapped[start:end].split(b'\n'):
+                    line = raw.strip()
+                    if line:
+                        yield line.decode('utf-8', errors='replace')
+                start = end
+
+
+def count_file_lines(file_path) -> int:
+    """
+    快速统计文件行数（按块计算换行符，不解码；包含空行）
+    
+    Args:
+        file_path: 文件路径
+    
+    Returns:
+        int: 行数，文件不存在时返回0
+    """
+    count = 0
+    last = b'\n'
+    try:
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = f.read(LINE_COUNT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                count += chunk.count(b'\n')
+                last = chunk[-1:]
+    except OSError:
+        return 0
+    
+    # 最后一行没有换行符
+    return count + (last != b'\n')
 
 
 def read_file_lines(file_path) -> List[str]:
     """
     读取文件的所有行（去除空行和空白字符）
     
+    大文件请使用 iter_file_lines 逐行处理
+    
     Args:
         file_path: 文件路径
     
     Returns:
         List[str]: 文件行列表
     """
-    file_path = Path(file_path)
-    if not file_path.exists():
-        return []
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = [line.strip() for line in f if line.strip()]
-    
-    return lines
+    return list(iter_file_lines(file_path))
+
+
+def _iter_line_blocks(lines: Iterable[str]) -> Iterator[bytes]:
+    """按批拼接行并编码（每行以换行符结尾）"""
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, WRITE_BATCH_LINES))
+        if not batch:
+            return
+        batch.append('')
+        yield '\n'.join(batch).encode('utf-8')
 
 
-def write_file_lines(file_path, lines: List[str]):
+def write_file_lines(file_path, lines: Iterable[str]):
     """
     将列表写入文件（每行一个元素）
     
+    按批拼接后写入临时文件，完成后替换目标文件，读取方不会看到写了一半的文件
+    
     Args:
         file_path: 文件路径
         lines: 要写入的行列表
     """
     file_path = Path(file_path)
     file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = file_path.with_name(f"{file_path.name}.tmp")
     
-    with open(file_path, 'w', encoding='utf-8') as f:
-        for line in lines:
-            f.write(f"{line}\n")
+    try:
+        with open(temp_path, 'wb') as f:
+            for block in _iter_line_blocks(lines):
+                f.write(block)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+
+def lines_digest(lines: Iterable[str]) -> str:
+    """
+    计算行列表的内容摘要（与 write_file_lines 写出的文件内容一一对应）
+    
+    Args:
+        lines: 行列表
+    
+    Returns:
+        str: SHA-256 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    for block in _iter_line_blocks(lines):
+        digest.update(block)
+    return digest.hexdigest()
 
 
 def merge_and_deduplicate(lists: List[List[str]]) -> List[str]:
@@ -196,8 +317,7 @@ def validate_domain(domain: str) -> bool:
         bool: 是否合法
     """
     # 简单的域名格式验证
-    pattern = r'^([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, domain))
+    return bool(DOMAIN_PATTERN.match(domain))
 
 
 def ask_yes_no(question: str, default: bool = True) -> bool: